@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+import argparse
+import random
+import sys
+from time import perf_counter_ns
+from typing import Callable
+from ..components.battle_engine import BattleEngine
+from ..components.character import Character
+from ..components.monster_ai import ExpectimaxPolicy
+from ..data.catalog import MONSTER_CATALOG
+from ..simulation.headless import run_battle
+from .common import BenchResult, measure, write_results, load_results, compare, regressions, format_table
+
+SEED: int = 12345
+
+class DeckSnapshot:
+    """判断時点の山札・捨て札・手札（ExpectimaxPolicy.choose が読む属性だけ）"""
+    def __init__(self, deck: list[str], discard_pile: list[str], hand: list[str]):
+        self.deck = deck
+        self.discard_pile = discard_pile
+        self.hand = hand
+
+class _RecordingPolicy:
+    """ランダムに行動しつつ、判断を求められた局面を集める（何戦目の局面かも残す）"""
+    def __init__(self):
+        self.battle: int = 0
+        self.positions: list[tuple[Character, Character, DeckSnapshot, int]] = []
+
+    def choose(self, monster: Character, opponent: Character, deck) -> str:
+        self.positions.append((monster.copy(), opponent.copy(), DeckSnapshot(deck.deck, deck.discard_pile, list(deck.hand)),
+                               self.battle))
+        return monster.rng.choice(monster.actions)
+
+def collect_positions(count: int) -> list[tuple[Character, Character, DeckSnapshot, int]]:
+    """シード固定の戦闘から、モンスターが行動を決める局面を count 個、戦闘の順に集める（全モンスターから順に）"""
+    recorder = _RecordingPolicy()
+    seeds = random.Random(SEED)
+    while len(recorder.positions) < count:
+        monster_id = MONSTER_CATALOG.ids[recorder.battle % len(MONSTER_CATALOG)]
+        run_battle(BattleEngine(monster_id=monster_id, seed=seeds.getrandbits(64), keep_log=False, monster_policy=recorder))
+        recorder.battle += 1
+    return recorder.positions[:count]
+
+def _decide(policy: ExpectimaxPolicy, position: tuple, previous_battle: int | None) -> int:
+    """局面を1つ判断する。BattleScene と同じく置換表は1戦の間は使い回し、新しい戦闘に入ったら空にする"""
+    monster, player, deck, battle = position
+    if battle != previous_battle:
+        policy.clear()
+    policy.choose(monster, player, deck)
+    return battle
+
+def bench_decisions(positions: list, policy: ExpectimaxPolicy) -> Callable[[int], None]:
+    """1操作 = 1回の判断。局面は戦闘の順に判断し、置換表は同じ戦闘の判断どうしで共有する"""
+    def run(ops: int):
+        battle = None
+        for i in range(ops):
+            battle = _decide(policy, positions[i % len(positions)], battle)
+    return run
+
+def budget_report(positions: list, depth: int, budget_ms: float) -> str:
+    """時間制限つきで全局面を判断し、判断時間の p99 / 最大と到達した深さを報告する"""
+    policy = ExpectimaxPolicy(depth, time_budget_ms=budget_ms)
+    times_ms = []
+    reached = [0] * (depth + 1)
+    battle = None
+    for position in positions:
+        start = perf_counter_ns()
+        battle = _decide(policy, position, battle)
+        times_ms.append((perf_counter_ns() - start) / 1e6)
+        reached[policy.last_depth] += 1
+    times_ms.sort()
+    p99 = times_ms[min(len(times_ms) - 1, int(len(times_ms) * 0.99))]
+    depths = ", ".join(f"d{d}: {n}" for d, n in enumerate(reached) if n)
+    hit_rate = policy.table_hits / max(1, policy.table_hits + policy.nodes)
+    return (f"budget {budget_ms:.1f} ms (depth {depth}): p99 {p99:.2f} ms, max {times_ms[-1]:.2f} ms, reached {depths}, "
+            f"置換表のヒット率 {hit_rate:.0%}")
+
+def main():
+    parser = argparse.ArgumentParser(description="モンスターAI (expectimax) の1秒あたりの判断回数を深さごとに計測する")
+    parser.add_argument("--depths", type=int, nargs="*", default=[1, 2, 3])
+    parser.add_argument("--positions", type=int, default=200, help="計測に使う局面の数")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=8.0, help="時間制限つきの判断で確かめる予算 (0で省略)")
+    parser.add_argument("--json", default=None, help="結果をJSONで書き出すパス")
+    parser.add_argument("--baseline", default=None, help="比較するベースラインのJSON")
+    parser.add_argument("--threshold", type=float, default=0.15)
+    args = parser.parse_args()
+
+    positions = collect_positions(args.positions)
+    results: list[BenchResult] = []
+    hit_rates: list[str] = []
+    for depth in args.depths:
+        policy = ExpectimaxPolicy(depth)
+        results.append(measure(f"expectimax_d{depth}", bench_decisions(positions, policy), len(positions), args.repeat))
+        hit_rates.append(f"d{depth}: {policy.table_hits / max(1, policy.table_hits + policy.nodes):.0%}")
+
+    comparison = compare(results, load_results(args.baseline), args.threshold) if args.baseline else None
+    print(format_table(results, comparison))
+    # 深さ固定では前の判断の局面は1段浅く探索されているので、ヒットは1回の探索の中の合流だけになる
+    print(f"置換表のヒット率 ({', '.join(hit_rates)})")
+    if args.budget_ms:
+        print(budget_report(positions, max(args.depths), args.budget_ms))
+    if args.json:
+        write_results(args.json, "ai", results)
+
+    slower = regressions(comparison)
+    if slower:
+        print(f"ベースラインより遅くなったケース: {', '.join(slower)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
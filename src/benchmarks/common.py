@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+import json
+import platform
+import statistics
+import sys
+from time import perf_counter_ns
+from typing import Callable
+
+class BenchResult:
+    """1ケースの計測結果。時間は1操作あたりのナノ秒"""
+    def __init__(self, name: str, ops: int, samples_ns: list[float]):
+        self.name = name
+        self.ops = ops # 1回の計測で行った操作数
+        self.samples_ns = samples_ns # 計測ごとの1操作あたり時間
+
+    @property
+    def median_ns(self) -> float:
+        return statistics.median(self.samples_ns)
+
+    @property
+    def min_ns(self) -> float:
+        return min(self.samples_ns)
+
+    def to_dict(self) -> dict:
+        return {
+            "ops": self.ops,
+            "median_ns": round(self.median_ns, 1),
+            "min_ns": round(self.min_ns, 1),
+            "ops_per_sec": round(1e9 / self.median_ns, 1) if self.median_ns > 0 else None,
+        }
+
+def measure(name: str, run: Callable[[int], None], ops: int, repeat: int = 7, warmup: int = 1) -> BenchResult:
+    """
+    run(ops) を repeat 回計測する。run は渡された回数だけ操作を繰り返す関数。
+    最初の warmup 回は結果に含めない。
+    """
+    for _ in range(warmup):
+        run(ops)
+    samples = []
+    for _ in range(repeat):
+        start = perf_counter_ns()
+        run(ops)
+        samples.append((perf_counter_ns() - start) / ops)
+    return BenchResult(name, ops, samples)
+
+def environment() -> dict:
+    return {"python": sys.version.split()[0], "implementation": platform.python_implementation(), "machine": platform.machine()}
+
+def write_results(path: str, suite: str, results: list[BenchResult]):
+    data = {"suite": suite, "environment": environment(), "results": {result.name: result.to_dict() for result in results}}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+def load_results(path: str) -> dict[str, dict]:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)["results"]
+
+def compare(results: list[BenchResult], baseline: dict[str, dict],
+            threshold: float) -> list[tuple[str, float, float, float, bool]]:
+    """
+    ベースラインと中央値を比べ、(名前, 基準[ns], 今回[ns], 比, 後退したか) を返す。
+    比が 1 + threshold を超えたものを性能の後退とする。
+    """
+    rows = []
+    for result in results:
+        if result.name not in baseline:
+            continue
+        base = baseline[result.name]["median_ns"]
+        ratio = result.median_ns / base if base > 0 else float("inf")
+        rows.append((result.name, base, result.median_ns, ratio, ratio > 1 + threshold))
+    return rows
+
+def regressions(comparison: list[tuple[str, float, float, float, bool]] | None) -> list[str]:
+    """compare の結果のうち、後退したケースの名前"""
+    return [name for name, _, _, _, regressed in comparison or [] if regressed]
+
+def format_table(results: list[BenchResult], comparison: list[tuple[str, float, float, float, bool]] | None = None) -> str:
+    rows = {name: (ratio, regressed) for name, _, _, ratio, regressed in comparison or []}
+    lines = [f"{'case':<28}{'median':>12}{'min':>12}{'ops/s':>14}{'vs base':>10}"]
+    for result in results:
+        line = f"{result.name:<28}{_format_ns(result.median_ns):>12}{_format_ns(result.min_ns):>12}{1e9 / result.median_ns:>14,.0f}"
+        if result.name in rows:
+            ratio, regressed = rows[result.name]
+            line += f"{ratio:>9.2f}x{' !' if regressed else ''}"
+        lines.append(line)
+    return "\n".join(lines)
+
+def _format_ns(ns: float) -> str:
+    if ns >= 1e6:
+        return f"{ns / 1e6:.2f} ms"
+    if ns >= 1e3:
+        return f"{ns / 1e3:.2f} us"
+    return f"{ns:.0f} ns"
@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+import argparse
+import random
+import sys
+from typing import Callable
+from ..components.character import Character
+from ..components.monster import Monster
+from ..components.deck_manager import DeckManager
+from ..components.action_handler import ActionHandler
+from ..components.battle_engine import BattleEngine
+from ..components.battle_events import BattleEventLog
+from ..components.hand_solver import HandSolver
+from ..data.action_data import ACTIONS
+from ..data.monster_action_data import MONSTER_ACTIONS
+from ..data.deck_data import DECKS
+from ..simulation.headless import run_battle
+from .common import BenchResult, measure, write_results, load_results, compare, regressions, format_table
+
+# 乱数はすべて固定シードなので、同じコードなら毎回同じ処理量になる
+# 計測値は機械ごとに違うので、ベースラインはリポジトリに含めず、比べたい版で作る:
+#   python -m src.benchmarks.logic_bench --save-baseline logic_baseline.json   # 変更前
+#   python -m src.benchmarks.logic_bench --baseline logic_baseline.json        # 変更後（後退があれば終了コード1）
+SEED: int = 12345
+BIG_HP: int = 10 ** 9 # 計測中に倒れないようにする
+
+def _fighters() -> tuple[Character, Monster]:
+    player = Character("勇者", max_hp=BIG_HP, max_mp=3, attack_power=1, x=0, y=0)
+    monster = Monster("ベンチ", max_hp=BIG_HP, attack_power=10, actions=list(MONSTER_ACTIONS.keys()), x=0, y=0,
+                      rng=random.Random(SEED))
+    return player, monster
+
+def bench_player_action() -> Callable[[int], None]:
+    player, enemy = _fighters()
+    rng = random.Random(SEED)
+    events = BattleEventLog(keep_events=False)
+    action_ids = list(ACTIONS.keys())
+    def run(ops: int):
+        for i in range(ops):
+            player.current_mana = player.max_mana
+            ActionHandler.execute_player_action(player, enemy, action_ids[i % len(action_ids)], rng, events)
+    return run
+
+def bench_monster_action() -> Callable[[int], None]:
+    player, monster = _fighters()
+    rng = random.Random(SEED)
+    events = BattleEventLog(keep_events=False)
+    action_ids = list(MONSTER_ACTIONS.keys())
+    def run(ops: int):
+        for i in range(ops):
+            ActionHandler.execute_monster_action(monster, player, action_ids[i % len(action_ids)], rng, events)
+    return run
+
+def bench_take_damage() -> Callable[[int], None]:
+    """無防備あり / なしを交互に"""
+    plain, vulnerable = _fighters()
+    vulnerable.apply_status("vulnerable", BIG_HP)
+    def run(ops: int):
+        for i in range(ops):
+            (vulnerable if i & 1 else plain).take_damage(7)
+    return run
+
+def bench_decrement_status() -> Callable[[int], None]:
+    """状態異常を全種類付与してからターン終了処理を行う"""
+    character, _ = _fighters()
+    def run(ops: int):
+        for _ in range(ops):
+            character.apply_status("vulnerable", 2)
+            character.apply_status("weak", 1)
+            character.apply_status("regeneration", 3)
+            character.decrement_status_effects()
+    return run
+
+def bench_draw_cards() -> Callable[[int], None]:
+    """5枚引いて手札を捨てる（初期デッキ15枚なので3回に1回シャッフルが入る）"""
+    deck = DeckManager(DECKS["default"]["cards"], random.Random(SEED))
+    def run(ops: int):
+        for _ in range(ops):
+            deck.draw_cards(BattleEngine.HAND_SIZE)
+            deck.discard_hand()
+    return run
+
+def bench_display_power() -> Callable[[int], None]:
+    """キャッシュが効く場合（能力値が変わらないフレームの描画）"""
+    player, _ = _fighters()
+    player.apply_status("weak", BIG_HP)
+    action_ids = list(ACTIONS.keys())
+    def run(ops: int):
+        for i in range(ops):
+            ActionHandler.get_card_display_power(player, action_ids[i % len(action_ids)])
+    return run
+
+def bench_display_power_cold() -> Callable[[int], None]:
+    """毎回攻撃力を変えて stats_version を進め、キャッシュを捨ててから計算する場合"""
+    player, _ = _fighters()
+    player.apply_status("weak", BIG_HP)
+    base_attack = player.attack_power
+    action_ids = list(ACTIONS.keys())
+    def run(ops: int):
+        for i in range(ops):
+            player.attack_power = base_attack + (i & 1)
+            ActionHandler.get_card_display_power(player, action_ids[i % len(action_ids)])
+    return run
+
+def _bench_hand_solver(hand_size: int) -> Callable[[int], None]:
+    """1操作 = 手札1つ分の最善手の探索（毎回メモを空にする）。手札はデッキからシード固定で作る"""
+    player, enemy = _fighters()
+    player.current_hp = player.max_hp = 100
+    enemy.current_hp = enemy.max_hp = 200
+    rng = random.Random(SEED)
+    deck = DECKS["default"]["cards"]
+    hands = [rng.sample(deck, hand_size) for _ in range(64)]
+    intents = list(MONSTER_ACTIONS.keys())
+    solver = HandSolver()
+    def run(ops: int):
+        for i in range(ops):
+            solver.clear()
+            solver.solve(player, enemy, hands[i % len(hands)], (), intents[i % len(intents)])
+    return run
+
+def bench_hand_solver() -> Callable[[int], None]:
+    return _bench_hand_solver(BattleEngine.HAND_SIZE)
+
+def bench_hand_solver_large() -> Callable[[int], None]:
+    """10枚の手札（マナ3なので使える枚数は変わらないが、候補の組み合わせが増える）"""
+    return _bench_hand_solver(10)
+
+def bench_headless_battle() -> Callable[[int], None]:
+    """シード固定の戦闘を最後まで（1操作 = 1戦闘）"""
+    def run(ops: int):
+        for i in range(ops):
+            run_battle(BattleEngine(initial_deck=DECKS["default"]["cards"], seed=SEED + i, keep_log=False))
+    return run
+
+def _bench_enemy_phase(encounter_id: str | None) -> Callable[[int], None]:
+    """1操作 = 敵のターン1回分（全員の行動・次のインテント・状態異常の経過・ドロー）。プレイヤーは倒れない"""
+    engine = BattleEngine(monster_id="slime", encounter_id=encounter_id, seed=SEED, keep_log=False)
+    engine.player.max_hp = engine.player.current_hp = 10 ** 9
+    def run(ops: int):
+        for _ in range(ops):
+            engine.end_turn()
+            engine.enemy_turn()
+    return run
+
+def bench_enemy_phase() -> Callable[[int], None]:
+    return _bench_enemy_phase(None)
+
+def bench_enemy_phase_8() -> Callable[[int], None]:
+    """スライム8体。敵1体のケースとの比が敵の数にほぼ比例していればよい"""
+    return _bench_enemy_phase("slime_swarm")
+
+# (名前, 準備関数, 1回の計測の操作数)
+CASES: list[tuple[str, Callable[[], Callable[[int], None]], int]] = [
+    ("player_action", bench_player_action, 20000),
+    ("monster_action", bench_monster_action, 20000),
+    ("take_damage", bench_take_damage, 50000),
+    ("decrement_status", bench_decrement_status, 20000),
+    ("draw_cards", bench_draw_cards, 20000),
+    ("display_power", bench_display_power, 50000),
+    ("display_power_cold", bench_display_power_cold, 50000),
+    ("hand_solver", bench_hand_solver, 2000),
+    ("hand_solver_large", bench_hand_solver_large, 1000),
+    ("headless_battle", bench_headless_battle, 300),
+    ("enemy_phase", bench_enemy_phase, 20000),
+    ("enemy_phase_8", bench_enemy_phase_8, 5000),
+]
+
+def run_suite(names: list[str] | None = None, repeat: int = 7, scale: float = 1.0) -> list[BenchResult]:
+    """scale で操作数を増減できる（CIで短く回すときなど）"""
+    results = []
+    for name, setup, ops in CASES:
+        if names and name not in names:
+            continue
+        results.append(measure(name, setup(), max(1, int(ops * scale)), repeat))
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="ゲームロジックのホットパスのベンチマーク")
+    parser.add_argument("cases", nargs="*", help=f"実行するケース（省略時は全て）: {', '.join(name for name, _, _ in CASES)}")
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--scale", type=float, default=1.0, help="操作数の倍率")
+    parser.add_argument("--json", default=None, help="結果をJSONで書き出すパス")
+    parser.add_argument("--baseline", default=None, help="比較するベースラインのJSON")
+    parser.add_argument("--save-baseline", default=None, help="今回の結果をベースラインとして保存するパス")
+    parser.add_argument("--threshold", type=float, default=0.15, help="中央値がベースラインよりこの割合以上遅ければ後退とみなす")
+    args = parser.parse_args()
+
+    results = run_suite(args.cases or None, args.repeat, args.scale)
+    comparison = compare(results, load_results(args.baseline), args.threshold) if args.baseline else None
+    print(format_table(results, comparison))
+
+    if args.json:
+        write_results(args.json, "logic", results)
+    if args.save_baseline:
+        write_results(args.save_baseline, "logic", results)
+
+    slower = regressions(comparison)
+    if slower:
+        print(f"ベースラインより遅くなったケース: {', '.join(slower)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
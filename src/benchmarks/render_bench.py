@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy") # ディスプレイのないCIでも動かす
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import json
+import sys
+from typing import Callable
+import pygame
+from ..scenes.battle_scene import BattleScene
+from ..views.battle_view import BattleView
+from ..views.frame_profiler import FrameProfiler
+from ..data.action_data import ACTIONS
+from ..data.status_effect_data import STATUS_EFFECTS
+from .common import environment
+
+SEED: int = 12345
+
+# ドロワーごとの1フレームあたりの予算 [ms]（p95で判定）
+DEFAULT_BUDGETS_MS: dict[str, float] = {
+    "player": 1.5,
+    "enemy": 1.5,
+    "relics": 0.5,
+    "ui": 1.0,
+    "commands": 2.5,
+    "present": 3.0,
+    "work": 8.0,
+}
+
+# --- 計測する画面状態 ---
+# setup(scene) で状態を作り、step(scene, frame) があれば毎フレーム少しずつ変える
+
+def _new_scene() -> BattleScene:
+    scene = BattleScene()
+    scene.reset(SEED)
+    return scene
+
+def setup_large_hand(scene: BattleScene):
+    hand = scene.deck_manager.hand
+    action_ids = list(ACTIONS.keys())
+    while len(hand) < 10:
+        hand.append(action_ids[len(hand) % len(action_ids)])
+
+def setup_hovered_card(scene: BattleScene):
+    scene.hovered_card_index = 2
+
+def step_hover_sweep(scene: BattleScene, frame: int):
+    """毎フレーム別のカードにホバーする（カード面のキャッシュが効いているかを見る）"""
+    scene.hovered_card_index = frame % len(scene.deck_manager.hand)
+
+def setup_hint(scene: BattleScene):
+    scene.show_hint = True
+
+def setup_many_statuses(scene: BattleScene):
+    for character in (scene.player, scene.enemy):
+        for i, status_id in enumerate(STATUS_EFFECTS):
+            character.apply_status(status_id, i + 2)
+
+def setup_full_log(scene: BattleScene):
+    scene.end_player_turn() # 敵のターン中はログエリアが表示される
+    for i in range(scene.max_log_lines * 2):
+        scene.add_log(f"ログ {i}: {scene.enemy.name}に{i * 7}ダメージ！ 長めの文章で一行を埋める")
+
+def step_log_scroll(scene: BattleScene, frame: int):
+    """毎フレームログが1行増える（文字列描画のキャッシュが効かない最悪ケース）"""
+    scene.add_log(f"フレーム {frame}: {scene.player.name}は「斬撃」を使った！")
+
+def setup_relic_hover(scene: BattleScene):
+    scene.hovered_relic_index = 0
+
+def setup_game_over(scene: BattleScene):
+    """敵のHPを1にして、攻撃カードで倒す"""
+    scene.enemy.current_hp = 1
+    for i in range(len(scene.deck_manager.hand)):
+        if scene.game_over:
+            break
+        scene.engine.play_card(i)
+
+def setup_eight_enemies(scene: BattleScene):
+    scene.encounter_id = "slime_swarm"
+    scene.reset(SEED)
+
+def step_enemy_hits(scene: BattleScene, frame: int):
+    """6フレームごとに別の敵のHPを減らす（複数の敵のHPバーとダメージ数値の演出が重なる）"""
+    if frame % 6:
+        return
+    enemies = scene.enemies
+    enemy = enemies[frame // 6 % len(enemies)]
+    enemy.current_hp = max(1, enemy.current_hp - 3)
+
+STATES: list[tuple[str, Callable[[BattleScene], None] | None, Callable[[BattleScene, int], None] | None]] = [
+    ("opening", None, None),
+    ("large_hand", setup_large_hand, None),
+    ("hovered_card", setup_hovered_card, None),
+    ("hover_sweep", setup_large_hand, step_hover_sweep),
+    ("hint", setup_hint, None),
+    ("many_statuses", setup_many_statuses, None),
+    ("relic_hover", setup_relic_hover, None),
+    ("full_log", setup_full_log, None),
+    ("log_scroll", setup_full_log, step_log_scroll),
+    ("game_over", setup_game_over, None),
+    ("eight_enemies", setup_eight_enemies, None),
+    ("enemies_hit", setup_eight_enemies, step_enemy_hits),
+]
+
+def run_state(view: BattleView, setup, step, frames: int) -> dict[str, tuple[float, float, float]]:
+    """1つの画面状態を frames フレーム描画し、区間ごとの (p50, p95, max) [ms] を返す"""
+    scene = _new_scene()
+    if setup:
+        setup(scene)
+
+    # enabled のままだとオーバーレイも描かれるので、計測（begin_frame / end_frame）だけを使う
+    profiler = FrameProfiler(window=frames, stats_interval=frames)
+    view.profiler = profiler
+    view._last_layer_keys = None # 差分描画モードでも最初のフレームは全体を描く
+    view.draw(scene) # 1フレーム目はキャッシュの作成なので計測しない
+    for frame in range(frames):
+        if step:
+            step(scene, frame)
+        profiler.begin_frame()
+        view.draw(scene)
+        profiler.end_frame()
+    view.profiler = None
+    return profiler.stats
+
+def check_budgets(results: dict[str, dict], budgets: dict[str, float]) -> list[tuple[str, str, float, float]]:
+    """(状態, 区間, p95, 予算) の予算超過の一覧"""
+    violations = []
+    for state, stats in results.items():
+        for stage, budget in budgets.items():
+            if stage in stats and stats[stage][1] > budget:
+                violations.append((state, stage, stats[stage][1], budget))
+    return violations
+
+def format_report(results: dict[str, dict], budgets: dict[str, float]) -> str:
+    stages = FrameProfiler.STAGES[2:] + (FrameProfiler.WORK,) # 入力・更新は描画ベンチでは測らない
+    lines = [f"{'state':<16}" + "".join(f"{stage:>10}" for stage in stages) + "   (p95 ms)"]
+    for state, stats in results.items():
+        cells = []
+        for stage in stages:
+            p95 = stats.get(stage, (0.0, 0.0, 0.0))[1]
+            over = stage in budgets and p95 > budgets[stage]
+            cells.append(f"{p95:>9.3f}{'!' if over else ' '}")
+        lines.append(f"{state:<16}" + "".join(cells))
+    lines.append(f"{'budget':<16}" + "".join(f"{budgets[stage]:>9.3f} " if stage in budgets else f"{'-':>10}" for stage in stages))
+    return "\n".join(lines)
+
+def _parse_budget(text: str) -> tuple[str, float]:
+    stage, _, value = text.partition("=")
+    return stage, float(value)
+
+def main():
+    parser = argparse.ArgumentParser(description="BattleView の描画時間をドロワーごとに計測し、予算と比べる")
+    parser.add_argument("states", nargs="*", help=f"計測する状態（省略時は全て）: {', '.join(name for name, _, _ in STATES)}")
+    parser.add_argument("--frames", type=int, default=120)
+    parser.add_argument("--dirty", action="store_true", help="差分描画モードで計測する")
+    parser.add_argument("--budget", action="append", type=_parse_budget, default=[], metavar="STAGE=MS",
+                        help="予算を上書きする（例: --budget ui=2.5）")
+    parser.add_argument("--json", default=None, help="結果をJSONで書き出すパス")
+    args = parser.parse_args()
+
+    budgets = dict(DEFAULT_BUDGETS_MS)
+    budgets.update(args.budget)
+
+    pygame.init()
+    view = BattleView(dirty_rects=args.dirty)
+    results = {}
+    for name, setup, step in STATES:
+        if args.states and name not in args.states:
+            continue
+        results[name] = run_state(view, setup, step, args.frames)
+    pygame.quit()
+
+    print(format_report(results, budgets))
+    violations = check_budgets(results, budgets)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({
+                "suite": "render", "environment": environment(), "dirty_rects": args.dirty, "frames": args.frames,
+                "budgets_ms": budgets,
+                "results": {state: {stage: {"p50": p50, "p95": p95, "max": worst} for stage, (p50, p95, worst) in stats.items()}
+                            for state, stats in results.items()},
+                "violations": [{"state": state, "stage": stage, "p95": p95, "budget": budget}
+                               for state, stage, p95, budget in violations],
+            }, f, ensure_ascii=False, indent=2)
+
+    for state, stage, p95, budget in violations:
+        print(f"予算超過: {state} / {stage}: p95 {p95:.3f} ms > {budget:.3f} ms")
+    if violations:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+import random
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterator, Mapping
+from .character import Character
+from .battle_events import BattleEventLog, EVENT_DAMAGE, EVENT_BLOCK, EVENT_STATUS_APPLIED
+from ..data.catalog import ACTION_CATALOG, MONSTER_ACTION_CATALOG, RUNTIME_PACK
+from ..data.status_effect_data import STATUS_EFFECTS
+
+# --- 効果ステップ ---
+# 行動定義は一度だけ検査され、以下のステップの列に変換される
+# （コンテンツパックの定義は作成時に検査し、最初に使われたときに変換する）。
+# 実行時は辞書を引かずにステップを順に実行するだけになる。
+# 乱数は呼び出し側（BattleEngine）が持つ戦闘ごとの乱数列を受け取って使う。
+# 結果は文章ではなくイベントとして events に送る。
+
+class EffectStep(ABC):
+    __slots__ = ()
+
+    @abstractmethod
+    def execute(self, source: Character, target: Character, events: BattleEventLog, rng: random.Random):
+        """source の行動として target に効果を与え、結果を events に送る"""
+
+    def display_value(self, source: Character) -> int | None:
+        """カードに表示する数値。表示しないステップはNone"""
+        return None
+
+class DealPhysicalDamage(EffectStep):
+    """威力 + 攻撃力の物理ダメージ（与ダメージ系の状態異常で増減、±10%のぶれあり）"""
+    __slots__ = ("power",)
+
+    def __init__(self, power: int):
+        self.power = power
+
+    def execute(self, source: Character, target: Character, events: BattleEventLog, rng: random.Random):
+        base_power = source.modify_outgoing_damage(self.power)
+        base_damage = base_power + source.attack_power # attack_powerを加算
+        spread = int(base_damage * 0.1)
+        damage = max(1, base_damage + rng.randint(-spread, spread))
+        actual_damage = target.take_damage(damage)
+        events.emit(EVENT_DAMAGE, target.name, actual_damage)
+
+    def display_value(self, source: Character) -> int | None:
+        return source.modify_outgoing_damage(self.power + source.attack_power)
+
+class DealFixedDamage(EffectStep):
+    """威力そのままの魔法ダメージ"""
+    __slots__ = ("power",)
+
+    def __init__(self, power: int):
+        self.power = power
+
+    def execute(self, source: Character, target: Character, events: BattleEventLog, rng: random.Random):
+        actual_damage = target.take_damage(self.power)
+        events.emit(EVENT_DAMAGE, target.name, actual_damage)
+
+    def display_value(self, source: Character) -> int | None:
+        return source.modify_outgoing_damage(self.power)
+
+class DealScaledDamage(EffectStep):
+    """モンスターの攻撃力 × 倍率のダメージ"""
+    __slots__ = ("multiplier",)
+
+    def __init__(self, multiplier: float):
+        self.multiplier = multiplier
+
+    def execute(self, source: Character, target: Character, events: BattleEventLog, rng: random.Random):
+        actual_damage = target.take_damage(int(source.attack_power * self.multiplier))
+        events.emit(EVENT_DAMAGE, target.name, actual_damage)
+
+    def display_value(self, source: Character) -> int | None:
+        return int(source.attack_power * self.multiplier)
+
+class AddBlock(EffectStep):
+    """次に受けるダメージを軽減する"""
+    __slots__ = ("amount",)
+
+    def __init__(self, amount: int):
+        self.amount = amount
+
+    def execute(self, source: Character, target: Character, events: BattleEventLog, rng: random.Random):
+        source.defense_buff = self.amount
+        events.emit(EVENT_BLOCK, source.name, self.amount)
+
+    def display_value(self, source: Character) -> int | None:
+        return self.amount
+
+class ApplyStatus(EffectStep):
+    """状態異常を付与する"""
+    __slots__ = ("status_id", "turns", "to_self")
+
+    def __init__(self, status_id: str, turns: int, to_self: bool):
+        self.status_id = status_id
+        self.turns = turns
+        self.to_self = to_self
+
+    def execute(self, source: Character, target: Character, events: BattleEventLog, rng: random.Random):
+        character = source if self.to_self else target
+        character.apply_status(self.status_id, self.turns)
+        events.emit(EVENT_STATUS_APPLIED, character.name, self.status_id)
+
+class CompiledAction:
+    __slots__ = ("action_id", "name", "cost", "steps", "message")
+
+    def __init__(self, action_id: str, name: str, cost: int, steps: tuple[EffectStep, ...], message: str = ""):
+        self.action_id = action_id
+        self.name = name
+        self.cost = cost
+        self.steps = steps
+        self.message = message
+
+    def execute(self, source: Character, target: Character, events: BattleEventLog, rng: random.Random):
+        for step in self.steps:
+            step.execute(source, target, events, rng)
+
+    def display_value(self, source: Character) -> int | None:
+        for step in self.steps:
+            value = step.display_value(source)
+            if value is not None:
+                return value
+        return None
+
+# --- 定義データの検査と変換 ---
+
+def _require(definition: dict, key: str, action_id: str):
+    if key not in definition:
+        raise ValueError(f"行動 '{action_id}' に '{key}' がありません")
+    return definition[key]
+
+def _status_step(status_id: str, turns: int, to_self: bool, action_id: str) -> ApplyStatus:
+    if status_id not in STATUS_EFFECTS:
+        raise ValueError(f"行動 '{action_id}' の状態異常 '{status_id}' は定義されていません")
+    return ApplyStatus(status_id, turns, to_self)
+
+def compile_player_action(action_id: str, action: dict) -> CompiledAction:
+    action_type = _require(action, "type", action_id)
+    steps: list[EffectStep] = []
+
+    if action_type == "attack":
+        damage_type = action.get("damage_type", "physical")
+        power = _require(action, "power", action_id)
+        if damage_type == "physical":
+            steps.append(DealPhysicalDamage(power))
+        elif damage_type == "magical":
+            steps.append(DealFixedDamage(power))
+        else:
+            raise ValueError(f"行動 '{action_id}' の damage_type '{damage_type}' は未対応です")
+    elif action_type == "skill":
+        if "block" in action:
+            steps.append(AddBlock(action["block"]))
+        if "effect" in action:
+            # スキルの対象を決定 (デフォルトは敵)
+            steps.append(_status_step(action["effect"], action.get("power", 1), action.get("target") == "self", action_id))
+    else:
+        raise ValueError(f"行動 '{action_id}' の type '{action_type}' は未対応です")
+
+    return CompiledAction(action_id, _require(action, "name", action_id), _require(action, "cost", action_id), tuple(steps))
+
+def compile_monster_action(action_id: str, action: dict) -> CompiledAction:
+    action_type = _require(action, "type", action_id)
+    steps: list[EffectStep] = []
+
+    if action_type == "attack" or action_type == "attack_debuff":
+        steps.append(DealScaledDamage(_require(action, "power", action_id)))
+        if "effect" in action:
+            steps.append(_status_step(action["effect"], action.get("effect_power", 1), False, action_id))
+    elif action_type != "wait":
+        raise ValueError(f"モンスター行動 '{action_id}' の type '{action_type}' は未対応です")
+
+    return CompiledAction(action_id, _require(action, "name", action_id), 0, tuple(steps), _require(action, "message", action_id))
+
+class CompiledActionTable(Mapping):
+    """
+    行動ID → CompiledAction。IDの集合・件数・反復は定義（カタログ）と同じで、
+    各行動は最初に引かれたときにコンパイルする。
+    """
+    def __init__(self, definitions: Mapping[str, dict], compile_action: Callable[[str, dict], CompiledAction]):
+        self.definitions = definitions
+        self._compile_action = compile_action
+        self._compiled: dict[str, CompiledAction] = {}
+
+    def __getitem__(self, action_id: str) -> CompiledAction:
+        action = self._compiled.get(action_id)
+        if action is None:
+            action = self._compiled[action_id] = self._compile_action(action_id, self.definitions[action_id])
+        return action
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.definitions)
+
+    def __len__(self) -> int:
+        return len(self.definitions)
+
+    def __contains__(self, action_id: object) -> bool:
+        return action_id in self.definitions
+
+    def get(self, action_id: str, default: CompiledAction | None = None) -> CompiledAction | None:
+        """定義にないIDなら default。定義の誤り（ValueError）はそのまま送る"""
+        if action_id not in self.definitions:
+            return default
+        return self[action_id]
+
+    def compile_all(self) -> list[str]:
+        """全行動をコンパイルし、定義の誤りの一覧を返す（空なら問題なし）"""
+        errors = []
+        for action_id in self.definitions:
+            try:
+                self[action_id]
+            except ValueError as e:
+                errors.append(str(e))
+        return errors
+
+def check_action_definitions(catalogs: Mapping[str, Mapping[str, dict]]) -> list[str]:
+    """行動とモンスター行動の定義をすべてコンパイルしてみて、誤りの一覧を返す（コンテンツパックの検査用）"""
+    return (CompiledActionTable(catalogs.get("actions", {}), compile_player_action).compile_all()
+            + CompiledActionTable(catalogs.get("monster_actions", {}), compile_monster_action).compile_all())
+
+COMPILED_ACTIONS: CompiledActionTable = CompiledActionTable(ACTION_CATALOG, compile_player_action)
+COMPILED_MONSTER_ACTIONS: CompiledActionTable = CompiledActionTable(MONSTER_ACTION_CATALOG, compile_monster_action)
+
+# パックの定義は作成時に検査済みなので、使われたときにコンパイルする。
+# 組み込みの定義を使うときは、戦闘の途中で誤りに気づかないよう起動時に全行動をコンパイルする
+if RUNTIME_PACK is None:
+    _errors = COMPILED_ACTIONS.compile_all() + COMPILED_MONSTER_ACTIONS.compile_all()
+    if _errors:
+        raise ValueError("行動の定義に問題があります:\n" + "\n".join(_errors))
+
+# カードIDを小さな整数に割り当てる（DeckManagerはこの番号で山札と捨て札を持つ）
+ACTION_IDS: tuple[str, ...] = ACTION_CATALOG.ids
+ACTION_INDEX: dict[str, int] = {action_id: i for i, action_id in enumerate(ACTION_IDS)}
@@ -1,101 +1,68 @@
 # -*- coding: utf-8 -*-
-import math
 import random
 from .character import Character
-from ..data.action_data import ACTIONS
-from ..data.monster_action_data import MONSTER_ACTIONS
-from ..data.status_effect_data import STATUS_EFFECTS
+from .action_compiler import COMPILED_ACTIONS, COMPILED_MONSTER_ACTIONS, CompiledAction
+from .battle_events import BattleEventLog, EVENT_CARD_PLAYED, EVENT_NOT_ENOUGH_MANA, EVENT_MONSTER_ACTION
 
 class ActionHandler:
     @staticmethod
-    def execute_player_action(player: Character, enemy: Character, action_id: str) -> list[str]:
-        action = ACTIONS[action_id]
-        log = []
+    def execute_player_action(player: Character, enemy: Character, action_id: str, rng: random.Random,
+                              events: BattleEventLog) -> bool:
+        """行動を実行し、結果をイベントとして events に送る。マナ不足で使えなければFalse"""
+        action = COMPILED_ACTIONS[action_id]
 
-        if not player.use_mana(action["cost"]):
-            log.append("マナが足りない！")
-            return log
+        if not player.use_mana(action.cost):
+            events.emit(EVENT_NOT_ENOUGH_MANA, player.name)
+            return False
 
-        log.append(f"{player.name}は「{action['name']}」を使った！")
+        events.emit(EVENT_CARD_PLAYED, player.name, action)
+        action.execute(player, enemy, events, rng)
+        return True
 
-        action_type = action["type"]
-        if action_type == "attack":
-            damage_type = action.get("damage_type", "physical")
-            if damage_type == "physical":
-                base_power = action["power"]
-                if "weak" in player.status_effects:
-                    base_power = math.ceil(base_power * STATUS_EFFECTS["weak"]["value"])
-                base_damage = base_power + player.attack_power # attack_powerを加算
-                damage_variance = random.randint(-int(base_damage * 0.1), int(base_damage * 0.1))
-                damage = max(1, base_damage + damage_variance)
-                actual_damage = enemy.take_damage(damage)
-                log.append(f"{enemy.name}に{actual_damage}ダメージ！")
-            elif damage_type == "magical":
-                damage = action["power"]
-                actual_damage = enemy.take_damage(damage)
-                log.append(f"{enemy.name}に{actual_damage}ダメージ！")
-        
-        elif action_type == "skill":
-            if action_id == "guard":
-                player.defense_buff = action["power"]
-                log.append(f"{player.name}は防御の構えをとった！")
-            elif "effect" in action:
-                # スキルの対象を決定 (デフォルトは敵)
-                if action.get("target") == "self":
-                    target_character = player
-                    target_name = player.name
-                else:
-                    target_character = enemy
-                    target_name = enemy.name
-
-                status_id = action["effect"]
-                turns = action.get("power", 1)
-                target_character.apply_status(status_id, turns)
-                status_name = STATUS_EFFECTS[status_id]["name"]
-                log.append(f"{target_name}は{status_name}になった！")
-
-        return log
+    @staticmethod
+    def execute_monster_action(monster: Character, player: Character, action_id: str, rng: random.Random,
+                               events: BattleEventLog):
+        action = COMPILED_MONSTER_ACTIONS[action_id]
+        events.emit(EVENT_MONSTER_ACTION, monster.name, action)
+        action.execute(monster, player, events, rng)
 
     @staticmethod
-    def execute_monster_action(monster: Character, player: Character, action_id: str) -> list[str]:
-        action_data = MONSTER_ACTIONS[action_id]
-        log = [action_data["message"].format(monster_name=monster.name, action_name=action_data["name"])]
+    def build_enemy_action_table(monsters: list[Character]) -> list[tuple[Character, CompiledAction]]:
+        """生きている敵のインテントを行動順の (モンスター, コンパイル済みの行動) の表にする（インテントが決まったときに1回だけ）"""
+        return [(monster, COMPILED_MONSTER_ACTIONS[monster.next_action])
+                for monster in monsters if monster.is_alive and monster.next_action is not None]
 
-        action_type = action_data["type"]
-        if action_type == "attack" or action_type == "attack_debuff":
-            power = action_data["power"]
-            base_damage = int(monster.attack_power * power)
-            actual_damage = player.take_damage(base_damage)
-            log.append(f"{player.name}に{actual_damage}ダメージ！")
-            if "effect" in action_data:
-                player.apply_status(action_data["effect"], action_data.get("effect_power", 1))
-                log.append(f"{player.name}は{STATUS_EFFECTS[action_data['effect']]['name']}になった！")
-        
-        return log
+    @staticmethod
+    def execute_enemy_phase(action_table: list[tuple[Character, CompiledAction]], player: Character,
+                            rng: random.Random, events: BattleEventLog):
+        """
+        敵全員の行動を表の順に1回の走査で解決する。
+        表を作ったあとにプレイヤーの手番で倒れた敵は飛ばし、プレイヤーが倒れたらそこで止める。
+        """
+        for monster, action in action_table:
+            if not monster.is_alive:
+                continue
+            events.emit(EVENT_MONSTER_ACTION, monster.name, action)
+            action.execute(monster, player, events, rng)
+            if not player.is_alive:
+                break
 
     @staticmethod
     def get_card_display_power(player: Character, action_id: str) -> int | None:
         """
         カードに表示するための最終的な威力/防御値を計算する。
         表示する値がない場合はNoneを返す。
+        攻撃力・状態異常が変わるまでは前回の値を使う（Character.cached_stat）。
         """
-        action = ACTIONS.get(action_id)
+        action = COMPILED_ACTIONS.get(action_id)
         if not action:
             return None
+        return player.cached_stat(action, action.display_value)
 
-        action_type = action.get("type")
-        power = action.get("power")
-
-        if action_type == "attack":
-            base_power = power
-            if action.get("damage_type") == "physical":
-                base_power += player.attack_power
-            
-            if "weak" in player.status_effects:
-                base_power = math.ceil(base_power * STATUS_EFFECTS["weak"]["value"])
-            
-            return base_power
-        elif action_id == "guard": # "防御"カード
-            return power
-        
-        return None
\ No newline at end of file
+    @staticmethod
+    def get_intent_display_power(monster: Character, action_id: str) -> int | None:
+        """モンスターのインテントに表示するダメージ。ダメージを与えない行動はNone"""
+        action = COMPILED_MONSTER_ACTIONS.get(action_id)
+        if not action:
+            return None
+        return monster.cached_stat(action, action.display_value)
@@ -0,0 +1,247 @@
+# -*- coding: utf-8 -*-
+import hashlib
+import random
+from array import array
+from .character import Character
+from .monster import Monster
+from .deck_manager import DeckManager
+from .action_handler import ActionHandler
+from .action_compiler import COMPILED_ACTIONS
+from .battle_record import BattleRecord, END_TURN, DECISION_TYPECODE, select_target_decision
+from .battle_events import (BattleEventLog, EVENT_MESSAGE, EVENT_BATTLE_START, EVENT_TURN_ENDED,
+                            EVENT_ENEMY_DEFEATED, EVENT_PLAYER_DEFEATED, EVENT_DECK_EMPTY)
+from ..data.catalog import MONSTER_CATALOG, RELIC_CATALOG, ENCOUNTER_CATALOG
+from ..data.deck_data import DECKS
+from ..config import settings
+
+class BattleEngine:
+    """
+    描画やイベントループに依存しない戦闘ルール本体。
+    BattleSceneはこれをラップして入力と待機時間だけを扱う。
+    乱数はすべて seed から用途ごとに分けた乱数列を使うので、
+    同じ seed と同じプレイヤーの選択 (decisions) からは必ず同じ戦闘が再現される。
+    encounter_id を指定すると、その編成の敵全員と同時に戦う（プレイヤーの攻撃は選んだ1体に当たる）。
+    """
+    HAND_SIZE: int = 5
+
+    def __init__(self, monster_id: str | None = None, initial_deck: list[str] | None = None, max_log_lines: int = 4,
+                 seed: int | None = None, keep_log: bool = True, monster_policy=None, encounter_id: str | None = None):
+        if encounter_id is not None and encounter_id not in ENCOUNTER_CATALOG:
+            raise ValueError(f"敵の編成 '{encounter_id}' はありません")
+        self.monster_id = monster_id
+        self.encounter_id = encounter_id
+        self.monster_policy = monster_policy # モンスターの行動AI。Noneならランダム
+        self.initial_deck = initial_deck
+        self.max_log_lines: int = max_log_lines
+        self.keep_log = keep_log # Falseならイベントは数えるだけで記録しない（シミュレーション用）
+        self.seed: int = seed if seed is not None else random.getrandbits(64)
+        self.reset()
+
+    def _stream(self, name: str) -> random.Random:
+        """シードから用途ごとの独立した乱数列を作る（ある用途で引く回数が変わっても他に影響しない）"""
+        return random.Random(f"{self.seed}:{name}")
+
+    def reset(self):
+        """同じシードで戦闘を最初からやり直す"""
+        self.damage_rng = self._stream("damage")
+
+        # --- モンスターの生成 ---
+        if self.encounter_id is not None:
+            monster_ids = ENCOUNTER_CATALOG[self.encounter_id]["monsters"]
+        else:
+            monster_ids = [self.monster_id or MONSTER_CATALOG.choice(self._stream("monster_pick"))] # 指定がなければランダムに選ぶ
+        self.current_monster_id: str = monster_ids[0]
+
+        self.player = Character("勇者", max_hp=100, max_mp=3, attack_power=0, x=150, y=settings.SCREEN_HEIGHT // 2 - 100)
+        self.enemies: list[Monster] = [self._create_monster(monster_ids, i) for i in range(len(monster_ids))]
+        self.target_index: int = 0 # プレイヤーの攻撃対象
+        self.enemies_alive: int = len(self.enemies)
+        self.defeated_mask: int = 0 # 倒れたことを通知済みの敵のビットマスク
+
+        # ゲーム状態
+        self.turn: str = "player"
+        self.turn_count: int = 1
+        self.events = BattleEventLog(self.max_log_lines, self.keep_log)
+        self.game_over: bool = False
+        self.winner: str | None = None
+        self.used_card_indices: set[int] = set()
+        self.decisions: array = array(DECISION_TYPECODE) # プレイヤーの選択の記録
+
+        initial_deck = self.initial_deck if self.initial_deck is not None else DECKS["default"]["cards"]
+        self.current_deck: list[str] = list(initial_deck)
+        self.deck_manager = DeckManager(initial_deck, self._stream("deck"))
+        self.deck_manager.draw_cards(self.HAND_SIZE)
+
+        # レリックの初期化と効果の適用
+        self.player.relics.extend(RELIC_CATALOG.by("tags", "starter"))
+        for relic_id in self.player.relics:
+            relic_data = RELIC_CATALOG.get(relic_id)
+            if relic_data and "effects" in relic_data:
+                for effect in relic_data["effects"]:
+                    if effect["type"] == "stat_change" and effect["stat"] == "attack_power":
+                        self.player.attack_power += effect["value"]
+
+        # 最初のインテントを決定（レリック適用後の状態を見る）
+        for enemy in self.enemies:
+            enemy.decide_next_action(self.player, self.deck_manager)
+        self.enemy_actions = ActionHandler.build_enemy_action_table(self.enemies) # 次の敵のターンの行動表
+
+        self.events.emit(EVENT_BATTLE_START)
+
+    def _create_monster(self, monster_ids: list[str], index: int) -> Monster:
+        monster_data = MONSTER_CATALOG[monster_ids[index]]
+        name = monster_data["name"]
+        if monster_ids.count(monster_ids[index]) > 1:
+            name += chr(ord("A") + monster_ids[:index].count(monster_ids[index])) # 同じモンスターは A, B, ... で区別する
+        # 行動選択の乱数は敵ごとに分ける（1体目は1対1の戦闘と同じ乱数列）
+        stream = "monster_ai" if index == 0 else f"monster_ai:{index}"
+        return Monster(name=name, max_hp=monster_data["max_hp"], attack_power=monster_data["attack_power"],
+                       actions=monster_data["actions"], x=settings.SCREEN_WIDTH - 200, y=settings.SCREEN_HEIGHT // 2 - 100,
+                       rng=self._stream(stream), policy=self.monster_policy)
+
+    @property
+    def enemy(self) -> Monster:
+        """プレイヤーの攻撃対象（敵が1体ならその敵）"""
+        return self.enemies[self.target_index]
+
+    @property
+    def battle_log(self) -> list[str]:
+        """表示用のログ。イベントから必要になったときに文章を作る"""
+        return self.events.lines()
+
+    def add_log(self, message: str):
+        self.events.emit(EVENT_MESSAGE, message)
+
+    def _check_game_over(self):
+        # 攻撃対象以外の敵が倒れることもあるので、敵全員を見て新しく倒れた敵ごとに通知する
+        defeated = 0
+        for i, enemy in enumerate(self.enemies):
+            if not enemy.is_alive and not self.defeated_mask >> i & 1:
+                self.defeated_mask |= 1 << i
+                self.events.emit(EVENT_ENEMY_DEFEATED, enemy.name)
+                defeated += 1
+        if defeated:
+            self.enemies_alive -= defeated
+            if self.enemies_alive == 0:
+                self.game_over = True
+                self.winner = "player"
+            elif not self.enemy.is_alive:
+                # 攻撃対象は生きている一番左の敵に移す（状態だけで決まるので記録しない）
+                self.target_index = next(i for i, enemy in enumerate(self.enemies) if enemy.is_alive)
+        elif not self.player.is_alive:
+            self.events.emit(EVENT_PLAYER_DEFEATED, self.player.name)
+            self.game_over = True
+            self.winner = "enemy"
+
+    def can_play_card(self, card_index: int) -> bool:
+        """手札の指定カードが今使えるかどうか"""
+        if self.turn != "player" or self.game_over:
+            return False
+        if not 0 <= card_index < len(self.deck_manager.hand) or card_index in self.used_card_indices:
+            return False
+        return self.player.current_mana >= COMPILED_ACTIONS[self.deck_manager.hand[card_index]].cost
+
+    def can_select_target(self, enemy_index: int) -> bool:
+        if self.turn != "player" or self.game_over:
+            return False
+        return 0 <= enemy_index < len(self.enemies) and self.enemies[enemy_index].is_alive
+
+    def select_target(self, enemy_index: int) -> bool:
+        """プレイヤーの攻撃対象を選ぶ。選べなければFalse"""
+        if not self.can_select_target(enemy_index):
+            return False
+        if enemy_index != self.target_index:
+            self.target_index = enemy_index
+            self.decisions.append(select_target_decision(enemy_index))
+        return True
+
+    def play_card(self, card_index: int, target_index: int | None = None) -> bool:
+        """
+        手札のカードを使用する。target_index を渡すと、その敵を攻撃対象にしてから使う。
+        使用できた場合はTrue、使えなかった場合はFalseを返す。
+        """
+        if not self.can_play_card(card_index):
+            return False
+        if target_index is not None and not self.select_target(target_index):
+            return False
+
+        action_id = self.deck_manager.hand[card_index]
+        self.decisions.append(card_index)
+        ActionHandler.execute_player_action(self.player, self.enemy, action_id, self.damage_rng, self.events)
+
+        self.used_card_indices.add(card_index)
+        self._check_game_over()
+        if self.game_over:
+            self._finish_player_turn()
+        return True
+
+    def end_turn(self):
+        """プレイヤーのターンを終了し、敵のターンへ移る"""
+        if self.turn != "player" or self.game_over:
+            return
+        self.decisions.append(END_TURN)
+        self._finish_player_turn()
+
+    def _finish_player_turn(self):
+        self.turn = "enemy"
+        self.events.emit(EVENT_TURN_ENDED)
+        self.player.decrement_status_effects() # プレイヤーのターン終了処理
+        self.deck_manager.discard_hand()
+        self.used_card_indices.clear() # ターン終了時にリセット
+
+    def enemy_turn(self):
+        """敵の行動を解決し、次のプレイヤーのターンを開始する（下の3段階をまとめて行う）"""
+        if self.enemy_act():
+            self.end_enemy_turn()
+            self.start_player_turn()
+
+    # --- 敵のターンの各段階 ---
+    # BattleScene はこれらを Scheduler で間を空けて順に呼ぶ。
+    # 敵の行動で決着がついても残りの段階は行う（enemy_turn とまとめて呼んだときと同じ状態になる）
+
+    def enemy_act(self) -> bool:
+        """敵全員が行動表の順に行動する。敵のターンでなければ何もせずFalse"""
+        if self.turn != "enemy" or self.game_over:
+            return False
+
+        ActionHandler.execute_enemy_phase(self.enemy_actions, self.player, self.damage_rng, self.events)
+
+        self._check_game_over()
+        return True
+
+    def end_enemy_turn(self):
+        """次のインテントを決め、敵の状態異常のターンを進める"""
+        for enemy in self.enemies:
+            if enemy.is_alive:
+                enemy.decide_next_action(self.player, self.deck_manager) # 次のインテントを決定
+                enemy.decrement_status_effects() # 敵のターン終了処理
+        self.enemy_actions = ActionHandler.build_enemy_action_table(self.enemies)
+
+    def start_player_turn(self):
+        """手札を引き、マナを回復してプレイヤーのターンにする"""
+        self.turn = "player"
+        if not self.game_over:
+            self.turn_count += 1
+        if not self.deck_manager.draw_cards(self.HAND_SIZE):
+            self.events.emit(EVENT_DECK_EMPTY)
+        self.used_card_indices.clear()
+        self.player.fully_recover_mana()
+
+    def state_hash(self) -> bytes:
+        """戦闘結果に関わる状態のハッシュ (16バイト)。ログの文面は含めない"""
+        state = (
+            self.current_monster_id, self.turn, self.turn_count, self.game_over, self.winner,
+            tuple(sorted(self.used_card_indices)),
+            tuple(self.deck_manager.hand), tuple(self.deck_manager.deck), tuple(self.deck_manager.discard_pile),
+        ) + tuple(enemy.next_action for enemy in self.enemies)
+        if len(self.enemies) > 1:
+            state += (self.encounter_id, self.target_index) # 1対1の戦闘では以前の記録と同じハッシュにする
+        for character in (self.player, *self.enemies):
+            state += (character.current_hp, character.current_mana, character.attack_power, character.defense_buff,
+                      character.is_alive, tuple(character.status_turns), character.status_mask)
+        return hashlib.blake2b(repr(state).encode("utf-8"), digest_size=16).digest()
+
+    def to_record(self) -> BattleRecord:
+        """ここまでの戦闘を再現するための記録を作る"""
+        return BattleRecord(self.seed, self.current_monster_id, list(self.current_deck), array(DECISION_TYPECODE, self.decisions),
+                            self.state_hash(), self.encounter_id)
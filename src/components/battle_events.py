@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+from collections import deque
+from ..data.status_effect_data import STATUS_EFFECTS
+
+# --- イベントの種類 ---
+EVENT_MESSAGE = 0 # 任意の文章: subject=文章
+EVENT_BATTLE_START = 1
+EVENT_CARD_PLAYED = 2 # subject=使用者, value=CompiledAction
+EVENT_NOT_ENOUGH_MANA = 3
+EVENT_MONSTER_ACTION = 4 # subject=モンスター, value=CompiledAction
+EVENT_DAMAGE = 5 # subject=ダメージを受けた側, value=ダメージ量
+EVENT_BLOCK = 6 # subject=防御した側, value=軽減量
+EVENT_STATUS_APPLIED = 7 # subject=付与された側, value=状態異常ID
+EVENT_TURN_ENDED = 8
+EVENT_ENEMY_DEFEATED = 9 # subject=敵
+EVENT_PLAYER_DEFEATED = 10 # subject=プレイヤー
+EVENT_DECK_EMPTY = 11
+EVENT_COUNT = 12
+
+class BattleEvent:
+    __slots__ = ("kind", "subject", "value")
+
+    def __init__(self, kind: int, subject: str, value):
+        self.kind = kind
+        self.subject = subject
+        self.value = value
+
+    def format(self) -> str:
+        """ログに表示する文章を作る（表示するときだけ呼ばれる）"""
+        kind, subject, value = self.kind, self.subject, self.value
+        if kind == EVENT_MESSAGE:
+            return subject
+        if kind == EVENT_BATTLE_START:
+            return "戦闘開始！"
+        if kind == EVENT_CARD_PLAYED:
+            return f"{subject}は「{value.name}」を使った！"
+        if kind == EVENT_NOT_ENOUGH_MANA:
+            return "マナが足りない！"
+        if kind == EVENT_MONSTER_ACTION:
+            return value.message.format(monster_name=subject, action_name=value.name)
+        if kind == EVENT_DAMAGE:
+            return f"{subject}に{value}ダメージ！"
+        if kind == EVENT_BLOCK:
+            return f"{subject}は防御の構えをとった！"
+        if kind == EVENT_STATUS_APPLIED:
+            return f"{subject}は{STATUS_EFFECTS[value]['name']}になった！"
+        if kind == EVENT_TURN_ENDED:
+            return "プレイヤーのターン終了"
+        if kind == EVENT_ENEMY_DEFEATED:
+            return f"{subject}は倒れた！"
+        if kind == EVENT_PLAYER_DEFEATED:
+            return f"{subject}は倒れた..."
+        if kind == EVENT_DECK_EMPTY:
+            return "山札がありません！"
+        raise ValueError(f"未対応のイベント種別です: {kind}")
+
+class BattleEventLog:
+    """
+    戦闘中の出来事を文章ではなくイベントとして受け取る。
+    - 直近 max_events 件だけを deque に残し、文章は lines() で表示するときに作る
+    - keep_events=False なら記録はせず、種類ごとの件数とダメージ合計だけを数える（シミュレーション用）
+    """
+    def __init__(self, max_events: int = 4, keep_events: bool = True):
+        self.keep_events = keep_events
+        self.events: deque[BattleEvent] = deque(maxlen=max_events)
+        self.counts: list[int] = [0] * EVENT_COUNT
+        self.damage_taken: dict[str, int] = {} # key: ダメージを受けた側の名前
+        self.version: int = 0 # イベントが増えるたびに変わる（描画のキャッシュ判定用）
+
+    def emit(self, kind: int, subject: str = "", value=None):
+        self.counts[kind] += 1
+        self.version += 1
+        if kind == EVENT_DAMAGE:
+            self.damage_taken[subject] = self.damage_taken.get(subject, 0) + value
+        if self.keep_events:
+            self.events.append(BattleEvent(kind, subject, value))
+
+    def lines(self) -> list[str]:
+        return [event.format() for event in self.events]
+
+    def clear(self):
+        self.events.clear()
+        self.counts = [0] * EVENT_COUNT
+        self.damage_taken.clear()
+        self.version += 1
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+import struct
+import sys
+from array import array
+
+END_TURN: int = -1 # 記録上の「ターン終了」。0以上の値は使ったカードの手札インデックス
+SELECT_TARGET_BASE: int = -2 # これ以下の値は「攻撃対象を選ぶ」。SELECT_TARGET_BASE - 敵の番号
+
+_MAGIC: bytes = b"BREC"
+_VERSION: int = 3 # 2: 敵の編成IDを追加 / 3: 選択を16bitに拡張（1, 2の記録も読める）
+DECISION_TYPECODE: str = 'h' # 手札が127枚を超えても、敵が100体を超えても収まるように16bit
+_HEADER = struct.Struct("<4sBQ16s") # マジック, バージョン, シード, 最終状態のハッシュ
+_COUNT = struct.Struct("<I")
+
+class BattleRecord:
+    """
+    1戦闘を再現するのに必要な最小限の情報。
+    シードとモンスター（または敵の編成）・デッキが同じなら、プレイヤーの選択だけで戦闘全体が決まる。
+    """
+    def __init__(self, seed: int, monster_id: str, deck: list[str], decisions: array, state_hash: bytes,
+                 encounter_id: str | None = None):
+        self.seed = seed
+        self.monster_id = monster_id
+        self.encounter_id = encounter_id # 複数の敵との戦闘なら編成ID
+        self.deck = deck
+        self.decisions = decisions # array('h'): カードのインデックス / END_TURN / 攻撃対象の選択
+        self.state_hash = state_hash # 最終状態のハッシュ (16バイト)
+
+    def to_bytes(self) -> bytes:
+        parts = [_HEADER.pack(_MAGIC, _VERSION, self.seed, self.state_hash), _pack_str(self.monster_id),
+                 _pack_str(self.encounter_id or ""), _COUNT.pack(len(self.deck))]
+        parts.extend(_pack_str(card_id) for card_id in self.deck)
+        parts.append(_COUNT.pack(len(self.decisions)))
+        decisions = array(DECISION_TYPECODE, self.decisions)
+        if sys.byteorder == "big":
+            decisions.byteswap() # ファイル上はリトルエンディアン
+        parts.append(decisions.tobytes())
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data: bytes, offset: int = 0) -> tuple["BattleRecord", int]:
+        """data の offset から1件読み込み、(記録, 次の位置) を返す"""
+        magic, version, seed, state_hash = _HEADER.unpack_from(data, offset)
+        if magic != _MAGIC or version not in (1, 2, _VERSION):
+            raise ValueError("戦闘記録の形式が正しくありません")
+        offset += _HEADER.size
+
+        monster_id, offset = _unpack_str(data, offset)
+        encounter_id = ""
+        if version >= 2:
+            encounter_id, offset = _unpack_str(data, offset)
+        (deck_size,) = _COUNT.unpack_from(data, offset)
+        offset += _COUNT.size
+        deck = []
+        for _ in range(deck_size):
+            card_id, offset = _unpack_str(data, offset)
+            deck.append(card_id)
+
+        (decision_count,) = _COUNT.unpack_from(data, offset)
+        offset += _COUNT.size
+        item_size = 2 if version >= 3 else 1 # 2までは8bit
+        size = decision_count * item_size
+        chunk = data[offset:offset + size]
+        if len(chunk) != size:
+            raise ValueError("戦闘記録が途中で切れています")
+        raw = array(DECISION_TYPECODE if version >= 3 else 'b')
+        raw.frombytes(chunk)
+        if version >= 3 and sys.byteorder == "big":
+            raw.byteswap()
+        decisions = array(DECISION_TYPECODE, raw)
+        return cls(seed, monster_id, deck, decisions, state_hash, encounter_id or None), offset + size
+
+def select_target_decision(enemy_index: int) -> int:
+    return SELECT_TARGET_BASE - enemy_index
+
+def target_of_decision(decision: int) -> int:
+    """攻撃対象の選択を表す値から敵の番号を取り出す"""
+    return SELECT_TARGET_BASE - decision
+
+def _pack_str(text: str) -> bytes:
+    encoded = text.encode("utf-8")
+    return struct.pack("<B", len(encoded)) + encoded
+
+def _unpack_str(data: bytes, offset: int) -> tuple[str, int]:
+    length = data[offset]
+    offset += 1
+    return bytes(data[offset:offset + length]).decode("utf-8"), offset + length
+
+def dump_records(records: list[BattleRecord]) -> bytes:
+    """複数の記録を1つのバイト列にまとめる（単純に連結するだけ）"""
+    return b"".join(record.to_bytes() for record in records)
+
+def load_records(data: bytes) -> list[BattleRecord]:
+    records = []
+    offset = 0
+    while offset < len(data):
+        record, offset = BattleRecord.from_bytes(data, offset)
+        records.append(record)
+    return records
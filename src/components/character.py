@@ -1,6 +1,15 @@
 # -*- coding: utf-8 -*-
-import math
-from ..data.status_effect_data import STATUS_EFFECTS
+import itertools
+from collections.abc import Mapping
+from types import MappingProxyType
+from typing import Callable, TypeVar
+from .status_engine import (STATUS_IDS, STATUS_INDEX, STATUS_COUNT, STATUS_REGISTRY,
+                            TRIGGER_INCOMING_DAMAGE, TRIGGER_OUTGOING_DAMAGE, TRIGGER_END_OF_TURN)
+
+T = TypeVar("T")
+
+# 能力値のバージョン番号。全キャラクターで共有の連番なので、同じ番号が別の状態を指すことはない
+_next_stats_version: Callable[[], int] = itertools.count(1).__next__
 
 class Character:
     def __init__(self, name: str, max_hp: int, max_mp: int, attack_power: int, x: int, y: int):
@@ -9,26 +18,97 @@ class Character:
         self.current_hp: int = max_hp
         self.max_mana: int = max_mp
         self.current_mana: int = max_mp
-        self.attack_power: int = attack_power
+        self._attack_power: int = attack_power
         self.x: int = x
         self.y: int = y
         self.is_alive: bool = True
-        self.defense_buff: int = 0 # 防御によるダメージ減少量
-        self.status_effects: dict[str, int] = {} # key: status_id, value: turns
+        self._defense_buff: int = 0 # 防御によるダメージ減少量
+        # 状態異常: 番号ごとの残りターン数と、効果中の状態異常のビットマスク
+        self.status_turns: list[int] = [0] * STATUS_COUNT
+        self.status_mask: int = 0
         self.relics: list[str] = []
+        # 攻撃力・防御・状態異常が変わるたびに更新される番号と、それに基づく表示用の値のキャッシュ
+        self.stats_version: int = _next_stats_version()
+        self._stat_cache: dict = {}
+        self._stat_cache_version: int = 0
+
+    @property
+    def attack_power(self) -> int:
+        return self._attack_power
+
+    @attack_power.setter
+    def attack_power(self, value: int):
+        if value != self._attack_power:
+            self._attack_power = value
+            self.stats_version = _next_stats_version()
+
+    @property
+    def defense_buff(self) -> int:
+        return self._defense_buff
+
+    @defense_buff.setter
+    def defense_buff(self, value: int):
+        if value != self._defense_buff:
+            self._defense_buff = value
+            self.stats_version = _next_stats_version()
+
+    def cached_stat(self, key, compute: Callable[["Character"], T]) -> T:
+        """
+        compute(self) の結果を stats_version が変わるまで覚えておく（カードの表示威力など）。
+        key には計算を区別できる値（CompiledAction など）を渡す
+        """
+        cache = self._stat_cache
+        if self._stat_cache_version != self.stats_version:
+            cache.clear()
+            self._stat_cache_version = self.stats_version
+        if key in cache:
+            return cache[key]
+        value = cache[key] = compute(self)
+        return value
     
+    def copy(self) -> "Character":
+        """探索用の複製。状態異常の配列だけは別に持つ"""
+        clone = object.__new__(type(self))
+        clone.__dict__.update(self.__dict__)
+        clone.status_turns = list(self.status_turns)
+        clone._stat_cache = {}
+        return clone
+
+    @property
+    def status_effects(self) -> Mapping[str, int]:
+        """
+        効果中の状態異常 (key: status_id, value: turns)。表示用の読み取り専用のビュー。
+        変更は apply_status / decrement_status_effects で行う（書き込むと TypeError になり、黙って捨てられることはない）。
+        """
+        turns = self.status_turns
+        return MappingProxyType({STATUS_IDS[i]: turns[i] for i in range(STATUS_COUNT) if self.status_mask >> i & 1})
+
+    def has_status(self, status_id: str) -> bool:
+        return bool(self.status_mask >> STATUS_INDEX[status_id] & 1)
+
+    def modify_outgoing_damage(self, damage: int) -> int:
+        """与ダメージに反応する状態異常（衰弱など）を適用する"""
+        if self.status_mask & STATUS_REGISTRY.masks[TRIGGER_OUTGOING_DAMAGE]:
+            for bit, handler in STATUS_REGISTRY.handlers[TRIGGER_OUTGOING_DAMAGE]:
+                if self.status_mask & bit:
+                    damage = handler(self, damage)
+        return damage
+
     def take_damage(self, damage: int):
         # 被ダメージ修飾子を持つ状態異常を適用
-        if "vulnerable" in self.status_effects:
-            modifier = STATUS_EFFECTS["vulnerable"]["value"]
-            damage = math.ceil(damage * modifier)
+        if self.status_mask & STATUS_REGISTRY.masks[TRIGGER_INCOMING_DAMAGE]:
+            for bit, handler in STATUS_REGISTRY.handlers[TRIGGER_INCOMING_DAMAGE]:
+                if self.status_mask & bit:
+                    damage = handler(self, damage)
 
         # 防御バフを適用
-        actual_damage = damage - self.defense_buff
+        actual_damage = damage - self._defense_buff
         actual_damage = max(0, actual_damage) # ダメージがマイナスにならないように
         
         # 防御バフは一度使ったらリセット
-        self.defense_buff = 0
+        if self._defense_buff:
+            self._defense_buff = 0
+            self.stats_version = _next_stats_version()
 
         self.current_hp -= actual_damage
         if self.current_hp <= 0:
@@ -54,20 +134,32 @@ class Character:
 
     def apply_status(self, status_id: str, turns: int):
         """状態異常を付与する（効果は上書きせず、大きい方を採用）"""
-        self.status_effects[status_id] = max(self.status_effects.get(status_id, 0), turns)
+        i = STATUS_INDEX[status_id]
+        if turns > self.status_turns[i]:
+            self.status_turns[i] = turns
+            self.status_mask |= 1 << i
+            self.stats_version = _next_stats_version()
 
     def decrement_status_effects(self):
         """ターン終了時に状態異常の効果を発動し、ターン数を1減らす"""
-        for status_id in list(self.status_effects.keys()):
-            # ターン終了時効果の発動
-            status_data = STATUS_EFFECTS[status_id]
-            if status_data["type"] == "end_of_turn_heal":
-                self.heal(status_data["value"])
-            
-            # ターン数の減少
-            self.status_effects[status_id] -= 1
-            if self.status_effects[status_id] <= 0:
-                del self.status_effects[status_id]
+        mask = self.status_mask
+        if not mask:
+            return
+
+        # ターン終了時効果の発動
+        if mask & STATUS_REGISTRY.masks[TRIGGER_END_OF_TURN]:
+            for bit, handler in STATUS_REGISTRY.handlers[TRIGGER_END_OF_TURN]:
+                if mask & bit:
+                    handler(self)
+
+        # ターン数の減少
+        turns = self.status_turns
+        for i in range(STATUS_COUNT):
+            if mask >> i & 1:
+                turns[i] -= 1
+                if turns[i] <= 0:
+                    self.status_mask &= ~(1 << i)
+        self.stats_version = _next_stats_version()
 
     def get_hp_percentage(self) -> float:
         return (self.current_hp / self.max_hp) * 100
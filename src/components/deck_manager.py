@@ -1,40 +1,87 @@
 # -*- coding: utf-8 -*-
 import random
+from array import array
+from .action_compiler import ACTION_IDS, ACTION_INDEX
 
 class DeckManager:
-    def __init__(self, initial_deck: list[str]):
-        self.deck: list[str] = initial_deck[:]
+    """
+    山札と捨て札はカードIDの番号を array('H') に詰めて持つ。
+    どちらもデッキ枚数ぶんの領域を最初に確保し、末尾までの枚数だけを管理する。
+    - 引く / 捨てるは末尾の読み書きだけなのでO(1)
+    - 山札切れのときは山札と捨て札の領域を入れ替えて、その場でシャッフルする
+    シャッフルには渡された rng を使い、グローバルな random の状態には触れない。
+    """
+    def __init__(self, initial_deck: list[str], rng: random.Random | None = None):
+        self.rng = rng or random.Random()
+        for card_id in initial_deck:
+            if card_id not in ACTION_INDEX:
+                raise ValueError(f"カード '{card_id}' は定義されていません")
+
+        capacity = len(initial_deck)
+        self._deck = array('H', [ACTION_INDEX[card_id] for card_id in initial_deck])
+        self._deck_size: int = capacity
+        self._discard = array('H', bytes(2 * capacity))
+        self._discard_size: int = 0
         self.hand: list[str] = []
-        self.discard_pile: list[str] = []
-        random.shuffle(self.deck)
+        self._shuffle(self._deck, self._deck_size)
+
+    @property
+    def deck_count(self) -> int:
+        return self._deck_size
+
+    @property
+    def discard_count(self) -> int:
+        return self._discard_size
+
+    @property
+    def deck(self) -> list[str]:
+        """山札のカードID（末尾が次に引くカード）。表示や確認用"""
+        return [ACTION_IDS[i] for i in self._deck[:self._deck_size]]
+
+    @property
+    def discard_pile(self) -> list[str]:
+        return [ACTION_IDS[i] for i in self._discard[:self._discard_size]]
+
+    def _shuffle(self, cards: array, size: int):
+        """先頭 size 枚をその場でシャッフルする (Fisher–Yates)"""
+        rand = self.rng.random
+        for i in range(size - 1, 0, -1):
+            j = int(rand() * (i + 1))
+            cards[i], cards[j] = cards[j], cards[i]
 
     def draw_cards(self, num_to_draw: int) -> bool:
         """
         デッキから指定枚数のカードを手札に引く。
         引けた場合はTrue、引けなかった場合はFalseを返す。
         """
-        drew_any = False
-        for _ in range(num_to_draw):
-            if not self.deck:
-                if not self.discard_pile:
+        drawn = 0
+        while drawn < num_to_draw:
+            if not self._deck_size:
+                if not self._discard_size:
                     # 引くカードがどこにもない
                     break
-                # 捨て札をシャッフルして新しいデッキにする
-                self.deck = self.discard_pile
-                self.discard_pile = []
-                random.shuffle(self.deck)
-            
-            self.hand.append(self.deck.pop())
-            drew_any = True
-        return drew_any
+                # 捨て札をシャッフルして新しいデッキにする（領域を入れ替えるだけで新しく確保はしない）
+                self._deck, self._discard = self._discard, self._deck
+                self._deck_size, self._discard_size = self._discard_size, 0
+                self._shuffle(self._deck, self._deck_size)
+
+            # 山札の末尾からまとめて引く
+            take = min(num_to_draw - drawn, self._deck_size)
+            end = self._deck_size
+            self._deck_size = end - take
+            self.hand.extend([ACTION_IDS[i] for i in reversed(self._deck[end - take:end])])
+            drawn += take
+        return drawn > 0
 
     def discard_hand(self):
         """手札の全てのカードを捨て札に送る"""
-        self.discard_pile.extend(self.hand)
-        self.hand = []
+        start = self._discard_size
+        self._discard_size = start + len(self.hand)
+        self._discard[start:self._discard_size] = array('H', [ACTION_INDEX[card_id] for card_id in self.hand])
+        self.hand.clear()
 
     def move_used_card_to_discard(self, card_index: int):
         """使用したカードを手札から捨て札に移動する"""
         if 0 <= card_index < len(self.hand):
-            card = self.hand.pop(card_index)
-            self.discard_pile.append(card)
\ No newline at end of file
+            self._discard[self._discard_size] = ACTION_INDEX[self.hand.pop(card_index)]
+            self._discard_size += 1
@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+from .character import Character
+from .action_handler import ActionHandler
+from .action_compiler import COMPILED_ACTIONS, COMPILED_MONSTER_ACTIONS, ACTION_IDS, ACTION_INDEX, CompiledAction
+from .battle_events import BattleEventLog
+from .monster_ai import MeanRandom
+
+# 目的
+OBJECTIVE_DAMAGE = "damage" # 与えるダメージの期待値を最大にする
+OBJECTIVE_LETHAL = "lethal" # 倒せるなら倒す。倒せなければ受けるダメージを最小にする
+OBJECTIVE_SURVIVE = "survive" # 受けるダメージの期待値を最小にする
+OBJECTIVES: tuple[str, ...] = (OBJECTIVE_DAMAGE, OBJECTIVE_LETHAL, OBJECTIVE_SURVIVE)
+
+class Plan:
+    """1ターン分のカードの使い方"""
+    __slots__ = ("card_indices", "action_ids", "damage_dealt", "damage_taken", "lethal")
+
+    def __init__(self, card_indices: list[int], action_ids: list[str], damage_dealt: int, damage_taken: int, lethal: bool):
+        self.card_indices = card_indices # 使う順の手札の番号
+        self.action_ids = action_ids
+        self.damage_dealt = damage_dealt # 敵に与えるダメージの期待値
+        self.damage_taken = damage_taken # 敵全員のインテントで受けるダメージの期待値（回復した分は差し引く）
+        self.lethal = lethal
+
+class HandSolver:
+    """
+    手札の使う順番を全探索して、目的に対して最善の1ターンを求める。
+    - 手札は「残りのカードの種類ごとの枚数」として扱うので、同じカードの並べ替えは1通りにまとまる
+    - (残りの枚数, マナ, 両者のHP・防御・状態異常, 敵の行動表) をキーに結果をメモする
+    - ダメージのぶれは平均値で計算する
+    - 敵が複数いるときは攻撃対象以外の敵も行動表の順に行動させて受けるダメージを計算する。
+      カードが当たるのは攻撃対象だけなので、ほかの敵の状態は手番の間変わらないものとして扱う
+    評価は最終的なHPだけで決まるので、メモは手番をまたいで使い回せる（対戦条件ごとに分けて持つ）。
+    """
+    def __init__(self, objective: str = OBJECTIVE_LETHAL, memo_size: int = 100000):
+        if objective not in OBJECTIVES:
+            raise ValueError(f"目的 '{objective}' は未対応です（{', '.join(OBJECTIVES)}）")
+        self.objective = objective
+        self.memo_size = memo_size
+        self._memos: dict[tuple, dict[tuple, tuple]] = {}
+        self._rng = MeanRandom()
+        self._events = BattleEventLog(keep_events=False)
+        self.states: int = 0 # 展開した局面の数（ベンチマーク用）
+
+    def clear(self):
+        self._memos.clear()
+
+    def solve(self, player: Character, enemy: Character, hand: list[str], used_card_indices: set[int] | frozenset[int],
+              intent: str | None, enemy_actions: list[tuple[Character, CompiledAction]] | None = None) -> Plan:
+        """
+        hand のうち used_card_indices 以外のカードから、今のマナで使う順番を決める。
+        enemy_actions（build_enemy_action_table の表）を渡すと、intent の代わりにその表で敵のターンを計算する
+        """
+        counts = [0] * len(ACTION_IDS)
+        for i, action_id in enumerate(hand):
+            if i not in used_card_indices:
+                counts[ACTION_INDEX[action_id]] += 1
+
+        if enemy_actions is None:
+            enemy_actions = [(enemy, COMPILED_MONSTER_ACTIONS[intent])] if intent is not None else []
+        # 攻撃対象は None で表し、探索中の状態で行動させる。ほかの敵は今の状態をキーに含める（この手番で倒れた敵は除く）
+        phase = tuple((None if monster is enemy else monster, action) for monster, action in enemy_actions
+                      if monster is enemy or monster.is_alive)
+        phase_key = tuple((action.action_id,) if monster is None else
+                          (action.action_id, monster.current_hp, monster.attack_power, monster.defense_buff,
+                           monster.status_mask, tuple(monster.status_turns))
+                          for monster, action in phase)
+
+        context = (player.max_hp, player.attack_power, enemy.max_hp, enemy.attack_power)
+        memo = self._memos.get(context)
+        if memo is None:
+            memo = self._memos[context] = {}
+        elif len(memo) > self.memo_size:
+            memo.clear()
+
+        _, sequence, player_hp, enemy_hp = self._search(memo, player, enemy, tuple(counts), phase, phase_key)
+
+        # カードの種類の並びを手札の番号に戻す（同じカードは左から使う）
+        card_indices = []
+        taken = set(used_card_indices)
+        for card in sequence:
+            action_id = ACTION_IDS[card]
+            for i, hand_card in enumerate(hand):
+                if hand_card == action_id and i not in taken:
+                    taken.add(i)
+                    card_indices.append(i)
+                    break
+        return Plan(card_indices, [ACTION_IDS[card] for card in sequence],
+                    enemy.current_hp - enemy_hp, player.current_hp - player_hp, enemy_hp <= 0)
+
+    def solve_engine(self, engine) -> Plan:
+        """BattleEngine の今の手番について、敵全員の行動表を使って解く"""
+        return self.solve(engine.player, engine.enemy, engine.deck_manager.hand, engine.used_card_indices,
+                          engine.enemy.next_action, engine.enemy_actions)
+
+    def play_turn(self, engine):
+        """
+        ヘッドレス用の手番。解いた順にカードを使う（run_battle の play_turn に渡せる）。
+        攻撃対象を倒して次の敵に移ったら、残りの手札で解き直す
+        """
+        while not engine.game_over:
+            target = engine.target_index
+            for card_index in self.solve_engine(engine).card_indices:
+                if engine.game_over:
+                    break
+                engine.play_card(card_index)
+            if engine.target_index == target:
+                break
+
+    # --- 探索 ---
+
+    def _search(self, memo: dict, player: Character, enemy: Character, counts: tuple[int, ...],
+                phase: tuple, phase_key: tuple) -> tuple[tuple, tuple[int, ...], int, int]:
+        """(評価, 使うカードの種類の並び, 最終的なプレイヤーのHP, 最終的な敵のHP) を返す"""
+        key = (counts, phase_key, player.current_mana, player.current_hp, player.defense_buff, player.status_mask,
+               tuple(player.status_turns), enemy.current_hp, enemy.defense_buff, enemy.status_mask, tuple(enemy.status_turns))
+        cached = memo.get(key)
+        if cached is not None:
+            return cached
+        self.states += 1
+
+        # ここでターンを終える場合
+        player_hp, enemy_hp = self._end_turn(player, enemy, phase)
+        best = (self._score(player_hp, enemy_hp), (), player_hp, enemy_hp)
+
+        for card, count in enumerate(counts):
+            action = COMPILED_ACTIONS[ACTION_IDS[card]]
+            if not count or not action.steps or action.cost > player.current_mana:
+                continue # 効果のないカード（パス）は使っても変わらない
+            next_player, next_enemy = player.copy(), enemy.copy()
+            ActionHandler.execute_player_action(next_player, next_enemy, action.action_id, self._rng, self._events)
+            if not next_enemy.is_alive:
+                # 攻撃対象を倒したらこの手番の探索は終える。ほかの敵が残っていれば、その敵の行動は受ける
+                player_hp = next_player.current_hp
+                if any(monster is not None for monster, _ in phase):
+                    player_hp = self._end_turn(next_player, next_enemy, phase)[0]
+                result = (self._score(player_hp, 0), (card,), player_hp, 0)
+            else:
+                rest = counts[:card] + (count - 1,) + counts[card + 1:]
+                score, sequence, player_hp, enemy_hp = self._search(memo, next_player, next_enemy, rest, phase, phase_key)
+                result = (score, (card,) + sequence, player_hp, enemy_hp)
+            if result[0] > best[0]:
+                best = result
+
+        memo[key] = best
+        return best
+
+    def _end_turn(self, player: Character, enemy: Character, phase: tuple) -> tuple[int, int]:
+        """ターン終了処理と敵全員の行動まで進めたときの (プレイヤーのHP, 攻撃対象のHP)"""
+        player = player.copy()
+        player.decrement_status_effects()
+        if phase:
+            table = [((enemy if monster is None else monster).copy(), action) for monster, action in phase]
+            ActionHandler.execute_enemy_phase(table, player, self._rng, self._events)
+        return player.current_hp, enemy.current_hp
+
+    def _score(self, player_hp: int, enemy_hp: int) -> tuple:
+        if self.objective == OBJECTIVE_DAMAGE:
+            return (-enemy_hp, player_hp)
+        if self.objective == OBJECTIVE_SURVIVE:
+            return (player_hp, -enemy_hp)
+        return (enemy_hp <= 0, player_hp, -enemy_hp)
@@ -3,18 +3,26 @@ import random
 from .character import Character
 
 class Monster(Character):
-    def __init__(self, name: str, max_hp: int, attack_power: int, actions: list[str], x: int, y: int):
+    def __init__(self, name: str, max_hp: int, attack_power: int, actions: list[str], x: int, y: int,
+                 rng: random.Random | None = None, policy=None):
         # モンスターはMPを使わない想定なので max_mp=0 で初期化
         super().__init__(name, max_hp, 0, attack_power, x, y)
         self.actions = actions
         self.next_action: str | None = None
+        self.rng = rng or random.Random() # 行動選択専用の乱数
+        self.policy = policy # 行動を選ぶAI (monster_ai.ExpectimaxPolicy など)。Noneならランダム
 
-    def choose_action(self) -> str:
-        """行動パターンからランダムに行動を一つ選択する"""
+    def choose_action(self, opponent: Character | None = None, deck=None) -> str:
+        """
+        行動パターンから行動を一つ選択する。
+        policy があり、相手と山札の情報が渡されたときは policy に選ばせる。それ以外はランダム
+        """
         if not self.actions:
             return "wait" # 行動がなければ何もしない
-        return random.choice(self.actions)
+        if self.policy is not None and opponent is not None and deck is not None:
+            return self.policy.choose(self, opponent, deck)
+        return self.rng.choice(self.actions)
     
-    def decide_next_action(self):
+    def decide_next_action(self, opponent: Character | None = None, deck=None):
         """次の行動を決定し、保持する"""
-        self.next_action = self.choose_action()
\ No newline at end of file
+        self.next_action = self.choose_action(opponent, deck)
@@ -0,0 +1,248 @@
+# -*- coding: utf-8 -*-
+import random
+import struct
+from time import perf_counter_ns
+from .character import Character
+from .deck_manager import DeckManager
+from .action_handler import ActionHandler
+from .action_compiler import (COMPILED_ACTIONS, COMPILED_MONSTER_ACTIONS, ACTION_IDS, ACTION_INDEX,
+                              DealPhysicalDamage, DealFixedDamage, DealScaledDamage, AddBlock, ApplyStatus)
+from .battle_events import BattleEventLog
+from .status_engine import STATUS_COUNT
+
+HAND_SIZE: int = 5 # BattleEngine.HAND_SIZE と同じ
+# モンスターから見た評価値。決着がつけば ±1 に、残った側のHP割合を足す
+# （どうやっても倒される局面でも、より多くダメージを与える行動を選ぶため）
+WIN_VALUE: float = 1.0
+# 局面キーの並び: 深さ・手札の有無、モンスターとプレイヤーの (HP, 防御, 状態異常のビット, 各状態異常の残りターン)、
+# 山札・捨て札・手札のカードごとの枚数
+_KEY_FORMAT = struct.Struct(f"<2B{2 * (3 + STATUS_COUNT)}i{3 * len(ACTION_IDS)}H")
+_NO_HAND: tuple[int, ...] = (0,) * len(ACTION_IDS)
+
+class MeanRandom:
+    """ダメージのぶれを平均値で置き換える（探索中は期待値で計算する）"""
+    def randint(self, a: int, b: int) -> int:
+        return (a + b) // 2
+
+class _OutOfTime(Exception):
+    pass
+
+def _is_damage_step(step) -> bool:
+    return isinstance(step, (DealPhysicalDamage, DealFixedDamage, DealScaledDamage))
+
+class ExpectimaxPolicy:
+    """
+    モンスターの行動を期待値最大化 (expectimax) で選ぶ。
+    - 自分の手番: 行動候補ごとに子ノードを展開して最大を取る
+    - 偶然ノード: プレイヤーが次に引く手札を山札の構成から hand_samples 回抽出し、重み付き平均を取る
+    - プレイヤーの手番: インテントを見て防御・弱体・攻撃の順に使えるだけ使う、という固定のモデル
+    評価値はモンスターの残りHP割合 − プレイヤーの残りHP割合。
+
+    手札の抽出は山札の構成から作ったシードで行うので、ある局面の評価値は局面だけで決まる。
+    そのため置換表 (局面キー → 評価値) は判断や戦闘をまたいで使い回せる。
+    time_budget_ms を指定すると反復深化を行い、時間切れになった深さは捨てて一つ浅い結果を使う
+    （この場合は結果が実行速度に依存するので、戦闘記録の再現には使えない）。
+    """
+    def __init__(self, depth: int = 2, hand_samples: int = 6, time_budget_ms: float | None = None,
+                 table_size: int = 200000):
+        if depth < 1:
+            raise ValueError("depth は1以上にしてください")
+        self.depth = depth
+        self.hand_samples = hand_samples
+        self.time_budget_ms = time_budget_ms
+        self.table_size = table_size
+        self._tables: dict[tuple, dict[bytes, tuple[float, str | None]]] = {} # 対戦条件ごとの置換表
+        self._rng = MeanRandom()
+        self._events = BattleEventLog(keep_events=False)
+        self._deadline: int | None = None
+        # 統計（ベンチマーク用）
+        self.nodes: int = 0
+        self.table_hits: int = 0
+        self.last_depth: int = 0 # 直前の判断で最後まで探索できた深さ
+
+    def clear(self):
+        self._tables.clear()
+
+    # --- 判断 ---
+
+    def choose(self, monster: Character, opponent: Character, deck: DeckManager) -> str:
+        """monster の次の行動を選ぶ。deck.hand が空でなければ、その手札をプレイヤーが使う前提で読む"""
+        candidates = tuple(dict.fromkeys(monster.actions))
+        if len(candidates) == 1:
+            return candidates[0]
+
+        context = (monster.max_hp, monster.attack_power, candidates, opponent.max_hp, opponent.max_mana, opponent.attack_power)
+        table = self._tables.get(context)
+        if table is None:
+            table = self._tables[context] = {}
+        elif len(table) > self.table_size:
+            table.clear()
+
+        draw = [0] * len(ACTION_IDS)
+        for card_id in deck.deck:
+            draw[ACTION_INDEX[card_id]] += 1
+        discard = [0] * len(ACTION_IDS)
+        for card_id in deck.discard_pile:
+            discard[ACTION_INDEX[card_id]] += 1
+        hand = None
+        if deck.hand:
+            hand = [0] * len(ACTION_IDS)
+            for card_id in deck.hand:
+                hand[ACTION_INDEX[card_id]] += 1
+
+        self._deadline = None
+        if self.time_budget_ms is not None:
+            self._deadline = perf_counter_ns() + int(self.time_budget_ms * 1e6)
+
+        best = candidates[0]
+        self.last_depth = 0
+        depths = range(1, self.depth + 1) if self._deadline is not None else (self.depth,)
+        for depth in depths:
+            try:
+                _, action_id = self._max_node(table, candidates, monster, opponent, draw, discard, hand, depth)
+            except _OutOfTime:
+                break
+            best = action_id
+            self.last_depth = depth
+        return best
+
+    # --- 探索 ---
+
+    def _max_node(self, table: dict, candidates: tuple[str, ...], monster: Character, player: Character,
+                  draw: list[int], discard: list[int], hand: list[int] | None, depth: int) -> tuple[float, str]:
+        key = self._key(monster, player, draw, discard, hand, depth)
+        cached = table.get(key)
+        if cached is not None:
+            self.table_hits += 1
+            return cached
+
+        self.nodes += 1
+        if hand is None:
+            # 敵のターン終了処理のあとでプレイヤーが手札を引く
+            monster = monster.copy()
+            monster.decrement_status_effects()
+            hands = self._sample_hands(draw, discard)
+        else:
+            hands = [(1.0, hand, draw, discard)]
+
+        best_value, best_action = -3.0, candidates[0]
+        for action_id in candidates:
+            if self._deadline is not None and perf_counter_ns() > self._deadline:
+                raise _OutOfTime() # 行動候補ごとに確かめ、予算を大きく超えないようにする
+            value = 0.0
+            for weight, drawn, next_draw, next_discard in hands:
+                value += weight * self._play_round(table, candidates, monster, player, drawn, next_draw, next_discard,
+                                                   action_id, depth)
+            if value > best_value:
+                best_value, best_action = value, action_id
+
+        table[key] = (best_value, best_action)
+        return best_value, best_action
+
+    def _play_round(self, table: dict, candidates: tuple[str, ...], monster: Character, player: Character,
+                    hand: list[int], draw: list[int], discard: list[int], action_id: str, depth: int) -> float:
+        """インテント action_id を見たプレイヤーが hand を使い、モンスターが行動するまでを進める"""
+        monster = monster.copy()
+        player = player.copy()
+        player.current_mana = player.max_mana
+
+        rng, events = self._rng, self._events
+        for card_index in _play_order(action_id):
+            for _ in range(hand[card_index]):
+                action_id_card = ACTION_IDS[card_index]
+                if player.current_mana < COMPILED_ACTIONS[action_id_card].cost:
+                    break
+                ActionHandler.execute_player_action(player, monster, action_id_card, rng, events)
+                if not monster.is_alive:
+                    return -WIN_VALUE - player.current_hp / player.max_hp
+
+        player.decrement_status_effects()
+        next_discard = [d + h for d, h in zip(discard, hand)]
+
+        ActionHandler.execute_monster_action(monster, player, action_id, rng, events)
+        if not player.is_alive:
+            return WIN_VALUE + monster.current_hp / monster.max_hp
+        if depth <= 1:
+            return monster.current_hp / monster.max_hp - player.current_hp / player.max_hp
+        return self._max_node(table, candidates, monster, player, draw, next_discard, None, depth - 1)[0]
+
+    def _sample_hands(self, draw: list[int], discard: list[int]) -> list[tuple[float, list[int], list[int], list[int]]]:
+        """
+        次に引く手札を抽出し、(確率, 手札, 残りの山札, 捨て札) の一覧にまとめる。
+        シードは山札と捨て札の構成だけから作るので、HPなどが違っても同じ構成なら同じ手札になる
+        （行動候補どうしを同じ手札で比べられる）。
+        """
+        rng = random.Random(hash((tuple(draw), tuple(discard))))
+        samples: dict[tuple, list] = {}
+        for _ in range(self.hand_samples):
+            pile, used = list(draw), list(discard)
+            hand = [0] * len(pile)
+            remaining = sum(pile)
+            for _ in range(HAND_SIZE):
+                if not remaining:
+                    if not any(used):
+                        break
+                    pile, used = used, [0] * len(pile) # 山札切れで捨て札をシャッフルする
+                    remaining = sum(pile)
+                r = int(rng.random() * remaining)
+                for i, count in enumerate(pile):
+                    if r < count:
+                        break
+                    r -= count
+                pile[i] -= 1
+                hand[i] += 1
+                remaining -= 1
+            sample_key = (tuple(hand), tuple(pile), tuple(used))
+            entry = samples.get(sample_key)
+            if entry is None:
+                samples[sample_key] = [1, hand, pile, used]
+            else:
+                entry[0] += 1
+        return [(count / self.hand_samples, hand, pile, used) for count, hand, pile, used in samples.values()]
+
+    @staticmethod
+    def _key(monster: Character, player: Character, draw: list[int], discard: list[int], hand: list[int] | None,
+             depth: int) -> bytes:
+        """局面キー（bytes に詰める）。対戦条件（最大HP・攻撃力など）は置換表ごとに分けているので含めない"""
+        return _KEY_FORMAT.pack(depth, hand is not None,
+                                monster.current_hp, monster.defense_buff, monster.status_mask, *monster.status_turns,
+                                player.current_hp, player.defense_buff, player.status_mask, *player.status_turns,
+                                *draw, *discard, *(hand if hand is not None else _NO_HAND))
+
+# --- プレイヤーのモデル ---
+# インテントが攻撃なら防御カードを先に使い、そうでなければ防御は使わない。
+# その後は 弱体化 → 攻撃（1コストあたりの威力が高い順）→ 自己強化 の順に使えるだけ使う。
+
+def _card_priority(card_index: int, defend: bool) -> tuple[int, float] | None:
+    action = COMPILED_ACTIONS[ACTION_IDS[card_index]]
+    if not action.steps:
+        return None
+    step = action.steps[0]
+    if isinstance(step, AddBlock):
+        return (0, 0.0) if defend else None
+    if isinstance(step, ApplyStatus):
+        return (3, 0.0) if step.to_self else (1, 0.0)
+    if _is_damage_step(step):
+        return (2, -getattr(step, "power", 0) / max(action.cost, 1))
+    return None
+
+def _build_play_order(defend: bool) -> tuple[int, ...]:
+    ranked = []
+    for i in range(len(ACTION_IDS)):
+        priority = _card_priority(i, defend)
+        if priority is not None:
+            ranked.append((priority, i))
+    return tuple(i for _, i in sorted(ranked))
+
+# 行動は使われたときにコンパイルするので、どちらも最初に必要になったときに作る
+_PLAY_ORDERS: dict[bool, tuple[int, ...]] = {}
+_INTENT_DEALS_DAMAGE: dict[str, bool] = {}
+
+def _play_order(intent_id: str) -> tuple[int, ...]:
+    defend = _INTENT_DEALS_DAMAGE.get(intent_id)
+    if defend is None:
+        defend = _INTENT_DEALS_DAMAGE[intent_id] = any(_is_damage_step(step) for step in COMPILED_MONSTER_ACTIONS[intent_id].steps)
+    order = _PLAY_ORDERS.get(defend)
+    if order is None:
+        order = _PLAY_ORDERS[defend] = _build_play_order(defend)
+    return order
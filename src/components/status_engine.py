@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+import math
+from typing import Callable
+from ..data.status_effect_data import STATUS_EFFECTS
+
+# 状態異常IDを小さな整数に割り当てる（Characterはこの番号で配列とビットマスクを持つ）
+STATUS_IDS: tuple[str, ...] = tuple(STATUS_EFFECTS.keys())
+STATUS_INDEX: dict[str, int] = {status_id: i for i, status_id in enumerate(STATUS_IDS)}
+STATUS_COUNT: int = len(STATUS_IDS)
+
+# 状態異常が反応するタイミング
+TRIGGER_INCOMING_DAMAGE = 0 # 被ダメージ計算: handler(character, damage) -> damage
+TRIGGER_OUTGOING_DAMAGE = 1 # 与ダメージ計算: handler(character, damage) -> damage
+TRIGGER_END_OF_TURN = 2 # ターン終了時: handler(character) -> None
+TRIGGER_COUNT = 3
+
+class StatusRegistry:
+    """
+    タイミングごとに、そのタイミングで効果を持つ状態異常のハンドラだけを登録しておく。
+    各フックは該当する状態異常のビットが立っているときだけハンドラを呼ぶ。
+    """
+    def __init__(self):
+        self.handlers: list[tuple[tuple[int, Callable], ...]] = [() for _ in range(TRIGGER_COUNT)]
+        self.masks: list[int] = [0] * TRIGGER_COUNT
+
+    def register(self, trigger: int, status_id: str, handler: Callable):
+        bit = 1 << STATUS_INDEX[status_id]
+        self.handlers[trigger] = self.handlers[trigger] + ((bit, handler),)
+        self.masks[trigger] |= bit
+
+# --- 状態異常の type ごとのハンドラ生成 ---
+
+def _damage_multiplier(status_data: dict) -> Callable:
+    value = status_data["value"]
+    def handler(character, damage: int) -> int:
+        return math.ceil(damage * value)
+    return handler
+
+def _end_of_turn_heal(status_data: dict) -> Callable:
+    value = status_data["value"]
+    def handler(character):
+        character.heal(value)
+    return handler
+
+STATUS_TYPE_HANDLERS: dict[str, tuple[int, Callable[[dict], Callable]]] = {
+    "incoming_damage_modifier": (TRIGGER_INCOMING_DAMAGE, _damage_multiplier),
+    "outgoing_damage_modifier": (TRIGGER_OUTGOING_DAMAGE, _damage_multiplier),
+    "end_of_turn_heal": (TRIGGER_END_OF_TURN, _end_of_turn_heal),
+}
+
+def build_registry() -> StatusRegistry:
+    registry = StatusRegistry()
+    for status_id, status_data in STATUS_EFFECTS.items():
+        if status_data["type"] not in STATUS_TYPE_HANDLERS:
+            raise ValueError(f"状態異常 '{status_id}' の type '{status_data['type']}' は未対応です")
+        trigger, factory = STATUS_TYPE_HANDLERS[status_data["type"]]
+        registry.register(trigger, status_id, factory(status_data))
+    return registry
+
+STATUS_REGISTRY: StatusRegistry = build_registry()
@@ -3,7 +3,22 @@
 # ゲーム設定
 SCREEN_WIDTH: int = 1000
 SCREEN_HEIGHT: int = 600
-FPS: int = 60
+FPS: int = 60 # 描画の上限フレームレート
+LOGIC_HZ: int = 60 # ゲームロジック (update_state) を進める固定の頻度。描画のフレームレートには依存しない
+MAX_FRAME_TIME_MS: float = 250 # 1フレームで追いつくロジックの時間の上限（ウィンドウのドラッグなどで止まった後に一気に進めない）
+DIRTY_RECT_RENDERING: bool = False # Trueで変化した領域だけを画面に転送する（低スペック端末向け）
+REPORT_STARTUP_TIMES: bool = False # Trueで起動時の各フェーズ（フォントの探索など）にかかった時間を表示する
+# 敵のターンの演出の間隔 [ms]: ターン終了 → 敵の行動 → 状態異常の経過 → ドロー
+ENEMY_ACTION_DELAY_MS: int = 1000
+ENEMY_TURN_END_DELAY_MS: int = 300
+DRAW_PHASE_DELAY_MS: int = 200
+MONSTER_AI_DEPTH: int = 0 # 1以上でモンスターが先読み (expectimax) して行動を選ぶ。0ならランダム
+MONSTER_AI_TIME_BUDGET_MS: float = 8.0 # モンスターAIの1回の判断にかける時間の上限
+ENCOUNTER_ID: str | None = None # data/encounter_data.py の編成IDを指定すると複数の敵と戦う。Noneならランダムな1体
+# ゲームデータ（行動・モンスター・レリックなど）を読むコンテンツパック（python -m src.data.content_pack build で作る）。
+# 相対パスは src のあるフォルダから見る。ファイルが無い、data/ の定義より古い、または読めない場合は組み込みの定義を使う
+CONTENT_PACK_PATH: str | None = "content.pack"
+BATTLE_RECORD_DIR: str | None = None # 指定すると決着した戦闘の記録をこのフォルダに保存する（不具合の再現用）
 
 # 色定義
 BLACK: tuple[int, int, int] = (0, 0, 0)
@@ -28,7 +28,7 @@ ACTIONS = {
     "guard": {
         "name": "防御",
         "type": "skill",
-        "power": 10,  # 次に受けるダメージをこの値だけ減らす
+        "block": 10,  # 次に受けるダメージをこの値だけ減らす
         "cost": 1,
         "description": "次に受けるダメージを{power}軽減する。",
     },
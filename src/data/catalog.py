@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+import os
+import random
+from collections.abc import Callable, Iterator, Mapping
+from ..config import settings
+from . import action_data, monster_data, monster_action_data, relic_data, encounter_data
+from .action_data import ACTIONS
+from .monster_data import MONSTERS
+from .monster_action_data import MONSTER_ACTIONS
+from .status_effect_data import STATUS_EFFECTS
+from .relic_data import RELICS
+from .encounter_data import ENCOUNTERS
+
+class Catalog:
+    """
+    定義データ（ID → 辞書）に副次インデックスを付けたもの。
+    - by(フィールド, 値) は そのフィールドが値に一致するIDの一覧を O(1) で返す
+    - where(...) / choice(...) の絞り込み結果はメモしておき、同じ条件なら作り直さない
+    インデックスはフィールドごとに最初に使われたときに1回だけ作る。
+    リスト値のフィールド（tags など）は要素ごとに登録する。
+    derived_fields には定義にないフィールドを「エントリ → 値」の関数で加えられる（is_debuff など）。
+    """
+    def __init__(self, entries: Mapping[str, dict], indexed_fields: tuple[str, ...] = (),
+                 derived_fields: Mapping[str, Callable[[dict], object]] | None = None):
+        self.entries = entries
+        self.indexed_fields = indexed_fields
+        self.derived_fields = derived_fields or {}
+        self._ids: tuple[str, ...] | None = None
+        self._indexes: dict[str, dict[object, tuple[str, ...]]] = {}
+        self._filtered: dict[frozenset, tuple[str, ...]] = {}
+
+    def __getitem__(self, entry_id: str) -> dict:
+        return self.entries[entry_id]
+
+    def __contains__(self, entry_id: object) -> bool:
+        return entry_id in self.entries
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.ids)
+
+    def get(self, entry_id: str, default: dict | None = None) -> dict | None:
+        return self.entries.get(entry_id, default)
+
+    @property
+    def ids(self) -> tuple[str, ...]:
+        """全IDを定義順に"""
+        if self._ids is None:
+            self._ids = tuple(self.entries)
+        return self._ids
+
+    def _index(self, field: str) -> dict[object, tuple[str, ...]]:
+        index = self._indexes.get(field)
+        if index is None:
+            derive = self.derived_fields.get(field)
+            if derive is None and field not in self.indexed_fields:
+                raise KeyError(f"'{field}' はインデックスの対象ではありません")
+            buckets: dict[object, list[str]] = {}
+            for entry_id in self.ids:
+                entry = self.entries[entry_id]
+                value = derive(entry) if derive else entry.get(field)
+                if value is None:
+                    continue
+                for item in (value if isinstance(value, (list, tuple)) else (value,)):
+                    buckets.setdefault(item, []).append(entry_id)
+            index = self._indexes[field] = {value: tuple(ids) for value, ids in buckets.items()}
+        return index
+
+    def by(self, field: str, value) -> tuple[str, ...]:
+        return self._index(field).get(value, ())
+
+    def values_of(self, field: str) -> tuple:
+        """フィールドが取る値の一覧"""
+        return tuple(self._index(field))
+
+    def where(self, **criteria) -> tuple[str, ...]:
+        """
+        すべての条件に一致するIDを定義順に返す。条件なしなら全ID。
+        値にリストを渡すと、そのすべての要素に一致するもの（リスト値のフィールドならすべてを含むもの）に絞る。
+        例: where(type="attack", cost=1)、where(tags="starter")、where(tags=["starter", "fire"])
+        """
+        pairs = []
+        for field, value in criteria.items():
+            if isinstance(value, (list, tuple, set, frozenset)):
+                pairs.extend((field, item) for item in value)
+            else:
+                pairs.append((field, value))
+        try:
+            key = frozenset(pairs)
+        except TypeError:
+            raise TypeError(f"where() の条件に使えない値です: {criteria}") from None
+        if not key:
+            return self.ids
+        ids = self._filtered.get(key)
+        if ids is None:
+            buckets = sorted((self.by(field, value) for field, value in key), key=len)
+            if len(buckets) == 1:
+                ids = buckets[0]
+            else:
+                rest = [set(bucket) for bucket in buckets[1:]]
+                ids = tuple(entry_id for entry_id in buckets[0] if all(entry_id in bucket for bucket in rest))
+            self._filtered[key] = ids
+        return ids
+
+    def choice(self, rng: random.Random, **criteria) -> str | None:
+        """条件に一致するIDから1つ選ぶ。一致するものがなければNone"""
+        ids = self.where(**criteria)
+        return rng.choice(ids) if ids else None
+
+    def sample(self, rng: random.Random, k: int, **criteria) -> list[str]:
+        """条件に一致するIDから重複なしで最大k個選ぶ"""
+        ids = self.where(**criteria)
+        return rng.sample(ids, min(k, len(ids)))
+
+# カタログごとのインデックスを付けるフィールド
+INDEXED_FIELDS: dict[str, tuple[str, ...]] = {
+    "actions": ("type", "damage_type", "cost", "target", "effect", "tags"),
+    "monsters": ("actions", "tags"),
+    "monster_actions": ("type", "intent_type", "damage_type", "effect", "tags"),
+    "status_effects": ("type", "is_debuff", "tags"),
+    "relics": ("tags",),
+    "encounters": ("monsters", "tags"),
+}
+
+def _applies_debuff(action: dict) -> bool:
+    """行動が弱体化の状態異常（is_debuff）を付与するかどうか"""
+    effect = action.get("effect")
+    return effect is not None and STATUS_EFFECTS.get(effect, {}).get("is_debuff", False)
+
+# 定義にはなく、ほかのカタログから求めてインデックスを付けるフィールド
+DERIVED_FIELDS: dict[str, dict[str, Callable[[dict], object]]] = {
+    "actions": {"is_debuff": _applies_debuff},
+    "monster_actions": {"is_debuff": _applies_debuff},
+}
+
+# コンテンツパックから読むカタログと、パックが使えないときの組み込みの定義。
+# 状態異常は状態のビットの割り当てを読み込み時に決めるため、常に組み込みの定義を使う
+_BUILTIN_ENTRIES: dict[str, dict[str, dict]] = {
+    "actions": ACTIONS, "monsters": MONSTERS, "monster_actions": MONSTER_ACTIONS, "relics": RELICS, "encounters": ENCOUNTERS,
+}
+_SOURCE_FILES: tuple[str, ...] = tuple(module.__file__ for module in (action_data, monster_data, monster_action_data,
+                                                                        relic_data, encounter_data))
+
+def catalogs_from_pack(pack) -> dict[str, Catalog]:
+    """コンテンツパック（data.content_pack.ContentPack）の各カタログに同じインデックスを付ける"""
+    return {name: Catalog(pack[name], fields, DERIVED_FIELDS.get(name)) for name, fields in INDEXED_FIELDS.items()}
+
+def _open_runtime_pack(path: str | None):
+    """
+    実行時に使うコンテンツパックを開く。パックが無い、組み込みの定義より古い、
+    または読めない（形式やスキーマが違う）場合はNone
+    """
+    if not path:
+        return None
+    try:
+        built = os.path.getmtime(path)
+        if any(os.path.getmtime(source) > built for source in _SOURCE_FILES):
+            return None # 定義を書き換えた後にパックを作り直していない
+        from .content_pack import open_pack
+        return open_pack(path)
+    except (OSError, ValueError):
+        return None
+
+def runtime_pack_path() -> str | None:
+    """settings.CONTENT_PACK_PATH を絶対パスにする。相対パスは起動したフォルダではなく、パッケージ（src）のあるフォルダから見る"""
+    path = settings.CONTENT_PACK_PATH
+    if not path:
+        return None
+    package_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    return os.path.join(package_root, os.path.expanduser(path))
+
+RUNTIME_PACK = _open_runtime_pack(runtime_pack_path()) # 実行中は開いたままにする（エントリは引かれたときに読む）
+CATALOG_SOURCE: str = RUNTIME_PACK.path if RUNTIME_PACK else "builtin" # 起動時の報告用
+
+def _runtime_catalog(name: str) -> Catalog:
+    entries = RUNTIME_PACK[name] if RUNTIME_PACK else _BUILTIN_ENTRIES[name]
+    return Catalog(entries, INDEXED_FIELDS[name], DERIVED_FIELDS.get(name))
+
+ACTION_CATALOG = _runtime_catalog("actions")
+MONSTER_CATALOG = _runtime_catalog("monsters")
+MONSTER_ACTION_CATALOG = _runtime_catalog("monster_actions")
+STATUS_CATALOG = Catalog(STATUS_EFFECTS, INDEXED_FIELDS["status_effects"])
+RELIC_CATALOG = _runtime_catalog("relics")
+ENCOUNTER_CATALOG = _runtime_catalog("encounters")
@@ -0,0 +1,521 @@
+# -*- coding: utf-8 -*-
+# ゲームデータ（行動・モンスター・状態異常・レリック）を検査し、1つのバイナリファイル（コンテンツパック）にまとめる。
+#
+# パックの構成:
+#     ヘッダ | カタログ目録 | 文字列テーブル | リストテーブル | 各カタログのレコード
+# - 文字列はすべて文字列テーブルに1回だけ格納し、レコードからは番号で参照する
+# - レコードはカタログごとに固定長で、定義の順に並ぶ（組み込みの辞書と同じ順にIDをたどれる）
+# - IDの昇順に並べたレコード番号の列をリストテーブルに持ち、IDはそれを二分探索して引く
+# 実行時は mmap で開き、引かれたエントリだけをその場で読み出す。
+import argparse
+import json
+import math
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from collections.abc import Iterator, Mapping
+
+# --- フィールドの種類 ---
+STR = "str" # 文字列テーブルの番号
+INT = "int"
+NUM = "num" # 実数（倍率など）
+BOOL = "bool"
+COLOR = "color" # (R, G, B)
+STR_LIST = "str_list" # 文字列の並び（リストテーブル上の開始位置と個数）
+JSON = "json" # 構造が決まっていない値。JSON文字列として格納する
+
+_FIELD_FORMATS: dict[str, str] = {STR: "I", INT: "i", NUM: "d", BOOL: "?", COLOR: "3B", STR_LIST: "II", JSON: "I"}
+
+class Field:
+    def __init__(self, name: str, kind: str, required: bool = True, choices: tuple[str, ...] | None = None,
+                 ref: str | None = None):
+        self.name = name
+        self.kind = kind
+        self.required = required
+        self.choices = choices # 取りうる値（STRのみ）
+        self.ref = ref # 別カタログのIDを参照する場合、そのカタログ名（STR / STR_LIST）
+
+# カタログごとのスキーマ。ここにないキーを持つエントリは検査で弾く
+SCHEMAS: dict[str, tuple[Field, ...]] = {
+    "status_effects": (
+        Field("name", STR),
+        Field("type", STR, choices=("incoming_damage_modifier", "outgoing_damage_modifier", "end_of_turn_heal")),
+        Field("value", NUM),
+        Field("color", COLOR),
+        Field("is_debuff", BOOL),
+        Field("tags", STR_LIST, required=False),
+    ),
+    "actions": (
+        Field("name", STR),
+        Field("type", STR, choices=("attack", "skill")),
+        Field("damage_type", STR, required=False, choices=("physical", "magical")),
+        Field("power", INT, required=False),
+        Field("block", INT, required=False), # スキル: 次に受けるダメージを減らす量
+        Field("cost", INT),
+        Field("description", STR),
+        Field("target", STR, required=False, choices=("enemy", "self")),
+        Field("effect", STR, required=False, ref="status_effects"),
+        Field("tags", STR_LIST, required=False),
+    ),
+    "monster_actions": (
+        Field("name", STR),
+        Field("type", STR, choices=("attack", "attack_debuff", "wait")),
+        Field("intent_type", STR, choices=("attack", "attack_debuff", "unknown")),
+        Field("damage_type", STR, required=False, choices=("physical", "magical")),
+        Field("power", NUM, required=False),
+        Field("effect", STR, required=False, ref="status_effects"),
+        Field("effect_power", INT, required=False),
+        Field("message", STR),
+        Field("tags", STR_LIST, required=False),
+    ),
+    "monsters": (
+        Field("name", STR),
+        Field("max_hp", INT),
+        Field("max_mp", INT, required=False),
+        Field("attack_power", INT),
+        Field("actions", STR_LIST, ref="monster_actions"),
+        Field("tags", STR_LIST, required=False),
+    ),
+    "relics": (
+        Field("name", STR),
+        Field("description", STR),
+        Field("color", COLOR),
+        Field("effects", JSON, required=False),
+        Field("tags", STR_LIST, required=False),
+    ),
+    "encounters": (
+        Field("name", STR),
+        Field("monsters", STR_LIST, ref="monsters"),
+        Field("tags", STR_LIST, required=False),
+    ),
+}
+CATALOG_NAMES: tuple[str, ...] = tuple(SCHEMAS.keys())
+
+MAGIC: bytes = b"RPGP"
+VERSION: int = 2 # 2: レコードを定義の順に並べ、IDの昇順の並びを別に持つ
+_HEADER = struct.Struct("<4sHHIIII") # マジック, バージョン, カタログ数, 文字列テーブル位置, 文字列数, リストテーブル位置, リスト要素数
+_DIRECTORY_ENTRY = struct.Struct("<IIIIII") # カタログ名, スキーマ, レコード位置, レコード数, レコード長, IDの昇順の並びの位置（リストテーブル上）
+_NO_STRING: int = 0xFFFFFFFF
+
+def _record_struct(schema: tuple[Field, ...]) -> struct.Struct:
+    # 先頭は「値があるフィールド」のビットマスクとID
+    return struct.Struct("<II" + "".join(_FIELD_FORMATS[field.kind] for field in schema))
+
+def _schema_signature(schema: tuple[Field, ...]) -> str:
+    return ",".join(f"{field.name}:{field.kind}" for field in schema)
+
+def builtin_catalogs() -> dict[str, dict[str, dict]]:
+    """Pythonで書かれた既存の定義データ"""
+    from .action_data import ACTIONS
+    from .monster_data import MONSTERS
+    from .monster_action_data import MONSTER_ACTIONS
+    from .status_effect_data import STATUS_EFFECTS
+    from .relic_data import RELICS
+    from .encounter_data import ENCOUNTERS
+    return {"status_effects": STATUS_EFFECTS, "actions": ACTIONS, "monster_actions": MONSTER_ACTIONS,
+            "monsters": MONSTERS, "relics": RELICS, "encounters": ENCOUNTERS}
+
+def load_source(path: str) -> dict[str, dict[str, dict]]:
+    """外部の定義ファイル（.json / .toml）を読む。トップレベルはカタログ名ごとの {ID: 定義}"""
+    if path.endswith(".toml"):
+        import tomllib
+        with open(path, "rb") as f:
+            data = tomllib.load(f)
+    else:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    for catalog_name in data:
+        if catalog_name not in SCHEMAS:
+            raise ValueError(f"{path}: 未知のカタログ '{catalog_name}' です")
+    return data
+
+def merge_catalogs(base: dict[str, dict[str, dict]], sources: list[dict[str, dict[str, dict]]]) -> dict[str, dict[str, dict]]:
+    """外部定義を追加する。既存のIDと重複したらエラー"""
+    merged = {name: dict(base.get(name, {})) for name in CATALOG_NAMES}
+    for source in sources:
+        for catalog_name, entries in source.items():
+            for entry_id, entry in entries.items():
+                if entry_id in merged[catalog_name]:
+                    raise ValueError(f"{catalog_name} の '{entry_id}' が重複しています")
+                merged[catalog_name][entry_id] = entry
+    return merged
+
+# --- 検査 ---
+
+def validate_catalogs(catalogs: dict[str, dict[str, dict]]) -> list[str]:
+    """問題の一覧を返す（空なら問題なし）"""
+    errors = []
+    for catalog_name, schema in SCHEMAS.items():
+        fields = {field.name: field for field in schema}
+        for entry_id, entry in catalogs.get(catalog_name, {}).items():
+            where = f"{catalog_name}.{entry_id}"
+            if not isinstance(entry, dict):
+                errors.append(f"{where}: 定義が辞書ではありません")
+                continue
+            for key in entry:
+                if key not in fields:
+                    errors.append(f"{where}: 未知のキー '{key}'")
+            for field in schema:
+                if field.name not in entry:
+                    if field.required:
+                        errors.append(f"{where}: '{field.name}' がありません")
+                    continue
+                errors.extend(f"{where}.{field.name}: {message}" for message in _check_value(field, entry[field.name], catalogs))
+    if not errors:
+        # 形が正しければ、実行時と同じ変換にかけて行動として成り立つかを確かめる
+        from ..components.action_compiler import check_action_definitions
+        errors.extend(check_action_definitions(catalogs))
+    return errors
+
+def _check_value(field: Field, value, catalogs: dict[str, dict[str, dict]]) -> list[str]:
+    kind = field.kind
+    if kind == STR:
+        if not isinstance(value, str):
+            return ["文字列ではありません"]
+        if field.choices and value not in field.choices:
+            return [f"'{value}' は {field.choices} のいずれでもありません"]
+        if field.ref and value not in catalogs.get(field.ref, {}):
+            return [f"{field.ref} に '{value}' はありません"]
+    elif kind == INT:
+        if isinstance(value, bool) or not isinstance(value, int) or not -2 ** 31 <= value < 2 ** 31:
+            return ["32bit整数ではありません"]
+    elif kind == NUM:
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+            return ["数値ではありません"]
+    elif kind == BOOL:
+        if not isinstance(value, bool):
+            return ["真偽値ではありません"]
+    elif kind == COLOR:
+        if (not isinstance(value, (tuple, list)) or len(value) != 3
+                or not all(isinstance(c, int) and 0 <= c <= 255 for c in value)):
+            return ["(R, G, B) の色ではありません"]
+    elif kind == STR_LIST:
+        if not isinstance(value, (tuple, list)) or not all(isinstance(item, str) for item in value):
+            return ["文字列のリストではありません"]
+        if field.ref:
+            return [f"{field.ref} に '{item}' はありません" for item in value if item not in catalogs.get(field.ref, {})]
+    elif kind == JSON:
+        try:
+            json.dumps(value)
+        except (TypeError, ValueError):
+            return ["JSONにできない値です"]
+    return []
+
+# --- 書き出し ---
+
+class _StringTable:
+    def __init__(self):
+        self.strings: list[str] = []
+        self.index: dict[str, int] = {}
+
+    def add(self, text: str) -> int:
+        i = self.index.get(text)
+        if i is None:
+            i = self.index[text] = len(self.strings)
+            self.strings.append(text)
+        return i
+
+    def to_bytes(self) -> bytes:
+        blobs = [text.encode("utf-8") for text in self.strings]
+        offsets = array('I', [0])
+        for blob in blobs:
+            offsets.append(offsets[-1] + len(blob))
+        return offsets.tobytes() + b"".join(blobs)
+
+def build_pack(catalogs: dict[str, dict[str, dict]]) -> bytes:
+    errors = validate_catalogs(catalogs)
+    if errors:
+        raise ValueError("定義データに問題があります:\n" + "\n".join(errors))
+
+    strings = _StringTable()
+    lists = array('I')
+    directory = []
+    record_blobs = []
+    for catalog_name, schema in SCHEMAS.items():
+        record = _record_struct(schema)
+        entries = catalogs.get(catalog_name, {})
+        rows = []
+        for entry_id, entry in entries.items():
+            mask = 0
+            values = [strings.add(entry_id)]
+            for bit, field in enumerate(schema):
+                present = field.name in entry
+                if present:
+                    mask |= 1 << bit
+                values.extend(_encode_value(field.kind, entry[field.name] if present else None, strings, lists))
+            rows.append(record.pack(mask, *values))
+        order_start = len(lists)
+        lists.extend(sorted(range(len(rows)), key=list(entries).__getitem__))
+        directory.append((strings.add(catalog_name), strings.add(_schema_signature(schema)), len(entries), record.size, order_start))
+        record_blobs.append(b"".join(rows))
+
+    string_blob = strings.to_bytes()
+    list_blob = lists.tobytes()
+    strings_offset = _HEADER.size + _DIRECTORY_ENTRY.size * len(directory)
+    lists_offset = strings_offset + len(string_blob)
+    records_offset = lists_offset + len(list_blob)
+
+    parts = [_HEADER.pack(MAGIC, VERSION, len(directory), strings_offset, len(strings.strings), lists_offset, len(lists))]
+    for (name_index, signature_index, count, size, order_start), blob in zip(directory, record_blobs):
+        parts.append(_DIRECTORY_ENTRY.pack(name_index, signature_index, records_offset, count, size, order_start))
+        records_offset += len(blob)
+    parts.append(string_blob)
+    parts.append(list_blob)
+    parts.extend(record_blobs)
+    return b"".join(parts)
+
+def _encode_value(kind: str, value, strings: _StringTable, lists: array) -> tuple:
+    """値がない場合（value=None）は0埋め"""
+    if kind == STR:
+        return (_NO_STRING if value is None else strings.add(value),)
+    if kind == INT:
+        return (value or 0,)
+    if kind == NUM:
+        return (float(value or 0),)
+    if kind == BOOL:
+        return (bool(value),)
+    if kind == COLOR:
+        return tuple(value) if value is not None else (0, 0, 0)
+    if kind == STR_LIST:
+        if value is None:
+            return (0, 0)
+        start = len(lists)
+        lists.extend(strings.add(item) for item in value)
+        return (start, len(value))
+    if kind == JSON:
+        return (_NO_STRING if value is None else strings.add(json.dumps(value, ensure_ascii=False)),)
+    raise ValueError(f"未対応のフィールドの種類です: {kind}")
+
+# --- 読み込み ---
+
+class ContentPack:
+    """
+    パックを mmap で開く。カタログは pack["actions"] のように取り出し、エントリは引かれたときに読み出す。
+    同じファイルを開いた複数プロセスは同じページを共有する。
+    開くときにヘッダと各テーブルの位置・長さがファイルに収まっているかを検査し、壊れていれば ValueError にする。
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self.catalogs: dict[str, PackedCatalog] = {}
+        self._string_offsets: memoryview | None = None
+        self._lists: memoryview | None = None
+        with open(path, "rb") as f:
+            self._buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) # 空のファイルは ValueError
+        try:
+            self._open_tables()
+        except ValueError:
+            self.close()
+            raise
+
+    def _check(self, condition: bool, what: str):
+        if not condition:
+            raise ValueError(f"{self.path} が壊れています（{what}）。パックを作り直してください")
+
+    def _open_tables(self):
+        buffer = self._buffer
+        file_size = len(buffer)
+        self._check(file_size >= _HEADER.size, "ヘッダが途中で切れています")
+        magic, version, catalog_count, strings_offset, string_count, lists_offset, list_count = _HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{self.path} はコンテンツパックではないか、形式が古いです")
+        self._check(_HEADER.size + catalog_count * _DIRECTORY_ENTRY.size <= strings_offset, "カタログ目録")
+
+        self._strings_base = strings_offset + 4 * (string_count + 1)
+        self._check(self._strings_base <= lists_offset and lists_offset + 4 * list_count <= file_size, "テーブルの位置")
+        self._string_offsets = memoryview(buffer)[strings_offset:self._strings_base].cast("I")
+        offsets = self._string_offsets
+        self._check(offsets[0] == 0 and all(offsets[i] <= offsets[i + 1] for i in range(string_count))
+                    and self._strings_base + offsets[string_count] <= lists_offset, "文字列テーブル")
+        self._lists = memoryview(buffer)[lists_offset:lists_offset + 4 * list_count].cast("I")
+        self._check(all(i < string_count for i in self._lists), "リストテーブル")
+
+        for i in range(catalog_count):
+            name_index, signature_index, records_offset, count, size, order_start = _DIRECTORY_ENTRY.unpack_from(
+                buffer, _HEADER.size + i * _DIRECTORY_ENTRY.size)
+            self._check(name_index < string_count and signature_index < string_count, "カタログ目録")
+            name = self.string(name_index)
+            schema = SCHEMAS.get(name)
+            if schema is None or self.string(signature_index) != _schema_signature(schema):
+                raise ValueError(f"{self.path} のカタログ '{name}' のスキーマが現在のコードと一致しません（パックを作り直してください）")
+            self._check(records_offset + count * size <= file_size, f"{name} のレコード")
+            self._check(order_start + count <= list_count, f"{name} のIDの並び")
+            id_order = array('I', self._lists[order_start:order_start + count])
+            self._check(sorted(id_order) == list(range(count)), f"{name} のIDの並び")
+            self._check(all(struct.unpack_from("<I", buffer, records_offset + j * size + 4)[0] < string_count
+                            for j in range(count)), f"{name} のID")
+            self.catalogs[name] = PackedCatalog(self, schema, records_offset, count, size, id_order)
+        missing = [name for name in CATALOG_NAMES if name not in self.catalogs]
+        self._check(not missing, f"カタログ {', '.join(missing)} がありません")
+
+    def __getitem__(self, catalog_name: str) -> "PackedCatalog":
+        return self.catalogs[catalog_name]
+
+    def string(self, index: int) -> str:
+        start = self._string_offsets[index]
+        end = self._string_offsets[index + 1]
+        return self._buffer[self._strings_base + start:self._strings_base + end].decode("utf-8")
+
+    def string_list(self, start: int, count: int) -> list[str]:
+        return [self.string(i) for i in self._lists[start:start + count]]
+
+    def close(self):
+        self.catalogs.clear()
+        for view in (self._string_offsets, self._lists):
+            if view is not None:
+                view.release()
+        self._buffer.close()
+
+class PackedCatalog(Mapping):
+    """1カタログ分のレコード。元のPython定義と同じ形の辞書を返し、IDも元の定義と同じ順にたどる"""
+    def __init__(self, pack: ContentPack, schema: tuple[Field, ...], offset: int, count: int, record_size: int,
+                 id_order: array):
+        self.pack = pack
+        self.schema = schema
+        self.offset = offset
+        self.count = count
+        self._id_order = id_order # IDの昇順に並べたレコード番号
+        self._record = _record_struct(schema)
+        if self._record.size != record_size:
+            raise ValueError("レコード長がスキーマと一致しません")
+        self._cache: dict[str, dict] = {} # 一度読んだエントリ
+
+    def _id_at(self, i: int) -> str:
+        (id_index,) = struct.unpack_from("<I", self.pack._buffer, self.offset + i * self._record.size + 4)
+        return self.pack.string(id_index)
+
+    def _find(self, entry_id: str) -> int:
+        """IDの昇順の並びを二分探索してレコード番号を返す。見つからなければ-1"""
+        order = self._id_order
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._id_at(order[mid]) < entry_id:
+                lo = mid + 1
+            else:
+                hi = mid
+        return order[lo] if lo < self.count and self._id_at(order[lo]) == entry_id else -1
+
+    def __getitem__(self, entry_id: str) -> dict:
+        entry = self._cache.get(entry_id)
+        if entry is None:
+            i = self._find(entry_id)
+            if i < 0:
+                raise KeyError(entry_id)
+            entry = self._cache[entry_id] = self._decode(i)
+        return entry
+
+    def __contains__(self, entry_id: object) -> bool:
+        return isinstance(entry_id, str) and (entry_id in self._cache or self._find(entry_id) >= 0)
+
+    def __iter__(self) -> Iterator[str]:
+        for i in range(self.count):
+            yield self._id_at(i)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _decode(self, i: int) -> dict:
+        values = self._record.unpack_from(self.pack._buffer, self.offset + i * self._record.size)
+        mask = values[0]
+        entry = {}
+        pos = 2
+        for bit, field in enumerate(self.schema):
+            kind = field.kind
+            width = 3 if kind == COLOR else 2 if kind == STR_LIST else 1
+            raw = values[pos:pos + width]
+            pos += width
+            if not mask >> bit & 1:
+                continue
+            if kind == STR:
+                entry[field.name] = self.pack.string(raw[0])
+            elif kind == COLOR:
+                entry[field.name] = tuple(raw)
+            elif kind == STR_LIST:
+                entry[field.name] = self.pack.string_list(raw[0], raw[1])
+            elif kind == JSON:
+                entry[field.name] = json.loads(self.pack.string(raw[0]))
+            else:
+                entry[field.name] = raw[0]
+        return entry
+
+def open_pack(path: str) -> ContentPack:
+    return ContentPack(path)
+
+def main():
+    parser = argparse.ArgumentParser(description="定義データを検査してコンテンツパックを作る")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = subparsers.add_parser("build", help="組み込みの定義と外部ファイルからパックを作る")
+    build_parser.add_argument("--out", default=None, help="出力先（省略時はゲームが読む settings.CONTENT_PACK_PATH）")
+    build_parser.add_argument("sources", nargs="*", help="追加の定義ファイル (.json / .toml)")
+
+    check_parser = subparsers.add_parser("check", help="定義の検査だけを行う")
+    check_parser.add_argument("sources", nargs="*")
+
+    verify_parser = subparsers.add_parser("verify", help="パックの中身が元の定義と一致するか確かめる")
+    verify_parser.add_argument("pack")
+    verify_parser.add_argument("sources", nargs="*")
+    args = parser.parse_args()
+
+    catalogs = merge_catalogs(builtin_catalogs(), [load_source(path) for path in args.sources])
+
+    if args.command == "check":
+        errors = validate_catalogs(catalogs)
+        print("\n".join(errors) if errors else "問題ありません")
+        sys.exit(1 if errors else 0)
+
+    if args.command == "build":
+        if args.out is None:
+            from .catalog import runtime_pack_path
+            args.out = runtime_pack_path()
+        try:
+            data = build_pack(catalogs)
+        except ValueError as e:
+            print(e)
+            sys.exit(1)
+        # 途中で止まっても作りかけのパックが残らないよう、同じフォルダの一時ファイルに書いてから置き換える
+        out_dir = os.path.dirname(os.path.abspath(args.out))
+        fd, temp_path = tempfile.mkstemp(dir=out_dir, prefix=".content_pack.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            umask = os.umask(0)
+            os.umask(umask)
+            os.chmod(temp_path, 0o666 & ~umask) # mkstemp は所有者だけが読める権限で作る
+            os.replace(temp_path, args.out)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+        counts = ", ".join(f"{name}={len(catalogs[name])}" for name in CATALOG_NAMES)
+        print(f"{args.out}: {os.path.getsize(args.out)} bytes ({counts})")
+        return
+
+    pack = open_pack(args.pack)
+    mismatches = []
+    for name in CATALOG_NAMES:
+        expected = catalogs[name]
+        if sorted(pack[name]) != sorted(expected):
+            mismatches.append(f"{name}: IDの集合が一致しません")
+            continue
+        if list(pack[name]) != list(expected):
+            mismatches.append(f"{name}: IDの並びが一致しません")
+        for entry_id, entry in expected.items():
+            if _normalize(pack[name][entry_id]) != _normalize(entry):
+                mismatches.append(f"{name}.{entry_id}: 内容が一致しません")
+    pack.close()
+    print("\n".join(mismatches) if mismatches else "一致しました")
+    sys.exit(1 if mismatches else 0)
+
+def _normalize(value):
+    """比較用にタプルとリストの違いをなくす"""
+    if isinstance(value, dict):
+        return {key: _normalize(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(item) for item in value]
+    return value
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,8 @@
+# -*- coding: utf-8 -*-
+
+DECKS = {
+    "default": {
+        "name": "初期デッキ",
+        "cards": (["slash"] * 6) + (["guard"] * 5) + (["fire_ball"] * 1) + (["expose_weakness"] * 2) + (["healing_light"] * 1),
+    }
+}
@@ -0,0 +1,22 @@
+# -*- coding: utf-8 -*-
+
+# 複数の敵と同時に戦う編成。monsters は MONSTERS のIDを並び順（画面の左から）に並べる
+ENCOUNTERS = {
+    "slime_pair": {
+        "name": "スライムの群れ",
+        "monsters": ["slime", "slime"]
+    },
+    "goblin_raid": {
+        "name": "ゴブリンの襲撃",
+        "monsters": ["goblin", "slime", "goblin"]
+    },
+    "mage_guard": {
+        "name": "魔法使いと護衛",
+        "monsters": ["slime", "mage", "slime"]
+    },
+    "slime_swarm": {
+        "name": "スライムの大群",
+        "monsters": ["slime", "slime", "slime", "slime", "slime", "slime", "slime", "slime"],
+        "tags": ["stress"] # 描画・シミュレーションの負荷確認用（まともには勝てない）
+    }
+}
@@ -6,6 +6,7 @@ RELICS = {
         "name": "赤い石",
         "description": "攻撃力が1上昇する。",
         "color": settings.RED,
+        "tags": ["starter"], # 戦闘開始時に持っているレリック
         "effects": [
             {"type": "stat_change", "stat": "attack_power", "value": 1}
         ]
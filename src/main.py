@@ -1,29 +1,91 @@
 # -*- coding: utf-8 -*-
 import pygame
 import sys
+from time import perf_counter_ns
 from .scenes.battle_scene import BattleScene
+from .scenes.input_pipeline import InputPipeline
+from .scenes.scheduler import VirtualClock
 from .views.battle_view import BattleView
+from .views.frame_profiler import FrameProfiler
 from .config import settings
+from .data.catalog import CATALOG_SOURCE
 
 class BattleGame:
     def __init__(self) -> None:
+        # 起動の各フェーズにかかった時間 [ms]（フォントの探索・読み込みは最初の描画時に FontProvider が測る）
+        self.startup_times: dict[str, float] = {}
+        t = perf_counter_ns()
         pygame.init()
-        self.battle_scene = BattleScene()
-        self.battle_view = BattleView()
+        t = self._record_startup("pygame.init", t)
+        # シーンの時計はロジックの固定ステップでだけ進める（敵のターンの演出の間隔がフレームレートに依存しない）
+        self.logic_clock = VirtualClock()
+        self.battle_scene = BattleScene(clock=self.logic_clock)
+        t = self._record_startup("scene", t)
+        self.profiler = FrameProfiler(settings.FPS)
+        self.battle_view = BattleView(dirty_rects=settings.DIRTY_RECT_RENDERING, profiler=self.profiler)
+        t = self._record_startup("view", t)
+        self.input_pipeline = InputPipeline()
         self.clock: pygame.time.Clock = pygame.time.Clock()
 
+    def _record_startup(self, phase: str, start: int) -> int:
+        now = perf_counter_ns()
+        self.startup_times[phase] = (now - start) / 1e6
+        return now
+
+    def startup_report(self) -> str:
+        lines = ["startup:"]
+        lines.extend(f"  {phase:<14}{ms:8.2f} ms" for phase, ms in self.startup_times.items())
+        lines.append(self.battle_view.fonts.report())
+        lines.append(f"data: {CATALOG_SOURCE}")
+        return "\n".join(lines)
+
     def run(self) -> None:
         running = True
+        first_frame = True
+        logic_steps = 0
+        accumulator = 0.0 # まだロジックに反映していない経過時間 [ms]
+        step_ms = 1000 / settings.LOGIC_HZ
+        previous = perf_counter_ns()
         while running:
+            now = perf_counter_ns()
+            accumulator += min((now - previous) / 1e6, settings.MAX_FRAME_TIME_MS)
+            previous = now
+
+            # F3でプロファイラを切り替える。無効なフレームでは計測処理を一切通らない
+            profiler = self.profiler if self.profiler.enabled else None
+            t = profiler.begin_frame() if profiler else 0
+
             # イベント処理
-            for event in pygame.event.get():
+            events = pygame.event.get()
+            for event in events:
                 if event.type == pygame.QUIT:
                     running = False
-                # イベント全体をシーンに渡すことで、より柔軟な入力処理が可能になります
-                self.battle_scene.process_input(event)
+                elif event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                    self.profiler.toggle()
+            # 連続したマウス移動をまとめ、不要なイベントを捨ててからシーンに渡す
+            batch = self.input_pipeline.build_batch(events, self.battle_scene.accepts_pointer_input())
+            self.battle_scene.process_input_batch(batch)
+            if profiler:
+                t = profiler.lap("input", t)
             
-            self.battle_scene.update_state()
-            self.battle_view.draw(self.battle_scene)
+            # 溜まった時間の分だけ固定ステップでロジックを進める（遅いフレームでは複数回、速いフレームでは0回）
+            while accumulator >= step_ms:
+                accumulator -= step_ms
+                logic_steps += 1
+                self.logic_clock.advance_to(logic_steps * 1000 // settings.LOGIC_HZ)
+                self.battle_scene.update_state()
+            if profiler:
+                profiler.lap("update", t) # 描画の区間は BattleView が自分で測る
+            draw_start = perf_counter_ns() if first_frame else 0
+            # 演出はロジックの時刻に端数を足した時刻で描く（ステップの間も滑らかに動く）
+            self.battle_view.draw(self.battle_scene, self.logic_clock.now() + accumulator)
+            if profiler:
+                profiler.end_frame()
+            if first_frame:
+                first_frame = False
+                self._record_startup("first_frame", draw_start)
+                if settings.REPORT_STARTUP_TIMES:
+                    print(self.startup_report())
 
             self.clock.tick(settings.FPS)
         
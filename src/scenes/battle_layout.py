@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+import pygame
+from bisect import bisect_right
+from ..config import settings
+
+class BattleLayout:
+    """
+    手札・レリック・ターン終了ボタンなどの配置を一か所で計算する。
+    描画側と入力側が同じRectを参照するので、見た目とクリック判定がずれない。
+    手札枚数・レリック数・敵の数が変わったときだけ再計算する。
+    """
+    CARD_WIDTH: int = 120
+    CARD_HEIGHT: int = 170
+    CARD_OVERLAP_X: int = 80 # カード左端どうしの間隔
+    CARD_HOVER_LIFT: int = 30 # ホバー中のカードを持ち上げる量
+    RELIC_RADIUS: int = 15
+    RELIC_GAP: int = 10
+    END_TURN_BUTTON_SIZE: tuple[int, int] = (120, 40)
+    ENEMY_BOX_SIZE: tuple[int, int] = (80, 100)
+    ENEMY_COMPACT_BOX_SIZE: tuple[int, int] = (60, 50) # 2段に並べるとき
+    ENEMY_AREA_LEFT: int = 440 # 敵を並べる領域の左端（プレイヤーのステータスと被らない位置）
+    ENEMY_AREA_TOP: int = 65 # 1段目の敵の名前の上端
+    ENEMY_MAX_COLUMNS: int = 4 # これより多ければ2段にする
+    ENLARGED_CARD_SIZE: tuple[int, int] = (240, 340) # ホバー中のカードの拡大表示
+    RELIC_DETAIL_SIZE: tuple[int, int] = (300, 150) # ホバー中のレリックの説明
+
+    def __init__(self, screen_width: int = settings.SCREEN_WIDTH, screen_height: int = settings.SCREEN_HEIGHT):
+        self.screen_width = screen_width
+        self.screen_height = screen_height
+
+        # 画面下部のログ / コマンドエリア
+        log_area_height = int(screen_height / 4)
+        log_area_y = screen_height - log_area_height
+        self.log_area_rect = pygame.Rect(0, log_area_y, screen_width, log_area_height)
+
+        button_width, button_height = self.END_TURN_BUTTON_SIZE
+        button_x = screen_width - button_width - 150 # 捨て札表示と被らないように左にずらす
+        button_y = log_area_y - button_height - 10 # ログエリアの上に配置
+        self.end_turn_button_rect = pygame.Rect(button_x, button_y, button_width, button_height)
+
+        # 拡大表示は画面中央（カードは手札と被りにくいように少し上）
+        card_width, card_height = self.ENLARGED_CARD_SIZE
+        self.enlarged_card_rect = pygame.Rect((screen_width - card_width) / 2, (screen_height - card_height) / 2 - 50,
+                                              card_width, card_height)
+        detail_width, detail_height = self.RELIC_DETAIL_SIZE
+        self.relic_detail_rect = pygame.Rect((screen_width - detail_width) / 2, (screen_height - detail_height) / 2,
+                                             detail_width, detail_height)
+
+        self.card_rects: list[pygame.Rect] = []
+        self.hovered_card_rects: list[pygame.Rect] = []
+        self._card_lefts: list[int] = []
+        self.relic_rects: list[pygame.Rect] = []
+        self._relic_lefts: list[int] = []
+        self.enemy_rects: list[pygame.Rect] = []
+        self._card_count: int = -1
+        self._relic_count: int = -1
+        self._enemy_count: int = -1
+
+    def sync(self, card_count: int, relic_count: int, enemy_count: int = 1):
+        """枚数が変わっていれば配置を計算し直す"""
+        if card_count != self._card_count:
+            self._layout_cards(card_count)
+        if relic_count != self._relic_count:
+            self._layout_relics(relic_count)
+        if enemy_count != self._enemy_count:
+            self._layout_enemies(enemy_count)
+
+    def _layout_cards(self, card_count: int):
+        self._card_count = card_count
+        total_width = (card_count - 1) * self.CARD_OVERLAP_X + self.CARD_WIDTH
+        start_x = (self.screen_width - total_width) / 2
+        card_y = self.screen_height - self.CARD_HEIGHT - 10
+
+        self.card_rects = [pygame.Rect(start_x + i * self.CARD_OVERLAP_X, card_y, self.CARD_WIDTH, self.CARD_HEIGHT)
+                           for i in range(card_count)]
+        self.hovered_card_rects = [rect.move(0, -self.CARD_HOVER_LIFT) for rect in self.card_rects]
+        self._card_lefts = [rect.left for rect in self.card_rects]
+
+    def _layout_relics(self, relic_count: int):
+        self._relic_count = relic_count
+        size = self.RELIC_RADIUS * 2
+        self.relic_rects = [pygame.Rect(self.RELIC_GAP + i * (size + self.RELIC_GAP), self.RELIC_GAP, size, size)
+                            for i in range(relic_count)]
+        self._relic_lefts = [rect.left for rect in self.relic_rects]
+
+    def _layout_enemies(self, enemy_count: int):
+        """敵の本体の矩形。1体なら従来の位置、4体までは横一列、それより多ければ2段に並べる"""
+        self._enemy_count = enemy_count
+        if enemy_count <= 1:
+            width, height = self.ENEMY_BOX_SIZE
+            self.enemy_rects = [pygame.Rect(self.screen_width - 200, self.screen_height // 2 - 100, width, height)]
+            return
+
+        rows = 1 if enemy_count <= self.ENEMY_MAX_COLUMNS else 2
+        columns = -(-enemy_count // rows)
+        cell_width = (self.screen_width - self.ENEMY_AREA_LEFT - 20) // columns
+        if rows == 1:
+            width, height = self.ENEMY_BOX_SIZE
+            row_tops = [self.screen_height // 2 - 100]
+        else:
+            width, height = self.ENEMY_COMPACT_BOX_SIZE
+            # 名前の分 (40px) を空けて、ログエリアの上の山札表示までを2段に分ける
+            row_height = (self.log_area_rect.top - 50 - self.ENEMY_AREA_TOP) // 2
+            row_tops = [self.ENEMY_AREA_TOP + 40 + row * row_height for row in range(rows)]
+        self.enemy_rects = [
+            pygame.Rect(self.ENEMY_AREA_LEFT + (i % columns) * cell_width + (cell_width - width) // 2,
+                        row_tops[i // columns], width, height)
+            for i in range(enemy_count)
+        ]
+
+    def hit_test_enemy(self, pos: tuple[int, int]) -> int | None:
+        for i, rect in enumerate(self.enemy_rects):
+            if rect.collidepoint(pos):
+                return i
+        return None
+
+    def get_card_rect(self, index: int, hovered: bool = False) -> pygame.Rect:
+        return self.hovered_card_rects[index] if hovered else self.card_rects[index]
+
+    def hit_test_card(self, pos: tuple[int, int], hovered_index: int | None = None) -> int | None:
+        """
+        座標にある一番手前のカードのインデックスを返す。
+        カードは左端の昇順に並び、右のカードほど手前に描かれるので、
+        左端が座標以下のうち最も右のカード（と、その一つ左）だけを調べればよい。
+        """
+        if hovered_index is not None and hovered_index >= len(self.card_rects):
+            hovered_index = None
+        if hovered_index is not None and self.hovered_card_rects[hovered_index].collidepoint(pos):
+            return hovered_index # ホバー中のカードは最前面に描かれる
+
+        i = bisect_right(self._card_lefts, pos[0]) - 1
+        while i >= 0:
+            rect = self.card_rects[i]
+            if pos[0] >= rect.right:
+                return None # これより左のカードは右端がさらに手前で終わっている
+            if i != hovered_index and rect.collidepoint(pos):
+                return i
+            if i != hovered_index:
+                return None # 手前のカードの縦範囲外なら、奥のカードも同じ縦範囲なので当たらない
+            i -= 1 # ホバー中のカードは持ち上がっているので、その下の段は一つ左のカードを見る
+        return None
+
+    def hit_test_relic(self, pos: tuple[int, int]) -> int | None:
+        i = bisect_right(self._relic_lefts, pos[0]) - 1
+        if i >= 0 and self.relic_rects[i].collidepoint(pos):
+            return i
+        return None
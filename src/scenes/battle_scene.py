@@ -1,78 +1,137 @@
 # -*- coding: utf-8 -*-
+import os
 import pygame
-import random
 from ..components.character import Character
 from ..components.monster import Monster
-from ..data.action_data import ACTIONS
 from ..components.deck_manager import DeckManager
-from ..components.action_handler import ActionHandler
-from ..data.monster_data import MONSTERS
-from ..data.relic_data import RELICS
+from ..components.battle_engine import BattleEngine
+from ..components.monster_ai import ExpectimaxPolicy
+from ..components.hand_solver import HandSolver
+from ..components.battle_record import dump_records
 from ..config import settings
+from .battle_layout import BattleLayout
+from .scheduler import Scheduler, PygameClock, VirtualClock
 
 class BattleScene:
-    def __init__(self):
+    def __init__(self, clock: PygameClock | VirtualClock | None = None):
+        # 演出の待ち時間は Scheduler で管理する。VirtualClock を渡せば待たずに進められる
+        self.scheduler = Scheduler(clock or PygameClock())
+        # 置換表を戦闘をまたいで使い回すため、AIはシーンが持ち続ける
+        self.monster_policy: ExpectimaxPolicy | None = None
+        if settings.MONSTER_AI_DEPTH > 0:
+            self.monster_policy = ExpectimaxPolicy(settings.MONSTER_AI_DEPTH, time_budget_ms=settings.MONSTER_AI_TIME_BUDGET_MS)
+        self.hand_solver = HandSolver()
+        self.show_hint: bool = False # Hキーで切り替える
+        self.encounter_id: str | None = settings.ENCOUNTER_ID # 次の戦闘の敵の編成
         self.reset()
 
-    def reset(self):
-        # プレイヤーと敵の初期化
-        
-        # --- モンスターの生成 ---
-        monster_id = random.choice(list(MONSTERS.keys())) # 今回はランダムにモンスターを選ぶ
-        monster_data = MONSTERS[monster_id]
-        
-        self.player = Character("勇者", max_hp=100, max_mp=3, attack_power=0, x=150, y=settings.SCREEN_HEIGHT // 2 - 100)
-        self.enemy = Monster(name=monster_data["name"], max_hp=monster_data["max_hp"], attack_power=monster_data["attack_power"],
-                             actions=monster_data["actions"], x=settings.SCREEN_WIDTH - 200, y=settings.SCREEN_HEIGHT // 2 - 100)
-        
-        # ゲーム状態
-        self.turn: str = "player"
-        self.battle_log: list[str] = []
-        self.max_log_lines: int = 4
-        self.game_over: bool = False
-        self.winner = None
-        self.used_card_indices: set[int] = set()
+    def reset(self, seed: int | None = None):
+        # 戦闘ルールはBattleEngineに任せ、シーンは入力と演出のタイミングだけを扱う
+        self.scheduler.clear()
+        self.engine = BattleEngine(seed=seed, monster_policy=self.monster_policy, encounter_id=self.encounter_id)
+        self.layout = BattleLayout()
+        # 敵の位置は戦闘中に変わらないので、開始時に一度だけレイアウトの枠に合わせる
+        for enemy, rect in zip(self.enemies, self.get_layout().enemy_rects):
+            enemy.x, enemy.y = rect.topleft
         self.hovered_card_index: int | None = None
         self.hovered_relic_index: int | None = None
+        self.record_saved: bool = False
+        self._hint: tuple[tuple[int, int], tuple[int, ...]] | None = None # ((ログのバージョン, 攻撃対象), おすすめの使用順)
 
-        initial_deck = (["slash"] * 6) + (["guard"] * 5) + (["fire_ball"] * 1) + (["expose_weakness"] * 2) + (["healing_light"] * 1)
-        self.deck_manager = DeckManager(initial_deck)
-        self.deck_manager.draw_cards(5)
-        self.enemy.decide_next_action() # 最初のインテントを決定
+    # --- 描画側から参照される戦闘状態 ---
+    @property
+    def player(self) -> Character:
+        return self.engine.player
 
-        # レリックの初期化と効果の適用
-        self.player.relics.append("red_stone")
-        for relic_id in self.player.relics:
-            relic_data = RELICS.get(relic_id)
-            if relic_data and "effects" in relic_data:
-                for effect in relic_data["effects"]:
-                    if effect["type"] == "stat_change" and effect["stat"] == "attack_power":
-                        self.player.attack_power += effect["value"]
+    @property
+    def enemy(self) -> Monster:
+        """攻撃対象の敵"""
+        return self.engine.enemy
 
-        self.add_log("戦闘開始！")
+    @property
+    def enemies(self) -> list[Monster]:
+        return self.engine.enemies
+
+    @property
+    def target_index(self) -> int:
+        return self.engine.target_index
+
+    @property
+    def deck_manager(self) -> DeckManager:
+        return self.engine.deck_manager
+
+    @property
+    def turn(self) -> str:
+        return self.engine.turn
+
+    @property
+    def game_over(self) -> bool:
+        return self.engine.game_over
+
+    @property
+    def winner(self) -> str | None:
+        return self.engine.winner
+
+    @property
+    def used_card_indices(self) -> set[int]:
+        return self.engine.used_card_indices
+
+    @property
+    def battle_log(self) -> list[str]:
+        return self.engine.battle_log
+
+    @property
+    def log_version(self) -> int:
+        """ログに変化があるたびに変わる値。文章を作らずに変化を判定できる"""
+        return self.engine.events.version
+
+    @property
+    def max_log_lines(self) -> int:
+        return self.engine.max_log_lines
 
     def add_log(self, message: str):
-        self.battle_log.append(message)
-        if len(self.battle_log) > self.max_log_lines:
-            self.battle_log.pop(0)
-    
-    def _check_game_over(self):
-        if not self.enemy.is_alive:
-            self.add_log(f"{self.enemy.name}は倒れた！")
-            self.game_over = True
-            self.winner = "player"
-        elif not self.player.is_alive:
-            self.add_log(f"{self.player.name}は倒れた...")
-            self.game_over = True
-            self.winner = "enemy"
-    
+        self.engine.add_log(message)
+
+    @property
+    def hint(self) -> tuple[int, ...]:
+        """おすすめのカードの使用順（手札の番号）。表示しないときは空"""
+        if not self.show_hint or self.turn != "player" or self.game_over:
+            return ()
+        # カードを使うたびにイベントが増えるので、ログのバージョンか攻撃対象が変わったときだけ解き直す
+        version = (self.log_version, self.target_index)
+        if self._hint is None or self._hint[0] != version:
+            self._hint = (version, tuple(self.hand_solver.solve_engine(self.engine).card_indices))
+        return self._hint[1]
+
+    def get_layout(self) -> BattleLayout:
+        """手札枚数・レリック数・敵の数に合わせた配置を返す（変化がなければ再計算しない）"""
+        self.layout.sync(len(self.deck_manager.hand), len(self.player.relics), len(self.enemies))
+        return self.layout
+
     def end_player_turn(self):
-        self.turn = "enemy"
-        self.add_log("プレイヤーのターン終了")
-        self.player.decrement_status_effects() # プレイヤーのターン終了処理
-        self.deck_manager.discard_hand()
-        self.used_card_indices.clear() # ターン終了時にリセット
+        self.engine.end_turn()
         self.hovered_card_index = None
+        if self.turn == "enemy" and not self.game_over:
+            self.scheduler.schedule(settings.ENEMY_ACTION_DELAY_MS, self._enemy_act)
+
+    # --- 敵のターンの演出: 行動 → (待ち) → 状態異常のターン経過と次のインテント → (待ち) → ドロー ---
+
+    def _enemy_act(self):
+        if self.engine.enemy_act():
+            self.scheduler.schedule(settings.ENEMY_TURN_END_DELAY_MS, self._end_enemy_turn)
+
+    def _end_enemy_turn(self):
+        self.engine.end_enemy_turn()
+        self.scheduler.schedule(settings.DRAW_PHASE_DELAY_MS, self.engine.start_player_turn)
+
+    def accepts_pointer_input(self) -> bool:
+        """マウス操作を受け付ける状態かどうか"""
+        return self.turn == "player" and not self.game_over
+
+    def process_input_batch(self, events: list[pygame.event.Event]):
+        """InputPipelineでまとめた1フレーム分のイベントを処理する"""
+        for event in events:
+            self.process_input(event)
 
     def process_input(self, event: pygame.event.Event):
         # ゲームオーバー時のリスタート処理
@@ -82,116 +141,68 @@ class BattleScene:
 
         # プレイヤーのターン中の入力処理
         if self.turn == "player" and not self.game_over:
-            # マウスクリック処理
-            log_area_height = int(settings.SCREEN_HEIGHT / 4)
-            log_area_y = settings.SCREEN_HEIGHT - log_area_height
+            layout = self.get_layout()
 
             # --- MOUSEMOTIONでホバー状態を更新 ---
             if event.type == pygame.MOUSEMOTION:
-                self.hovered_card_index = None # いったんリセット
-                self.hovered_relic_index = None # レリックもリセット
-
                 # レリックのホバー判定
-                from ..views.drawers.relic_drawer import RelicDrawer # 循環インポートを避けるためここでインポート
-                relic_drawer = RelicDrawer({}) # フォントは不要なので空辞書
-                for i, relic_id in enumerate(self.player.relics):
-                    relic_rect = relic_drawer.get_relic_rect(i)
-                    if relic_rect.collidepoint(event.pos):
-                        self.hovered_relic_index = i
-                        break
-
-                
-                num_commands = len(self.deck_manager.hand)
-                if num_commands > 0:
-                    card_width = 120
-                    card_height = 170
-                    overlap_x = 80
-                    total_width = (num_commands - 1) * overlap_x + card_width
-                    start_x = (settings.SCREEN_WIDTH - total_width) / 2
-                    card_y = settings.SCREEN_HEIGHT - card_height - 10
-
-                    # マウスカーソルがどのカードの上にあるか逆順でチェック（手前のカードを優先）
-                    for i in range(num_commands - 1, -1, -1):
-                        current_card_x = start_x + i * overlap_x
-                        card_rect = pygame.Rect(current_card_x, card_y, card_width, card_height)
-                        # ホバーされているカードは少し上にずれるので、その分も考慮
-                        if self.hovered_card_index == i:
-                            card_rect.y -= 30
-
-                        if card_rect.collidepoint(event.pos):
-                            action_id = self.deck_manager.hand[i]
-                            action = ACTIONS[action_id]
-                            can_afford = self.player.current_mana >= action.get("cost", 0)
-
-                            if i not in self.used_card_indices and can_afford:
-                                self.hovered_card_index = i
-                            break
+                self.hovered_relic_index = layout.hit_test_relic(event.pos)
+
+                # マウスカーソルの下にある一番手前のカードを探す
+                i = layout.hit_test_card(event.pos, self.hovered_card_index)
+                if i is not None and not self.engine.can_play_card(i):
+                    i = None # 使えないカードはホバー表示しない
+                self.hovered_card_index = i
 
             if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
                 # ターン終了ボタンの判定
-                button_width = 120
-                button_height = 40
-                button_x = settings.SCREEN_WIDTH - button_width - 150 # 捨て札表示と被らないように左にずらす
-                button_y = log_area_y - button_height - 10
-                end_turn_button_rect = pygame.Rect(button_x, button_y, button_width, button_height)
-                if end_turn_button_rect.collidepoint(event.pos):
+                if layout.end_turn_button_rect.collidepoint(event.pos):
                     self.end_player_turn()
                     return # 他のクリック処理は行わない
 
-            if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-                # ログエリアがコマンド選択エリアになる
-                # クリックされたのがコマンドカード上か判定
+                # 敵をクリックしたら攻撃対象にする（次に使うカードから対象が変わる）
+                enemy_index = layout.hit_test_enemy(event.pos)
+                if enemy_index is not None:
+                    self.engine.select_target(enemy_index)
+                    return
+
                 # ホバーされているカードがクリックされたか判定
                 if self.hovered_card_index is not None:
                     i = self.hovered_card_index
-                    num_commands = len(self.deck_manager.hand)
-                    card_width = 120
-                    card_height = 170
-                    overlap_x = 80
-                    total_width = (num_commands - 1) * overlap_x + card_width
-                    start_x = (settings.SCREEN_WIDTH - total_width) / 2
-                    card_y = settings.SCREEN_HEIGHT - card_height - 10 - 30 # ホバー時のY座標
-                    
-                    current_card_x = start_x + i * overlap_x
-                    card_rect = pygame.Rect(current_card_x, card_y, card_width, card_height)
-
-                    if card_rect.collidepoint(event.pos):
+                    if layout.get_card_rect(i, hovered=True).collidepoint(event.pos):
                         # ホバーされているカードがクリックされたのでアクション実行
-                        action_id = self.deck_manager.hand[i]
-                        log_messages = ActionHandler.execute_player_action(self.player, self.enemy, action_id)
-                        for msg in log_messages:
-                            self.add_log(msg)
-                        
-                        self.used_card_indices.add(i)
-                        self._check_game_over()
+                        self.engine.play_card(i)
                         if self.game_over:
-                            self.end_player_turn()
+                            self.hovered_card_index = None
                         return # カードクリック処理はここで終了
 
         if event.type == pygame.KEYDOWN:
             key = event.key
+            if key == pygame.K_h:
+                self.show_hint = not self.show_hint
+            elif key == pygame.K_TAB and self.accepts_pointer_input():
+                self._select_next_target()
+
+    def _select_next_target(self):
+        """Tabキー: 攻撃対象を右隣の生きている敵に移す"""
+        count = len(self.enemies)
+        for offset in range(1, count):
+            if self.engine.select_target((self.target_index + offset) % count):
+                return
 
     def update_state(self):
-        if self.turn == "enemy" and not self.game_over:
-            if not hasattr(self, 'enemy_action_time'):
-                self.enemy_action_time = pygame.time.get_ticks()
-
-            if pygame.time.get_ticks() - self.enemy_action_time > 1000: # 1秒待機
-                action_id = self.enemy.next_action or self.enemy.choose_action()
-                log_messages = ActionHandler.execute_monster_action(self.enemy, self.player, action_id)
-                for msg in log_messages:
-                    self.add_log(msg)
-                
-                self._check_game_over()
-                
-                self.enemy.decide_next_action() # 次のインテントを決定
-                # 敵のターン終了処理
-                self.enemy.decrement_status_effects()
-                # プレイヤーのターンへ移行準備
-                self.turn = "player"
-                if not self.deck_manager.draw_cards(5):
-                    self.add_log("山札がありません！")
-                self.used_card_indices.clear()
-                self.player.fully_recover_mana()
-
-                del self.enemy_action_time
\ No newline at end of file
+        # 予定の時刻になった演出だけを進める（何も予定がないフレームは何もしない）
+        self.scheduler.run_due()
+
+        # 敵のターンの残りの段階まで終わってから記録する（リプレイと同じ最終状態にするため）
+        if self.game_over and not self.record_saved and not self.scheduler:
+            self.record_saved = True
+            # 時間制限つきのAIの判断は実行速度で変わり、記録からは再現できないので保存しない
+            if settings.BATTLE_RECORD_DIR and self.monster_policy is None:
+                self.save_record(settings.BATTLE_RECORD_DIR)
+
+    def save_record(self, directory: str):
+        """決着した戦闘の記録を追記する（src.simulation.replay で再生できる）"""
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, "battles.rec"), "ab") as f:
+            f.write(dump_records([self.engine.to_record()]))
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+import pygame
+
+class InputPipeline:
+    """
+    1フレーム分のイベントを、シーンに渡す前にまとめる。
+    - 連続したMOUSEMOTIONは最後の位置の1件にまとめる
+    - 今のターン状態では意味のないイベントは捨てる
+    受け取った件数と実際にシーンへ渡した件数を数えておく。
+    """
+    POINTER_EVENT_TYPES: tuple[int, ...] = (pygame.MOUSEMOTION, pygame.MOUSEBUTTONDOWN)
+
+    def __init__(self):
+        self.events_received: int = 0
+        self.events_processed: int = 0
+        self.motions_coalesced: int = 0
+        self.events_dropped: int = 0
+
+    def build_batch(self, events: list[pygame.event.Event], accepts_pointer: bool) -> list[pygame.event.Event]:
+        """
+        シーンに渡すイベント列を作る。
+        accepts_pointer がFalse（敵のターン中やゲームオーバー時）ならマウス操作は全て捨てる。
+        """
+        batch = []
+        for event in events:
+            self.events_received += 1
+            event_type = event.type
+
+            if event_type == pygame.KEYDOWN:
+                batch.append(event)
+                continue
+            if event_type not in self.POINTER_EVENT_TYPES or not accepts_pointer:
+                self.events_dropped += 1
+                continue
+            if event_type == pygame.MOUSEBUTTONDOWN and event.button != 1:
+                self.events_dropped += 1 # 左クリック以外は使わない
+                continue
+
+            if event_type == pygame.MOUSEMOTION and batch and batch[-1].type == pygame.MOUSEMOTION:
+                batch[-1] = event # 直前の移動を最新の位置で置き換える
+                self.motions_coalesced += 1
+                continue
+            batch.append(event)
+
+        self.events_processed += len(batch)
+        return batch
+
+    def reset_counters(self):
+        self.events_received = 0
+        self.events_processed = 0
+        self.motions_coalesced = 0
+        self.events_dropped = 0
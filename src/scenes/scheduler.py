@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+import heapq
+import itertools
+from typing import Callable
+import pygame
+
+class PygameClock:
+    """pygame.init() からの経過ミリ秒"""
+    def now(self) -> int:
+        return pygame.time.get_ticks()
+
+class VirtualClock:
+    """手で進める時計。ヘッドレス実行では待たずに次の予定時刻まで進める"""
+    def __init__(self, start_ms: int = 0):
+        self.time_ms = start_ms
+
+    def now(self) -> int:
+        return self.time_ms
+
+    def advance(self, ms: int):
+        self.time_ms += ms
+
+    def advance_to(self, time_ms: int):
+        self.time_ms = max(self.time_ms, time_ms)
+
+class Timer:
+    """schedule() が返す予定。cancel() で取り消せる（ヒープからは実行時に取り除く）"""
+    __slots__ = ("due_ms", "callback")
+
+    def __init__(self, due_ms: int, callback: Callable[[], None]):
+        self.due_ms = due_ms
+        self.callback: Callable[[], None] | None = callback
+
+    @property
+    def cancelled(self) -> bool:
+        return self.callback is None
+
+    def cancel(self):
+        self.callback = None
+
+class Scheduler:
+    """
+    時刻順のヒープで予定を管理する。
+    - run_due() は先頭の予定時刻と今の時刻を比べるだけなので、何も起きないフレームはO(1)
+    - コールバックの中で次の予定を入れれば、連続した演出（行動 → 状態異常 → ドロー）を順に進められる
+    - 同じ時刻の予定は入れた順に実行する
+    """
+    def __init__(self, clock: PygameClock | VirtualClock):
+        self.clock = clock
+        self._heap: list[tuple[int, int, Timer]] = []
+        self._sequence = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    @property
+    def next_due_ms(self) -> int | None:
+        return self._heap[0][0] if self._heap else None
+
+    def schedule(self, delay_ms: int, callback: Callable[[], None]) -> Timer:
+        timer = Timer(self.clock.now() + delay_ms, callback)
+        heapq.heappush(self._heap, (timer.due_ms, next(self._sequence), timer))
+        return timer
+
+    def clear(self):
+        for _, _, timer in self._heap:
+            timer.cancel()
+        self._heap.clear()
+
+    def run_due(self) -> int:
+        """予定時刻を過ぎた予定を実行し、実行した数を返す"""
+        heap = self._heap
+        if not heap:
+            return 0
+        now = self.clock.now()
+        ran = 0
+        while heap and heap[0][0] <= now:
+            _, _, timer = heapq.heappop(heap)
+            callback = timer.callback
+            if callback is not None:
+                timer.callback = None
+                callback()
+                ran += 1
+        return ran
+
+    def run_until_idle(self, max_events: int = 10000) -> int:
+        """VirtualClock 用。予定がなくなるまで時計を次の予定時刻へ進めながら実行する"""
+        ran = 0
+        while self._heap and ran < max_events:
+            self.clock.advance_to(self._heap[0][0])
+            ran += self.run_due()
+        return ran
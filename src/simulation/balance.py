@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+import argparse
+import json
+import math
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from ..components.battle_engine import BattleEngine
+from ..components.monster_ai import ExpectimaxPolicy
+from ..components.hand_solver import HandSolver, OBJECTIVES
+from ..data.catalog import MONSTER_CATALOG
+from ..data.deck_data import DECKS
+from .headless import run_battle, play_greedy_turn
+
+Z_95: float = 1.96
+
+class BattleStats:
+    """勝率・ターン数・残りHPの集計。ワーカー間で足し合わせられるよう和と二乗和だけを持つ"""
+    def __init__(self):
+        self.battles = 0
+        self.wins = 0
+        self.turns_sum = 0
+        self.turns_sq_sum = 0
+        self.hp_sum = 0
+        self.hp_sq_sum = 0
+
+    def add(self, winner: str | None, turns: int, player_hp: int):
+        self.battles += 1
+        self.wins += winner == "player"
+        self.turns_sum += turns
+        self.turns_sq_sum += turns * turns
+        self.hp_sum += player_hp
+        self.hp_sq_sum += player_hp * player_hp
+
+    def merge(self, other: "BattleStats"):
+        self.battles += other.battles
+        self.wins += other.wins
+        self.turns_sum += other.turns_sum
+        self.turns_sq_sum += other.turns_sq_sum
+        self.hp_sum += other.hp_sum
+        self.hp_sq_sum += other.hp_sq_sum
+
+    def win_rate_interval(self) -> tuple[float, float, float]:
+        """勝率とWilsonの95%信頼区間 (rate, low, high)"""
+        n = self.battles
+        if n == 0:
+            return 0.0, 0.0, 1.0
+        p = self.wins / n
+        denominator = 1 + Z_95 ** 2 / n
+        center = (p + Z_95 ** 2 / (2 * n)) / denominator
+        half = Z_95 * math.sqrt(p * (1 - p) / n + Z_95 ** 2 / (4 * n * n)) / denominator
+        return p, max(0.0, center - half), min(1.0, center + half)
+
+    def _mean_interval(self, total: int, sq_total: int) -> tuple[float, float]:
+        """平均値と95%信頼区間の半幅 (mean, half_width)"""
+        n = self.battles
+        if n == 0:
+            return 0.0, math.inf
+        mean = total / n
+        if n == 1:
+            return mean, math.inf
+        variance = max(0.0, (sq_total - n * mean * mean) / (n - 1))
+        return mean, Z_95 * math.sqrt(variance / n)
+
+    def turns_interval(self) -> tuple[float, float]:
+        return self._mean_interval(self.turns_sum, self.turns_sq_sum)
+
+    def hp_interval(self) -> tuple[float, float]:
+        return self._mean_interval(self.hp_sum, self.hp_sq_sum)
+
+    def to_dict(self) -> dict:
+        win_rate, win_low, win_high = self.win_rate_interval()
+        turns, turns_half = self.turns_interval()
+        hp, hp_half = self.hp_interval()
+        return {
+            "battles": self.battles,
+            "win_rate": win_rate, "win_rate_ci": [win_low, win_high],
+            "mean_turns": turns, "mean_turns_ci": [turns - turns_half, turns + turns_half],
+            "mean_player_hp": hp, "mean_player_hp_ci": [hp - hp_half, hp + hp_half],
+        }
+
+def chunk_seed(base_seed: int, monster_id: str, deck_id: str, chunk_index: int) -> int:
+    """実行順やワーカー数に依存しないチャンクごとのシード"""
+    return random.Random(f"{base_seed}:{monster_id}:{deck_id}:{chunk_index}").getrandbits(64)
+
+def run_chunk(monster_id: str, deck_id: str, num_battles: int, seed: int, max_turns: int, ai_depth: int = 0,
+              player_objective: str | None = None) -> BattleStats:
+    """
+    ワーカープロセスで実行される単位。チャンクのシードから各戦闘のシードを作って戦闘を回す。
+    ai_depth が1以上ならモンスターは expectimax で行動する（置換表はチャンク内で共有）。
+    player_objective を指定するとプレイヤーは HandSolver で手札を使う。Noneなら左から順に使う
+    """
+    seeds = random.Random(seed)
+    stats = BattleStats()
+    deck = DECKS[deck_id]["cards"]
+    policy = ExpectimaxPolicy(ai_depth) if ai_depth > 0 else None
+    play_turn = HandSolver(player_objective).play_turn if player_objective else play_greedy_turn
+    for _ in range(num_battles):
+        engine = BattleEngine(monster_id=monster_id, initial_deck=deck, seed=seeds.getrandbits(64), keep_log=False,
+                              monster_policy=policy)
+        result = run_battle(engine, max_turns, play_turn)
+        stats.add(result.winner, result.turns, result.player_hp)
+    return stats
+
+class BalanceRunner:
+    """
+    全モンスター × デッキの組み合わせをプロセスプールで並列に戦わせる。
+    各組み合わせは勝率の信頼区間の半幅が target_ci_width を下回った時点で打ち切る。
+    """
+    def __init__(self, monster_ids: list[str] | None = None, deck_ids: list[str] | None = None,
+                 chunk_size: int = 200, min_battles: int = 400, max_battles: int = 20000,
+                 target_ci_width: float | None = 0.02, max_turns: int = 100,
+                 workers: int | None = None, seed: int = 0, ai_depth: int = 0, player_objective: str | None = None):
+        self.monster_ids = monster_ids or list(MONSTER_CATALOG.ids)
+        self.deck_ids = deck_ids or list(DECKS.keys())
+        self.chunk_size = chunk_size
+        self.min_battles = min_battles
+        self.max_battles = max_battles
+        self.target_ci_width = target_ci_width
+        self.max_turns = max_turns
+        self.workers = workers or os.cpu_count() or 1
+        self.seed = seed
+        self.ai_depth = ai_depth
+        self.player_objective = player_objective
+
+    def _is_done(self, stats: BattleStats, submitted: int) -> bool:
+        if submitted >= self.max_battles:
+            return True
+        if self.target_ci_width is None or stats.battles < self.min_battles:
+            return False
+        _, low, high = stats.win_rate_interval()
+        return (high - low) / 2 < self.target_ci_width
+
+    def run(self) -> dict[tuple[str, str], BattleStats]:
+        cells = [(m, d) for m in self.monster_ids for d in self.deck_ids]
+        results = {cell: BattleStats() for cell in cells}
+        submitted = {cell: 0 for cell in cells}
+        next_chunk = {cell: 0 for cell in cells}
+        pending = {}
+
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            def submit(cell):
+                n = min(self.chunk_size, self.max_battles - submitted[cell])
+                seed = chunk_seed(self.seed, cell[0], cell[1], next_chunk[cell])
+                future = pool.submit(run_chunk, cell[0], cell[1], n, seed, self.max_turns, self.ai_depth, self.player_objective)
+                pending[future] = cell
+                submitted[cell] += n
+                next_chunk[cell] += 1
+
+            # 全ワーカーが常に仕事を持つよう、各組み合わせに先行してチャンクを割り当てる
+            queue = list(cells)
+            while queue or pending:
+                while queue and len(pending) < self.workers * 2:
+                    cell = queue.pop(0)
+                    if not self._is_done(results[cell], submitted[cell]):
+                        submit(cell)
+                        queue.append(cell)
+
+                if not pending:
+                    break
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    cell = pending.pop(future)
+                    results[cell].merge(future.result())
+                    if not self._is_done(results[cell], submitted[cell]) and cell not in queue:
+                        queue.append(cell)
+        return results
+
+def format_report(results: dict[tuple[str, str], BattleStats]) -> str:
+    lines = [f"{'monster':<10} {'deck':<10} {'battles':>7}  {'win rate (95% CI)':<24} {'turns':<16} {'player HP':<16}"]
+    for (monster_id, deck_id), stats in results.items():
+        win_rate, win_low, win_high = stats.win_rate_interval()
+        turns, turns_half = stats.turns_interval()
+        hp, hp_half = stats.hp_interval()
+        lines.append(
+            f"{monster_id:<10} {deck_id:<10} {stats.battles:>7}  "
+            f"{win_rate:6.1%} [{win_low:6.1%}, {win_high:6.1%}]  "
+            f"{turns:5.2f} ±{turns_half:<8.2f} {hp:6.1f} ±{hp_half:<8.1f}"
+        )
+    return "\n".join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description="モンスター × デッキの勝率をモンテカルロで集計する")
+    parser.add_argument("--monsters", nargs="*", default=None)
+    parser.add_argument("--decks", nargs="*", default=None)
+    parser.add_argument("--chunk-size", type=int, default=200)
+    parser.add_argument("--min-battles", type=int, default=400)
+    parser.add_argument("--max-battles", type=int, default=20000)
+    parser.add_argument("--ci", type=float, default=0.02, help="勝率の信頼区間の半幅がこれを下回ったら打ち切る (0で無効)")
+    parser.add_argument("--max-turns", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--ai-depth", type=int, default=0, help="モンスターAIの探索の深さ (0ならランダムに行動)")
+    parser.add_argument("--player-bot", choices=("greedy",) + OBJECTIVES, default="greedy",
+                        help="プレイヤーの手札の使い方 (greedy: 左から順に / それ以外: HandSolver の目的)")
+    parser.add_argument("--json", default=None, help="結果をJSONで書き出すパス")
+    args = parser.parse_args()
+
+    runner = BalanceRunner(args.monsters, args.decks, args.chunk_size, args.min_battles, args.max_battles,
+                           args.ci or None, args.max_turns, args.workers, args.seed, args.ai_depth,
+                           None if args.player_bot == "greedy" else args.player_bot)
+    results = runner.run()
+    print(format_report(results))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump([{"monster": m, "deck": d, **stats.to_dict()} for (m, d), stats in results.items()], f, ensure_ascii=False, indent=2)
+
+if __name__ == "__main__":
+    main()
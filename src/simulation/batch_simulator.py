@@ -0,0 +1,330 @@
+# -*- coding: utf-8 -*-
+import argparse
+import math
+import random
+import numpy as np
+from ..components.battle_engine import BattleEngine
+from ..components.action_compiler import (COMPILED_ACTIONS, COMPILED_MONSTER_ACTIONS, DealPhysicalDamage,
+                                          DealFixedDamage, DealScaledDamage, AddBlock, ApplyStatus)
+from ..components.status_engine import STATUS_IDS, STATUS_INDEX
+from ..data.status_effect_data import STATUS_EFFECTS
+from ..data.deck_data import DECKS
+from .headless import run_battle
+
+# カード効果の種類
+CARD_NONE = 0
+CARD_PHYSICAL = 1
+CARD_MAGICAL = 2
+CARD_GUARD = 3
+CARD_STATUS = 4
+
+# 勝者コード
+WINNER_NONE = 0
+WINNER_PLAYER = 1
+WINNER_ENEMY = 2
+
+class BatchBattleSimulator:
+    """
+    同じモンスター・同じデッキの戦闘N件をNumPy配列でまとめて進める。
+    HP・マナ・防御バフ・状態異常のターン数・山札/手札をすべて (N,) / (N, k) の配列で持ち、
+    ActionHandler と同じ計算式を一括で適用する。
+    山札は枚数の多重集合として持ち、非復元抽出で引く（シャッフルして上から引くのと同じ分布）。
+    モンスターの行動は常にランダムに選ぶ（expectimax は戦闘ごとの探索でまとめて進められないので、
+    AIを使う集計は balance.py の --ai-depth で BattleEngine を使う）。
+    """
+
+    def __init__(self, monster_id: str, num_battles: int, initial_deck: list[str] | None = None,
+                 seed: int | None = None, max_turns: int = 100):
+        self.monster_id = monster_id
+        self.n = num_battles
+        self.max_turns = max_turns
+        self.rng = np.random.default_rng(seed)
+
+        # プレイヤーとモンスターの初期値はBattleEngineから取る（レリック補正なども同じになる）
+        template = BattleEngine(monster_id=monster_id, initial_deck=initial_deck)
+        self.hand_size = template.HAND_SIZE
+        self.player_max_hp = template.player.max_hp
+        self.player_max_mana = template.player.max_mana
+        self.player_attack = template.player.attack_power
+        self.enemy_max_hp = template.enemy.max_hp
+        self.enemy_attack = template.enemy.attack_power
+        deck = self.initial_deck = list(initial_deck if initial_deck is not None else DECKS["default"]["cards"])
+
+        self._compile_cards(deck)
+        self._compile_monster_actions(template.enemy.actions)
+        self._compile_statuses()
+
+    # --- コンパイル済みの行動を配列に変換 ---
+    def _compile_cards(self, deck: list[str]):
+        self.card_ids: list[str] = sorted(set(deck), key=deck.index)
+        c = len(self.card_ids)
+        self.card_cost = np.zeros(c, dtype=np.int64)
+        self.card_kind = np.zeros(c, dtype=np.int64)
+        self.card_power = np.zeros(c, dtype=np.int64)
+        self.card_status = np.full(c, -1, dtype=np.int64)
+        self.card_target_self = np.zeros(c, dtype=bool)
+        for i, action_id in enumerate(self.card_ids):
+            action = COMPILED_ACTIONS[action_id]
+            self.card_cost[i] = action.cost
+            for step in action.steps:
+                if isinstance(step, DealPhysicalDamage):
+                    self.card_kind[i], self.card_power[i] = CARD_PHYSICAL, step.power
+                elif isinstance(step, DealFixedDamage):
+                    self.card_kind[i], self.card_power[i] = CARD_MAGICAL, step.power
+                elif isinstance(step, AddBlock):
+                    self.card_kind[i], self.card_power[i] = CARD_GUARD, step.amount
+                elif isinstance(step, ApplyStatus):
+                    self.card_kind[i], self.card_power[i] = CARD_STATUS, step.turns
+                    self.card_status[i] = STATUS_INDEX[step.status_id]
+                    self.card_target_self[i] = step.to_self
+        self.deck_counts_initial = np.bincount([self.card_ids.index(a) for a in deck], minlength=c)
+
+    def _compile_monster_actions(self, actions: list[str]):
+        self.monster_action_ids = list(actions) or ["wait"]
+        m = len(self.monster_action_ids)
+        self.monster_is_attack = np.zeros(m, dtype=bool)
+        self.monster_damage = np.zeros(m, dtype=np.int64)
+        self.monster_status = np.full(m, -1, dtype=np.int64)
+        self.monster_status_turns = np.zeros(m, dtype=np.int64)
+        for i, action_id in enumerate(self.monster_action_ids):
+            for step in COMPILED_MONSTER_ACTIONS[action_id].steps:
+                if isinstance(step, DealScaledDamage):
+                    self.monster_is_attack[i] = True
+                    self.monster_damage[i] = int(self.enemy_attack * step.multiplier)
+                elif isinstance(step, ApplyStatus):
+                    self.monster_status[i] = STATUS_INDEX[step.status_id]
+                    self.monster_status_turns[i] = step.turns
+
+    def _compile_statuses(self):
+        self.incoming_modifiers: list[tuple[int, float]] = []
+        self.outgoing_modifiers: list[tuple[int, float]] = []
+        self.end_of_turn_heals: list[tuple[int, int]] = []
+        for i, status_id in enumerate(STATUS_IDS):
+            status_data = STATUS_EFFECTS[status_id]
+            if status_data["type"] == "incoming_damage_modifier":
+                self.incoming_modifiers.append((i, status_data["value"]))
+            elif status_data["type"] == "outgoing_damage_modifier":
+                self.outgoing_modifiers.append((i, status_data["value"]))
+            elif status_data["type"] == "end_of_turn_heal":
+                self.end_of_turn_heals.append((i, status_data["value"]))
+
+    # --- 状態の初期化 ---
+    def _reset_state(self):
+        n, s = self.n, len(STATUS_IDS)
+        self.player_hp = np.full(n, self.player_max_hp, dtype=np.int64)
+        self.player_mana = np.full(n, self.player_max_mana, dtype=np.int64)
+        self.player_defense = np.zeros(n, dtype=np.int64)
+        self.player_status = np.zeros((n, s), dtype=np.int64)
+        self.enemy_hp = np.full(n, self.enemy_max_hp, dtype=np.int64)
+        self.enemy_defense = np.zeros(n, dtype=np.int64)
+        self.enemy_status = np.zeros((n, s), dtype=np.int64)
+        self.enemy_next_action = self.rng.integers(0, len(self.monster_action_ids), n)
+
+        self.deck_counts = np.tile(self.deck_counts_initial, (n, 1))
+        self.discard_counts = np.zeros_like(self.deck_counts)
+        self.hand = np.zeros((n, self.hand_size), dtype=np.int64)
+        self.hand_len = np.zeros(n, dtype=np.int64)
+
+        self.turns = np.ones(n, dtype=np.int64)
+        self.winner = np.full(n, WINNER_NONE, dtype=np.int64)
+        self.active = np.ones(n, dtype=bool)
+
+    # --- 山札 ---
+    def _draw_cards(self, rows: np.ndarray, num_to_draw: int):
+        for _ in range(num_to_draw):
+            deck_total = self.deck_counts.sum(axis=1)
+            # 山札が空なら捨て札をシャッフルして新しい山札にする
+            empty = rows & (deck_total == 0)
+            if empty.any():
+                self.deck_counts[empty] += self.discard_counts[empty]
+                self.discard_counts[empty] = 0
+                deck_total = self.deck_counts.sum(axis=1)
+            can_draw = rows & (deck_total > 0) & (self.hand_len < self.hand_size)
+            if not can_draw.any():
+                break
+            r = self.rng.random(self.n) * deck_total
+            card = (np.cumsum(self.deck_counts, axis=1) <= r[:, None]).sum(axis=1)
+            idx = np.nonzero(can_draw)[0]
+            self.deck_counts[idx, card[idx]] -= 1
+            self.hand[idx, self.hand_len[idx]] = card[idx]
+            self.hand_len[idx] += 1
+
+    def _discard_hand(self, rows: np.ndarray):
+        for j in range(self.hand_size):
+            idx = np.nonzero(rows & (j < self.hand_len))[0]
+            np.add.at(self.discard_counts, (idx, self.hand[idx, j]), 1)
+        self.hand_len[rows] = 0
+
+    # --- ダメージ・状態異常 ---
+    def _take_damage(self, rows: np.ndarray, damage: np.ndarray, hp: np.ndarray, defense: np.ndarray, status: np.ndarray):
+        for status_index, value in self.incoming_modifiers:
+            affected = rows & (status[:, status_index] > 0)
+            damage = np.where(affected, np.ceil(damage * value).astype(np.int64), damage)
+        actual = np.maximum(0, damage - defense)
+        defense[rows] = 0
+        hp[rows] = np.maximum(0, hp[rows] - actual[rows])
+
+    def _apply_status(self, rows: np.ndarray, status: np.ndarray, status_index: np.ndarray, turns: np.ndarray):
+        for s in range(len(STATUS_IDS)):
+            idx = np.nonzero(rows & (status_index == s))[0]
+            status[idx, s] = np.maximum(status[idx, s], turns[idx])
+
+    def _decrement_status(self, rows: np.ndarray, hp: np.ndarray, max_hp: int, status: np.ndarray):
+        for status_index, amount in self.end_of_turn_heals:
+            healing = rows & (status[:, status_index] > 0)
+            hp[healing] = np.minimum(hp[healing] + amount, max_hp)
+        status[rows] = np.maximum(0, status[rows] - 1)
+
+    # --- ターン進行 ---
+    def _play_card_slot(self, j: int):
+        """全戦闘の手札j枚目を、使えるなら一括で使用する（左から順に使う方針）"""
+        card = self.hand[:, j]
+        cost = self.card_cost[card]
+        played = self.active & (j < self.hand_len) & (self.player_mana >= cost)
+        if not played.any():
+            return
+        self.player_mana -= np.where(played, cost, 0)
+        kind = self.card_kind[card]
+        power = self.card_power[card]
+
+        physical = played & (kind == CARD_PHYSICAL)
+        if physical.any():
+            base_power = power
+            for status_index, value in self.outgoing_modifiers:
+                weakened = self.player_status[:, status_index] > 0
+                base_power = np.where(weakened, np.ceil(base_power * value).astype(np.int64), base_power)
+            base_damage = base_power + self.player_attack
+            spread = (base_damage * 0.1).astype(np.int64)
+            variance = self.rng.integers(-spread, spread + 1)
+            damage = np.maximum(1, base_damage + variance)
+            self._take_damage(physical, damage, self.enemy_hp, self.enemy_defense, self.enemy_status)
+
+        magical = played & (kind == CARD_MAGICAL)
+        if magical.any():
+            self._take_damage(magical, power, self.enemy_hp, self.enemy_defense, self.enemy_status)
+
+        guard = played & (kind == CARD_GUARD)
+        self.player_defense[guard] = power[guard]
+
+        status_card = played & (kind == CARD_STATUS)
+        if status_card.any():
+            to_self = status_card & self.card_target_self[card]
+            to_enemy = status_card & ~self.card_target_self[card]
+            self._apply_status(to_self, self.player_status, self.card_status[card], power)
+            self._apply_status(to_enemy, self.enemy_status, self.card_status[card], power)
+
+        # 敵を倒した戦闘はここで終了
+        defeated = played & (self.enemy_hp <= 0)
+        self.winner[defeated] = WINNER_PLAYER
+        self.active &= ~defeated
+
+    def _player_turn(self):
+        # 敵を倒したターンもBattleEngineと同様にターン終了処理（再生など）まで行う
+        rows = self.active.copy()
+        for j in range(self.hand_size):
+            self._play_card_slot(j)
+        self._decrement_status(rows, self.player_hp, self.player_max_hp, self.player_status)
+        self._discard_hand(rows)
+
+    def _enemy_turn(self):
+        rows = self.active
+        action = self.enemy_next_action
+        attacking = rows & self.monster_is_attack[action]
+        if attacking.any():
+            self._take_damage(attacking, self.monster_damage[action], self.player_hp, self.player_defense, self.player_status)
+            debuffing = attacking & (self.monster_status[action] >= 0)
+            self._apply_status(debuffing, self.player_status, self.monster_status[action], self.monster_status_turns[action])
+
+        defeated = rows & (self.player_hp <= 0)
+        self.winner[defeated] = WINNER_ENEMY
+        self.active &= ~defeated
+        rows = self.active.copy()
+
+        self.enemy_next_action = np.where(rows, self.rng.integers(0, len(self.monster_action_ids), self.n), action)
+        self._decrement_status(rows, self.enemy_hp, self.enemy_max_hp, self.enemy_status)
+        self.turns[rows] += 1
+        self._draw_cards(rows, self.hand_size)
+        self.player_mana[rows] = self.player_max_mana
+
+    def run(self) -> dict[str, np.ndarray]:
+        """N件の戦闘を最後まで進め、結果の配列を返す"""
+        self._reset_state()
+        self._draw_cards(self.active, self.hand_size)
+        while self.active.any():
+            self._player_turn()
+            self._enemy_turn()
+            # ターン上限に達した戦闘は引き分けとして打ち切る
+            self.active &= self.turns <= self.max_turns
+        return {
+            "winner": self.winner,
+            "turns": np.minimum(self.turns, self.max_turns),
+            "player_hp": self.player_hp,
+            "enemy_hp": self.enemy_hp,
+        }
+
+def summarize(results: dict[str, np.ndarray]) -> dict[str, float]:
+    return {
+        "win_rate": float(np.mean(results["winner"] == WINNER_PLAYER)),
+        "mean_turns": float(np.mean(results["turns"])),
+        "mean_player_hp": float(np.mean(results["player_hp"])),
+        "std_turns": float(np.std(results["turns"])),
+        "std_player_hp": float(np.std(results["player_hp"])),
+    }
+
+def run_scalar(monster_id: str, num_battles: int, initial_deck: list[str] | None = None, max_turns: int = 100,
+               seed: int | None = None) -> dict[str, np.ndarray]:
+    """同じ条件の戦闘をBattleEngineで1件ずつ進める（比較用）"""
+    seeds = random.Random(seed)
+    winner = np.zeros(num_battles, dtype=np.int64)
+    turns = np.zeros(num_battles, dtype=np.int64)
+    player_hp = np.zeros(num_battles, dtype=np.int64)
+    codes = {None: WINNER_NONE, "player": WINNER_PLAYER, "enemy": WINNER_ENEMY}
+    for i in range(num_battles):
+        result = run_battle(BattleEngine(monster_id=monster_id, initial_deck=initial_deck, seed=seeds.getrandbits(64), keep_log=False), max_turns)
+        winner[i] = codes[result.winner]
+        turns[i] = result.turns
+        player_hp[i] = result.player_hp
+    return {"winner": winner, "turns": turns, "player_hp": player_hp}
+
+def compare_with_scalar(monster_id: str, num_battles: int = 2000, seed: int | None = None) -> dict[str, float]:
+    """
+    バッチ版と1件ずつのBattleEngine版を同じ条件で走らせ、
+    勝率・平均ターン数・残りHPの差をz値で返す。|z|が小さいほど両者は統計的に一致している。
+    """
+    batch = summarize(BatchBattleSimulator(monster_id, num_battles, seed=seed).run())
+    scalar = summarize(run_scalar(monster_id, num_battles, seed=seed))
+
+    pooled = (batch["win_rate"] + scalar["win_rate"]) / 2
+    win_se = math.sqrt(max(pooled * (1 - pooled), 1e-12) * 2 / num_battles)
+    turns_se = math.sqrt((batch["std_turns"] ** 2 + scalar["std_turns"] ** 2) / num_battles) or 1e-12
+    hp_se = math.sqrt((batch["std_player_hp"] ** 2 + scalar["std_player_hp"] ** 2) / num_battles) or 1e-12
+    return {
+        "batch_win_rate": batch["win_rate"],
+        "scalar_win_rate": scalar["win_rate"],
+        "win_rate_z": (batch["win_rate"] - scalar["win_rate"]) / win_se,
+        "batch_mean_turns": batch["mean_turns"],
+        "scalar_mean_turns": scalar["mean_turns"],
+        "turns_z": (batch["mean_turns"] - scalar["mean_turns"]) / turns_se,
+        "batch_mean_player_hp": batch["mean_player_hp"],
+        "scalar_mean_player_hp": scalar["mean_player_hp"],
+        "player_hp_z": (batch["mean_player_hp"] - scalar["mean_player_hp"]) / hp_se,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="バッチシミュレータとBattleEngineの結果を比較する")
+    parser.add_argument("--battles", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--z-limit", type=float, default=4.0, help="これを超えるz値があれば失敗とする")
+    args = parser.parse_args()
+
+    from ..data.monster_data import MONSTERS
+    failed = False
+    for monster_id in MONSTERS:
+        result = compare_with_scalar(monster_id, args.battles, args.seed)
+        worst = max(abs(result["win_rate_z"]), abs(result["turns_z"]), abs(result["player_hp_z"]))
+        failed |= worst > args.z_limit
+        print(f"{monster_id}: " + ", ".join(f"{k}={v:.3f}" for k, v in result.items()))
+    raise SystemExit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
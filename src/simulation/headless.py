@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+from typing import Callable
+from ..components.battle_engine import BattleEngine
+
+class BattleResult:
+    def __init__(self, winner: str | None, turns: int, player_hp: int, enemy_hp: int):
+        self.winner = winner # "player" / "enemy" / None(ターン上限で打ち切り)
+        self.turns = turns
+        self.player_hp = player_hp
+        self.enemy_hp = enemy_hp # 敵が複数なら合計
+
+def play_greedy_turn(engine: BattleEngine):
+    """手札を左から順に、使えるカードをすべて使う"""
+    for i in range(len(engine.deck_manager.hand)):
+        if engine.game_over:
+            break
+        engine.play_card(i)
+
+def run_battle(engine: BattleEngine, max_turns: int = 100,
+               play_turn: Callable[[BattleEngine], None] = play_greedy_turn) -> BattleResult:
+    """
+    描画なしで戦闘を最後まで進め、結果を返す。
+    play_turn でプレイヤーの手番の進め方を差し替えられる（HandSolver.play_turn など）
+    """
+    while not engine.game_over and engine.turn_count <= max_turns:
+        play_turn(engine)
+        engine.end_turn()
+        engine.enemy_turn()
+    turns = min(engine.turn_count, max_turns)
+    return BattleResult(engine.winner, turns, engine.player.current_hp, sum(enemy.current_hp for enemy in engine.enemies))
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+import argparse
+import random
+import sys
+import time
+from ..components.battle_engine import BattleEngine
+from ..components.battle_record import (BattleRecord, END_TURN, SELECT_TARGET_BASE, target_of_decision,
+                                        dump_records, load_records)
+from ..data.catalog import MONSTER_CATALOG
+from ..data.deck_data import DECKS
+from .headless import run_battle, play_greedy_turn
+
+class ReplayResult:
+    def __init__(self, record: BattleRecord, state_hash: bytes, error: str | None = None):
+        self.record = record
+        self.state_hash = state_hash
+        self.error = error # 記録どおりに操作できなかった場合の理由
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and self.state_hash == self.record.state_hash
+
+def replay(record: BattleRecord) -> ReplayResult:
+    """記録されたシードと選択で戦闘を描画なしに再実行し、最終状態のハッシュを求める"""
+    engine = BattleEngine(monster_id=record.monster_id, initial_deck=record.deck, seed=record.seed, keep_log=False,
+                          encounter_id=record.encounter_id)
+    for step, decision in enumerate(record.decisions):
+        if decision <= SELECT_TARGET_BASE:
+            if not engine.select_target(target_of_decision(decision)):
+                return ReplayResult(record, engine.state_hash(), f"{step}手目: 敵{target_of_decision(decision)}番を対象にできません")
+        elif decision == END_TURN:
+            if engine.turn != "player" or engine.game_over:
+                return ReplayResult(record, engine.state_hash(), f"{step}手目: ターン終了できない状態です")
+            engine.end_turn()
+            engine.enemy_turn()
+        elif not engine.play_card(decision):
+            return ReplayResult(record, engine.state_hash(), f"{step}手目: 手札{decision}番のカードを使えません")
+    return ReplayResult(record, engine.state_hash())
+
+def record_battles(num_battles: int, seed: int = 0, monster_id: str | None = None, deck_id: str = "default",
+                   max_turns: int = 100, encounter_id: str | None = None) -> list[BattleRecord]:
+    """
+    貪欲プレイで戦闘を行い、その記録を集める（リプレイの回帰テスト用データ作成）。
+    encounter_id を指定すると複数の敵と戦い、毎ターン最初に攻撃対象を選び直す（対象の選択も記録に残す）
+    """
+    seeds = random.Random(seed)
+    monster_ids = [monster_id] if monster_id else MONSTER_CATALOG.ids
+    records = []
+    for i in range(num_battles):
+        engine = BattleEngine(monster_id=monster_ids[i % len(monster_ids)], initial_deck=DECKS[deck_id]["cards"],
+                              seed=seeds.getrandbits(64), keep_log=False, encounter_id=encounter_id)
+        run_battle(engine, max_turns, play_turn=_play_lowest_hp_target if encounter_id else play_greedy_turn)
+        records.append(engine.to_record())
+    return records
+
+def _play_lowest_hp_target(engine: BattleEngine):
+    """HPが一番少ない敵を狙ってから貪欲に使う"""
+    alive = [i for i, enemy in enumerate(engine.enemies) if enemy.is_alive]
+    engine.select_target(min(alive, key=lambda i: engine.enemies[i].current_hp))
+    play_greedy_turn(engine)
+
+def main():
+    parser = argparse.ArgumentParser(description="戦闘記録の作成と再生")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    record_parser = subparsers.add_parser("record", help="貪欲プレイの戦闘記録を作る")
+    record_parser.add_argument("--out", required=True)
+    record_parser.add_argument("--battles", type=int, default=1000)
+    record_parser.add_argument("--seed", type=int, default=0)
+    record_parser.add_argument("--monster", default=None)
+    record_parser.add_argument("--deck", default="default")
+    record_parser.add_argument("--encounter", default=None, help="複数の敵と戦う編成ID")
+
+    check_parser = subparsers.add_parser("check", help="記録を再生して最終状態を照合する")
+    check_parser.add_argument("files", nargs="+")
+    args = parser.parse_args()
+
+    if args.command == "record":
+        records = record_battles(args.battles, args.seed, args.monster, args.deck, encounter_id=args.encounter)
+        with open(args.out, "wb") as f:
+            f.write(dump_records(records))
+        print(f"{len(records)}件の戦闘を記録しました: {args.out}")
+        return
+
+    records = []
+    for path in args.files:
+        with open(path, "rb") as f:
+            records.extend(load_records(f.read()))
+
+    start = time.perf_counter()
+    failures = [result for result in map(replay, records) if not result.ok]
+    elapsed = time.perf_counter() - start
+
+    for result in failures:
+        reason = result.error or "最終状態のハッシュが一致しません"
+        print(f"NG seed={result.record.seed} monster={result.record.monster_id}: {reason}")
+    rate = len(records) / elapsed if elapsed > 0 else float("inf")
+    print(f"{len(records) - len(failures)}/{len(records)} 件一致 ({elapsed:.2f}秒, {rate:.0f}件/秒)")
+    if failures:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+from typing import Callable
+from ..config import settings
+from ..scenes.battle_scene import BattleScene
+from ..scenes.battle_layout import BattleLayout
+
+# --- イージング関数: 0〜1 の進み具合を 0〜1 の変化量に変換する ---
+
+def linear(t: float) -> float:
+    return t
+
+def ease_out_cubic(t: float) -> float:
+    return 1 - (1 - t) ** 3
+
+class Tween:
+    """start_ms から duration_ms かけて値を start から end へ動かす。値は経過時間だけで決まる"""
+    __slots__ = ("start", "end", "start_ms", "duration_ms", "easing")
+
+    def __init__(self, start: float, end: float, start_ms: float, duration_ms: float,
+                 easing: Callable[[float], float] = ease_out_cubic):
+        self.start = start
+        self.end = end
+        self.start_ms = start_ms
+        self.duration_ms = duration_ms
+        self.easing = easing
+
+    def progress(self, now_ms: float) -> float:
+        if self.duration_ms <= 0:
+            return 1.0
+        return min(1.0, max(0.0, (now_ms - self.start_ms) / self.duration_ms))
+
+    def value(self, now_ms: float) -> float:
+        return self.start + (self.end - self.start) * self.easing(self.progress(now_ms))
+
+    def finished(self, now_ms: float) -> bool:
+        return now_ms >= self.start_ms + self.duration_ms
+
+class AnimatedValue:
+    """目標値が変わるたびに、その時点で表示している値から新しい目標値へのトゥイーンを始める"""
+    __slots__ = ("target", "duration_ms", "easing", "_tween")
+
+    def __init__(self, value: float, duration_ms: float, easing: Callable[[float], float] = ease_out_cubic):
+        self.target = value
+        self.duration_ms = duration_ms
+        self.easing = easing
+        self._tween: Tween | None = None
+
+    def set_target(self, target: float, now_ms: float):
+        if target != self.target:
+            self._tween = Tween(self.value(now_ms), target, now_ms, self.duration_ms, self.easing)
+            self.target = target
+
+    def value(self, now_ms: float) -> float:
+        tween = self._tween
+        if tween is None:
+            return self.target
+        if tween.finished(now_ms):
+            self._tween = None
+            return self.target
+        return tween.value(now_ms)
+
+    def animating(self, now_ms: float) -> bool:
+        return self._tween is not None and not self._tween.finished(now_ms)
+
+class DamageNumber:
+    """キャラクターの上に浮かんで消えるダメージ（回復）量"""
+    __slots__ = ("text", "color", "x", "y", "start_ms")
+
+    def __init__(self, text: str, color: tuple[int, int, int], x: int, y: int, start_ms: float):
+        self.text = text
+        self.color = color
+        self.x = x
+        self.y = y
+        self.start_ms = start_ms
+
+class BattleAnimator:
+    """
+    シーンの状態の変化を検出して演出を作る。
+    - HPバー: HPが変わると HP_DRAIN_MS かけて新しい値まで減る（増える）
+    - 手札: ホバー中のカードを CARD_LIFT_MS かけて持ち上げ、外れたら下ろす
+    - ダメージ数値: HPが変わった量を DAMAGE_NUMBER_MS の間、上に浮かべながら薄くする
+    すべて描画時刻 now_ms だけで決まるので、フレームレートが変わっても同じ速さで動く。
+    """
+    HP_DRAIN_MS: float = 400
+    CARD_LIFT_MS: float = 120
+    DAMAGE_NUMBER_MS: float = 900
+    DAMAGE_NUMBER_RISE: int = 40 # 消えるまでに浮かぶ高さ [px]
+
+    def __init__(self):
+        self._characters: dict[str, object] = {} # key: "player" / "enemy:<敵の番号>"
+        self._hp: dict[str, AnimatedValue] = {}
+        self._last_hp: dict[str, int] = {}
+        self._numbers: dict[str, list[DamageNumber]] = {}
+        self._card_lifts: list[AnimatedValue] = []
+        self._hand: tuple[str, ...] = ()
+
+    def sync(self, battle_state: BattleScene, now_ms: float):
+        """描画の前に毎フレーム呼ぶ。前回からの変化をトゥイーンに反映する"""
+        characters = [("player", battle_state.player)]
+        characters.extend((f"enemy:{i}", enemy) for i, enemy in enumerate(battle_state.enemies))
+        for role, character in characters:
+            numbers = self._numbers.setdefault(role, [])
+            if self._characters.get(role) is not character:
+                # 新しい戦闘: 演出なしで今の値に合わせる
+                self._characters[role] = character
+                self._hp[role] = AnimatedValue(character.current_hp, self.HP_DRAIN_MS)
+                self._last_hp[role] = character.current_hp
+                numbers.clear()
+                continue
+            change = character.current_hp - self._last_hp[role]
+            if change:
+                self._last_hp[role] = character.current_hp
+                self._hp[role].set_target(character.current_hp, now_ms)
+                color = settings.GREEN if change > 0 else settings.RED
+                numbers.append(DamageNumber(f"{change:+d}", color, character.x + 40, character.y - 60, now_ms))
+            if numbers and now_ms - numbers[0].start_ms >= self.DAMAGE_NUMBER_MS:
+                numbers[:] = [n for n in numbers if now_ms - n.start_ms < self.DAMAGE_NUMBER_MS]
+
+        # 手札が入れ替わったら持ち上げ量をリセットする
+        hand = tuple(battle_state.deck_manager.hand)
+        if hand != self._hand or len(self._card_lifts) != len(hand):
+            self._hand = hand
+            self._card_lifts = [AnimatedValue(0, self.CARD_LIFT_MS) for _ in hand]
+        hovered = battle_state.hovered_card_index
+        for i, lift in enumerate(self._card_lifts):
+            lift.set_target(BattleLayout.CARD_HOVER_LIFT if i == hovered else 0, now_ms)
+
+    def hp(self, role: str, now_ms: float) -> float:
+        return self._hp[role].value(now_ms)
+
+    def card_lifts(self, now_ms: float) -> list[int]:
+        return [round(lift.value(now_ms)) for lift in self._card_lifts]
+
+    def damage_numbers(self, role: str, now_ms: float) -> list[tuple[DamageNumber, int, int]]:
+        """(数値, 今のy座標, 不透明度 0〜255) の一覧"""
+        result = []
+        for number in self._numbers[role]:
+            t = (now_ms - number.start_ms) / self.DAMAGE_NUMBER_MS
+            if 0 <= t < 1:
+                result.append((number, number.y - round(self.DAMAGE_NUMBER_RISE * ease_out_cubic(t)), round(255 * (1 - t * t))))
+        return result
+
+    def layer_key(self, role: str, now_ms: float) -> tuple:
+        """差分描画用。演出中は描画結果が変わる値を返す"""
+        return (round(self.hp(role, now_ms)),
+                tuple((id(number), y, alpha // 16) for number, y, alpha in self.damage_numbers(role, now_ms)))
@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 import pygame
-import os
+from time import perf_counter_ns
 from ..components.monster import Monster
 from ..config import settings
 from ..scenes.battle_scene import BattleScene
@@ -8,113 +8,311 @@ from ..components.character import Character
 from .drawers.character_status_drawer import CharacterStatusDrawer
 from .drawers.player_command_drawer import PlayerCommandDrawer
 from .drawers.relic_drawer import RelicDrawer
+from .drawers.profiler_drawer import ProfilerDrawer
+from .frame_profiler import FrameProfiler
+from .text_cache import TextCache
+from .font_provider import FontProvider
+from .animation import BattleAnimator
 
 class BattleView:
-    def __init__(self):
+    def __init__(self, dirty_rects: bool = False, profiler: FrameProfiler | None = None):
         self.screen = pygame.display.set_mode((settings.SCREEN_WIDTH, settings.SCREEN_HEIGHT))
         pygame.display.set_caption("RPG戦闘")
         
-        self.fonts = self._load_fonts()
-        self.status_drawer = CharacterStatusDrawer(self.fonts)
-        self.command_drawer = PlayerCommandDrawer(self.fonts)
-        self.relic_drawer = RelicDrawer(self.fonts)
-
-    def _get_japanese_font(self, size: int) -> pygame.font.Font:
-        font_paths = [
-            "C:\\Windows\\Fonts\\meiryo.ttc",
-            "C:\\Windows\\Fonts\\msgothic.ttc",
-            "C:\\Windows\\Fonts\\YuGothM.ttc",
-        ]
-        for font_path in font_paths:
-            if os.path.exists(font_path):
-                return pygame.font.Font(font_path, size)
-        return pygame.font.Font(None, size)
-
-    def _load_fonts(self) -> dict:
-        return {
-            "large": self._get_japanese_font(48),
-            "medium": self._get_japanese_font(36),
-            "small": self._get_japanese_font(24),
-            "log": self._get_japanese_font(20),
-            "card": self._get_japanese_font(18),
-        }
+        self.fonts = FontProvider() # フォントは初めて使うサイズだけ開く
+        self.text_cache = TextCache(self.fonts) # 全ドロワーで共有する文字列描画キャッシュ
+        self.status_drawer = CharacterStatusDrawer(self.fonts, self.text_cache)
+        self.command_drawer = PlayerCommandDrawer(self.fonts, self.text_cache)
+        self.relic_drawer = RelicDrawer(self.fonts, self.text_cache)
+
+        # HPバーの減少・カードの持ち上げ・ダメージ数値の演出。描画時刻だけで進むのでフレームレートに依存しない
+        self.animator = BattleAnimator()
+        self._now_ms: float = 0
+
+        # フレームプロファイラ: 計測中のフレームだけドロワーごとの時間を測り、集計を右上に重ねて表示する
+        self.profiler = profiler
+        self.profiler_drawer = ProfilerDrawer(self.fonts)
+
+        # 差分描画モード: 変化したレイヤーの領域だけを画面に転送する
+        self.dirty_rects: bool = dirty_rects
+        self._last_layer_keys: dict[str, tuple] | None = None
+        self._last_layer_rects: dict[str, list[pygame.Rect]] = {}
+
+    def draw(self, battle_state: BattleScene, now_ms: float | None = None):
+        """now_ms は演出の時刻（固定ステップのループではロジックの時刻を補間した値）。省略すると pygame の経過時間を使う"""
+        if now_ms is None:
+            now_ms = pygame.time.get_ticks()
+        self._now_ms = now_ms
+        self.animator.sync(battle_state, now_ms)
+
+        if self.dirty_rects:
+            self._draw_dirty(battle_state)
+            return
 
-    def draw(self, battle_state: BattleScene):
         self.screen.fill(settings.BLACK)
-        
-        self.status_drawer.draw(self.screen, battle_state.player, settings.BLUE)
-        self.status_drawer.draw(self.screen, battle_state.enemy, settings.RED)
-        self.relic_drawer.draw(self.screen, battle_state)
-        self._draw_ui(battle_state)
-        
-        pygame.display.flip()
+        self._draw_layers(battle_state)
+        self._present(None)
+
+    def _is_profiling(self) -> bool:
+        return self.profiler is not None and self.profiler.active
+
+    def _present(self, dirty: list[pygame.Rect] | None):
+        """画面へ転送する。dirty がNoneなら全体を転送する"""
+        start = perf_counter_ns() if self._is_profiling() else 0
+        if dirty is None:
+            pygame.display.flip()
+        else:
+            pygame.display.update(dirty)
+        if start:
+            self.profiler.lap("present", start)
+
+    def _draw_layers(self, battle_state: BattleScene, only: set[str] | None = None) -> dict[str, list[pygame.Rect]]:
+        """レイヤーを奥から順に描画し、レイヤーごとに描いた領域を返す。only を渡すとその名前のレイヤーだけを描く"""
+        profiler = self.profiler if self._is_profiling() else None
+        t = perf_counter_ns() if profiler else 0
+        animator, now_ms = self.animator, self._now_ms
+        layers = {}
+        if only is None or "player" in only:
+            layers["player"] = self.status_drawer.draw(self.screen, battle_state.player, settings.BLUE, animator.hp("player", now_ms))
+            layers["player"] += self.status_drawer.draw_damage_numbers(self.screen, animator.damage_numbers("player", now_ms))
+        if profiler:
+            t = profiler.lap("player", t)
+        # 敵は1体ずつ別のレイヤーにする（差分描画では変化した敵の領域だけを描き直す）
+        layout = battle_state.get_layout()
+        show_target = self._shows_target(battle_state)
+        for i, enemy in enumerate(battle_state.enemies):
+            role = f"enemy:{i}"
+            if only is not None and role not in only:
+                continue
+            layers[role] = self.status_drawer.draw(self.screen, enemy, settings.RED, animator.hp(role, now_ms),
+                                                   layout.enemy_rects[i].size, show_target and i == battle_state.target_index)
+            layers[role] += self.status_drawer.draw_damage_numbers(self.screen, animator.damage_numbers(role, now_ms))
+        if profiler:
+            t = profiler.lap("enemy", t)
+        if only is None or "relics" in only:
+            layers["relics"] = self.relic_drawer.draw(self.screen, battle_state)
+        if profiler:
+            t = profiler.lap("relics", t)
+        if only is None or "ui" in only:
+            layers["ui"] = self._draw_ui(battle_state)
+        if profiler:
+            t = profiler.lap("ui", t)
+        if (only is None or "commands" in only) and self._shows_commands(battle_state):
+            layers["commands"] = self.command_drawer.draw(self.screen, battle_state, layout.log_area_rect,
+                                                          animator.card_lifts(now_ms))
+        if profiler:
+            profiler.lap("commands", t)
+        if self.profiler is not None and (only is None or "profiler" in only):
+            layers["profiler"] = self.profiler_drawer.draw(self.screen, self.profiler)
+        return layers
+
+    def _get_layer_keys(self, battle_state: BattleScene) -> dict[str, tuple]:
+        now_ms = self._now_ms
+        keys = {
+            "player": (self.status_drawer.get_state_key(battle_state.player, settings.BLUE),
+                       self.animator.layer_key("player", now_ms)),
+            "relics": self.relic_drawer.get_state_key(battle_state),
+            "ui": self._get_ui_state_key(battle_state),
+            "commands": (self.command_drawer.get_state_key(battle_state), tuple(self.animator.card_lifts(now_ms)))
+                        if self._shows_commands(battle_state) else None,
+        }
+        target = battle_state.target_index if self._shows_target(battle_state) else None
+        for i, enemy in enumerate(battle_state.enemies):
+            role = f"enemy:{i}"
+            keys[role] = (self.status_drawer.get_state_key(enemy, settings.RED), i == target,
+                          self.animator.layer_key(role, now_ms))
+        if self.profiler is not None:
+            keys["profiler"] = self.profiler_drawer.get_state_key(self.profiler)
+        return keys
+
+    def _get_layer_bounds(self, battle_state: BattleScene, name: str) -> list[pygame.Rect]:
+        """レイヤー name が今描く領域を、描かずにレイアウトと文字列の大きさから求める"""
+        animator, now_ms = self.animator, self._now_ms
+        if name == "player":
+            return (self.status_drawer.get_bounds(battle_state.player, animator.hp("player", now_ms))
+                    + self.status_drawer.get_damage_number_bounds(animator.damage_numbers("player", now_ms)))
+        if name.startswith("enemy:"):
+            i = int(name[6:])
+            if i >= len(battle_state.enemies):
+                return [] # 敵が減った戦闘に切り替わった
+            layout = battle_state.get_layout()
+            targeted = self._shows_target(battle_state) and i == battle_state.target_index
+            return (self.status_drawer.get_bounds(battle_state.enemies[i], animator.hp(name, now_ms),
+                                                  layout.enemy_rects[i].size, targeted)
+                    + self.status_drawer.get_damage_number_bounds(animator.damage_numbers(name, now_ms)))
+        if name == "relics":
+            return self.relic_drawer.get_bounds(battle_state)
+        if name == "ui":
+            return self._get_ui_bounds(battle_state)
+        if name == "commands":
+            if not self._shows_commands(battle_state):
+                return []
+            return self.command_drawer.get_bounds(battle_state, animator.card_lifts(now_ms))
+        if name == "profiler" and self.profiler is not None:
+            return self.profiler_drawer.get_bounds(self.screen, self.profiler)
+        return []
+
+    @staticmethod
+    def _merge_rects(rects: list[pygame.Rect]) -> list[pygame.Rect]:
+        """
+        重なった矩形を、まとめても面積がほとんど増えないときだけ1つにする
+        （手札のカードどうしはまとめ、手札と拡大表示のように離れたものは別々に塗り直す）。
+        """
+        merged: list[pygame.Rect] = []
+        for rect in rects:
+            if not (rect.width and rect.height):
+                continue
+            absorbed = True
+            while absorbed:
+                absorbed = False
+                for i, other in enumerate(merged):
+                    union = rect.union(other)
+                    if rect.colliderect(other) and union.w * union.h <= rect.w * rect.h + other.w * other.h:
+                        rect = union
+                        del merged[i]
+                        absorbed = True
+                        break
+            merged.append(rect)
+        return merged
+
+    def _draw_dirty(self, battle_state: BattleScene):
+        """
+        状態が変わったレイヤーの前回と今回の領域だけを塗り直して転送する。
+        今回の領域は描かずにレイアウトから求め、領域ごとにクリップして、その領域に掛かるレイヤーだけを奥から描き直す。
+        領域は和集合にせず1つずつ塗り直して転送する。何も変わっていないフレームでは塗りつぶしも転送も行わない。
+        """
+        keys = self._get_layer_keys(battle_state)
+        last_keys = self._last_layer_keys
+        if keys == last_keys:
+            return
+        if last_keys is None:
+            # 最初のフレームは全体を描いて転送
+            self.screen.fill(settings.BLACK)
+            self._draw_layers(battle_state)
+            self._last_layer_rects = {name: self._get_layer_bounds(battle_state, name) for name in keys}
+            self._last_layer_keys = keys
+            self._present(None)
+            return
+
+        changed = {name for name, key in keys.items() if last_keys.get(name) != key}
+        changed.update(name for name in last_keys if name not in keys) # 敵が減った戦闘に切り替わったとき
+
+        bounds = self._last_layer_rects
+        dirty = []
+        for name in changed:
+            dirty.extend(bounds.get(name, []))
+        bounds = {name: self._get_layer_bounds(battle_state, name) if name in changed else bounds.get(name, [])
+                  for name in keys}
+        for name in changed:
+            dirty.extend(bounds.get(name, []))
+        dirty = self._merge_rects(dirty)
+
+        for rect in dirty:
+            self.screen.set_clip(rect)
+            self.screen.fill(settings.BLACK)
+            self._draw_layers(battle_state, {name for name, rects in bounds.items() if rect.collidelist(rects) != -1})
+        self.screen.set_clip(None)
+        if dirty:
+            self._present(dirty)
+
+        self._last_layer_rects = bounds
+        self._last_layer_keys = keys
+
+    @staticmethod
+    def _shows_target(battle_state: BattleScene) -> bool:
+        """敵が複数いるとき、プレイヤーのターン中だけ攻撃対象に枠を付ける"""
+        return len(battle_state.enemies) > 1 and battle_state.turn == "player" and not battle_state.game_over
+
+    @staticmethod
+    def _shows_commands(battle_state: BattleScene) -> bool:
+        """プレイヤーのターン中だけコマンドを描き、それ以外はバトルログを描く"""
+        return battle_state.turn == "player" and not battle_state.game_over
 
-    def _draw_ui(self, battle_state: BattleScene):
+    def _get_ui_state_key(self, battle_state: BattleScene) -> tuple:
+        deck_manager = battle_state.deck_manager
+        return (
+            battle_state.turn, battle_state.game_over, battle_state.winner,
+            deck_manager.deck_count, deck_manager.discard_count,
+            None if self._shows_commands(battle_state) else battle_state.log_version,
+        )
+
+    def _turn_text(self, battle_state: BattleScene) -> tuple[pygame.Surface, pygame.Rect]:
         if battle_state.turn == "player":
-            turn_text = self.fonts["medium"].render("プレイヤーのターン", True, settings.YELLOW)
+            turn_text = self.text_cache.render("medium", "プレイヤーのターン", True, settings.YELLOW)
         else:
-            turn_text = self.fonts["medium"].render("敵のターン", True, settings.RED)
-        self.screen.blit(turn_text, (settings.SCREEN_WIDTH // 2 - turn_text.get_width() // 2, 20))
-        
-        # --- UIエリアのレイアウト調整 ---
-        padding = 10
-        
-        # ログエリア
-        log_area_height = int(settings.SCREEN_HEIGHT / 4)
-        log_area_y = settings.SCREEN_HEIGHT - log_area_height
-        log_area_rect = pygame.Rect(0, log_area_y, settings.SCREEN_WIDTH, log_area_height)
+            turn_text = self.text_cache.render("medium", "敵のターン", True, settings.RED)
+        return turn_text, turn_text.get_rect(topleft=(settings.SCREEN_WIDTH // 2 - turn_text.get_width() // 2, 20))
+
+    def _pile_texts(self, battle_state: BattleScene) -> list[tuple[pygame.Surface, pygame.Rect]]:
+        """山札と捨て札の枚数（ログエリアの上の左右）"""
+        if battle_state.game_over:
+            return []
+        log_area_rect = battle_state.get_layout().log_area_rect
+        deck_count = battle_state.deck_manager.deck_count if battle_state.deck_manager else 0
+        discard_count = battle_state.deck_manager.discard_count if battle_state.deck_manager else 0
+
+        deck_text = self.text_cache.render("small", f"山札: {deck_count}", True, settings.WHITE)
+        discard_text = self.text_cache.render("small", f"捨て札: {discard_count}", True, settings.WHITE)
+        return [(deck_text, deck_text.get_rect(topleft=(log_area_rect.left + 20, log_area_rect.top - 40))),
+                (discard_text, discard_text.get_rect(right=log_area_rect.right - 20, top=log_area_rect.top - 40))]
+
+    def _result_texts(self, battle_state: BattleScene) -> list[tuple[pygame.Surface, pygame.Rect]]:
+        """決着がついたときの勝敗とリスタートの案内"""
+        if not battle_state.game_over:
+            return []
+        if battle_state.winner == "player":
+            result_text = self.text_cache.render("large", "勝利！", True, settings.GREEN)
+        else:
+            result_text = self.text_cache.render("large", "敗北...", True, settings.RED)
+        restart_text = self.text_cache.render("medium", "Rキー: リスタート", True, settings.WHITE)
+        return [(result_text, result_text.get_rect(center=(settings.SCREEN_WIDTH // 2, settings.SCREEN_HEIGHT // 2 - 100))),
+                (restart_text, restart_text.get_rect(center=(settings.SCREEN_WIDTH // 2, settings.SCREEN_HEIGHT // 2 + 50)))]
+
+    def _get_ui_bounds(self, battle_state: BattleScene) -> list[pygame.Rect]:
+        """_draw_ui が描く領域を、描かずにレイアウトと文字列の大きさから求める"""
+        layout = battle_state.get_layout()
+        bounds = [self._turn_text(battle_state)[1]]
+        if self._shows_commands(battle_state):
+            bounds.append(layout.end_turn_button_rect)
+        else:
+            bounds.append(layout.log_area_rect)
+        bounds.extend(rect for _, rect in self._pile_texts(battle_state))
+        bounds.extend(rect for _, rect in self._result_texts(battle_state))
+        return bounds
+
+    def _draw_ui(self, battle_state: BattleScene) -> list[pygame.Rect]:
+        dirty = [self.screen.blit(*self._turn_text(battle_state))]
+
+        # ログエリアとターン終了ボタンの位置はシーンと共有するレイアウトから取る
+        layout = battle_state.get_layout()
+        log_area_rect = layout.log_area_rect
 
         # ターン終了ボタンの描画 (プレイヤーのターン中のみ)
         if battle_state.turn == "player" and not battle_state.game_over:
-            button_width = 120
-            button_height = 40
-            button_x = settings.SCREEN_WIDTH - button_width - 150 # 捨て札表示と被らないように左にずらす
-            button_y = log_area_y - button_height - 10 # ログエリアの上に配置
-            end_turn_button_rect = pygame.Rect(button_x, button_y, button_width, button_height)
+            end_turn_button_rect = layout.end_turn_button_rect
 
-            pygame.draw.rect(self.screen, (100, 0, 0), end_turn_button_rect, border_radius=5)
+            dirty.append(pygame.draw.rect(self.screen, (100, 0, 0), end_turn_button_rect, border_radius=5))
             pygame.draw.rect(self.screen, settings.WHITE, end_turn_button_rect, 2, border_radius=5)
             
-            button_text = self.fonts["small"].render("ターン終了", True, settings.WHITE)
+            button_text = self.text_cache.render("small", "ターン終了", True, settings.WHITE)
             text_rect = button_text.get_rect(center=end_turn_button_rect.center)
             self.screen.blit(button_text, text_rect)
 
         # プレイヤーのターンでない時だけログエリアの背景を描画
         if battle_state.turn != "player":
-            pygame.draw.rect(self.screen, settings.DARK_GRAY, log_area_rect)
+            dirty.append(pygame.draw.rect(self.screen, settings.DARK_GRAY, log_area_rect))
             pygame.draw.rect(self.screen, settings.WHITE, log_area_rect, 2)
 
         # デッキと捨て札の枚数を描画
-        if not battle_state.game_over:
-            deck_count = len(battle_state.deck_manager.deck) if battle_state.deck_manager else 0
-            discard_count = len(battle_state.deck_manager.discard_pile) if battle_state.deck_manager else 0
-            
-            deck_text = self.fonts["small"].render(f"山札: {deck_count}", True, settings.WHITE)
-            self.screen.blit(deck_text, (log_area_rect.left + 20, log_area_rect.top - 40))
-
-            discard_text = self.fonts["small"].render(f"捨て札: {discard_count}", True, settings.WHITE)
-            discard_rect = discard_text.get_rect(right=log_area_rect.right - 20, top=log_area_rect.top - 40)
-            self.screen.blit(discard_text, discard_rect)
+        dirty.extend(self.screen.blit(text, rect) for text, rect in self._pile_texts(battle_state))
 
-        # プレイヤーのターンならコマンドを描画
-        if battle_state.turn == "player" and not battle_state.game_over:
-            self.command_drawer.draw(self.screen, battle_state, log_area_rect)
-        else:
-            # それ以外の場合はバトルログを描画
+        # プレイヤーのターンでなければバトルログを描画（コマンドは _draw_layers で別に描く）
+        if not self._shows_commands(battle_state):
             self._draw_battle_log(battle_state, log_area_rect)
+            dirty.append(log_area_rect)
         
-        if battle_state.game_over:
-            if battle_state.winner == "player":
-                result_text = self.fonts["large"].render("勝利！", True, settings.GREEN)
-            else:
-                result_text = self.fonts["large"].render("敗北...", True, settings.RED)
-            
-            result_rect = result_text.get_rect(center=(settings.SCREEN_WIDTH // 2, settings.SCREEN_HEIGHT // 2 - 100))
-            self.screen.blit(result_text, result_rect)
-            
-            restart_text = self.fonts["medium"].render("Rキー: リスタート", True, settings.WHITE)
-            restart_rect = restart_text.get_rect(center=(settings.SCREEN_WIDTH // 2, settings.SCREEN_HEIGHT // 2 + 50))
-            self.screen.blit(restart_text, restart_rect)
+        dirty.extend(self.screen.blit(text, rect) for text, rect in self._result_texts(battle_state))
+        return dirty
 
     def _draw_battle_log(self, battle_state: BattleScene, log_area_rect: pygame.Rect):
         padding = 10
@@ -124,5 +322,5 @@ class BattleView:
         start_y = log_area_rect.top + padding + (line_height - self.fonts["log"].get_height()) // 2
 
         for i, message in enumerate(battle_state.battle_log):
-            log_text = self.fonts["log"].render(message, True, settings.LIGHT_BLUE)
+            log_text = self.text_cache.render("log", message, True, settings.LIGHT_BLUE)
             self.screen.blit(log_text, (start_x, start_y + i * line_height))
\ No newline at end of file
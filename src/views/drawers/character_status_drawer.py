@@ -1,56 +1,132 @@
 # -*- coding: utf-8 -*-
 import pygame
-import math
+from collections.abc import Mapping
 from ...components.character import Character
+from ...components.action_handler import ActionHandler
 from ...config import settings
 from ...data.status_effect_data import STATUS_EFFECTS
-from ...data.monster_action_data import MONSTER_ACTIONS
+from ...data.catalog import MONSTER_ACTION_CATALOG
+from ..text_cache import TextCache
 
 class CharacterStatusDrawer:
-    def __init__(self, fonts: dict):
+    def __init__(self, fonts: Mapping[str, pygame.font.Font], text_cache: TextCache | None = None):
         self.fonts = fonts
+        self.text_cache = text_cache or TextCache(fonts)
+        self._faded_texts: dict[tuple, pygame.Surface] = {} # ダメージ数値の (文字列, 色, 不透明度の段階) → Surface
 
-    def draw(self, screen: pygame.Surface, character: Character, color: tuple[int, int, int]):
-        char_width = 80
-        char_height = 100
+    def get_state_key(self, character: Character, color: tuple[int, int, int]) -> tuple:
+        """描画結果を左右する値の組。前フレームと同じなら描き直す必要はない"""
+        return (color, character.name, character.x, character.y, character.current_hp, character.max_hp,
+                character.current_mana, character.max_mana, character.stats_version, getattr(character, 'next_action', None))
+
+    def get_bounds(self, character: Character, display_hp: float | None = None, box_size: tuple[int, int] = (80, 100),
+                   targeted: bool = False) -> list[pygame.Rect]:
+        """draw が描く領域を、描かずに求める（文字列の大きさは TextCache の描画済みSurfaceから取る）"""
+        if display_hp is None:
+            display_hp = character.current_hp
+        x, y = character.x, character.y
+        char_width, char_height = box_size
+        compact = char_height < 100
+        bounds = [pygame.Rect(x, y, char_width, char_height)]
+        if targeted:
+            bounds.append(pygame.Rect(x - 4, y - 4, char_width + 8, char_height + 8))
+
+        name_text = self.text_cache.render("small" if compact else "medium", character.name, True, settings.WHITE)
+        bounds.append(name_text.get_rect(topleft=(x - 20, y - (25 if compact else 40))))
+        hp_text = self.text_cache.render("small", f"HP: {round(display_hp)}/{character.max_hp}", True, settings.WHITE)
+        bounds.append(hp_text.get_rect(topleft=(x - 10, y + char_height + 5)))
+
+        base_y = y + char_height + 5
+        if compact:
+            bounds.append(pygame.Rect(x - 10, base_y + 25, 100, 8))
+            bounds.extend(rect for _, rect in self._status_texts(character, x - 10, base_y + 37, horizontal=True))
+        else:
+            if character.max_mana > 0:
+                bounds.append(pygame.Rect(x - 10, base_y + 50, character.max_mana * 25, 21)) # マナオーブ（半径10、間隔5）
+            bounds.extend(rect for _, rect in self._status_texts(character, x - 10, base_y + 90))
+            bounds.append(pygame.Rect(x - 10, base_y + 30, 100, 15))
+
+        intent = self._intent_text(character, char_width, compact)
+        if intent is not None:
+            bounds.append(intent[1])
+        return bounds
+
+    def draw(self, screen: pygame.Surface, character: Character, color: tuple[int, int, int],
+             display_hp: float | None = None, box_size: tuple[int, int] = (80, 100),
+             targeted: bool = False) -> list[pygame.Rect]:
+        """
+        キャラクターの状態を描画し、描いた領域のRectを返す。
+        display_hp を渡すとHPの表示（バーと数値）をその値にする（HPが減っていく演出用）。
+        box_size の高さが100未満なら、敵を2段に並べるときの詰めた配置で描く。
+        targeted ならプレイヤーの攻撃対象として枠を付ける。
+        """
+        if display_hp is None:
+            display_hp = character.current_hp
+        char_width, char_height = box_size
+        compact = char_height < 100
+        if not character.is_alive:
+            color = settings.DARK_GRAY # 倒れた敵
+        dirty = []
         
-        pygame.draw.rect(screen, color, (character.x, character.y, char_width, char_height))
+        dirty.append(pygame.draw.rect(screen, color, (character.x, character.y, char_width, char_height)))
         pygame.draw.rect(screen, settings.WHITE, (character.x, character.y, char_width, char_height), 2)
+        if targeted:
+            dirty.append(pygame.draw.rect(screen, settings.YELLOW, (character.x - 4, character.y - 4, char_width + 8, char_height + 8), 3))
         
-        name_text = self.fonts["medium"].render(character.name, True, settings.WHITE)
-        screen.blit(name_text, (character.x - 20, character.y - 40))
+        name_text = self.text_cache.render("small" if compact else "medium", character.name, True, settings.WHITE)
+        dirty.append(screen.blit(name_text, (character.x - 20, character.y - (25 if compact else 40))))
         
-        hp_text = self.fonts["small"].render(f"HP: {character.current_hp}/{character.max_hp}", True, settings.WHITE)
-        screen.blit(hp_text, (character.x - 10, character.y + char_height + 5))
+        hp_text = self.text_cache.render("small", f"HP: {round(display_hp)}/{character.max_hp}", True, settings.WHITE)
+        dirty.append(screen.blit(hp_text, (character.x - 10, character.y + char_height + 5)))
 
         # --- UI要素のY座標を整理 ---
         base_y = character.y + char_height + 5
-        hp_bar_y = base_y + 30  # HPテキストとHPバーの間隔
-        mana_orbs_y = hp_bar_y + 30 # HPバーとマナの間隔
-        status_effects_y = mana_orbs_y + 30 # マナと状態異常の間隔
+        if compact:
+            # 詰めた配置: HPバーを細くし、状態異常は横一列に並べる
+            hp_bar_y = base_y + 25
+            dirty.append(self._draw_hp_bar(screen, character, display_hp, character.x - 10, hp_bar_y, 100, 8))
+            dirty.extend(self._draw_status_effects(screen, character, character.x - 10, hp_bar_y + 12, horizontal=True))
+        else:
+            hp_bar_y = base_y + 30  # HPテキストとHPバーの間隔
+            mana_orbs_y = hp_bar_y + 30 # HPバーとマナの間隔
+            status_effects_y = mana_orbs_y + 30 # マナと状態異常の間隔
 
-        # プレイヤーの場合のみマナオーブを描画
-        if character.max_mana > 0:
-            self._draw_mana_orbs(screen, character, character.x - 10, mana_orbs_y)
+            # プレイヤーの場合のみマナオーブを描画
+            if character.max_mana > 0:
+                dirty.extend(self._draw_mana_orbs(screen, character, character.x - 10, mana_orbs_y))
 
-        self._draw_status_effects(screen, character, character.x - 10, status_effects_y)
-        self._draw_hp_bar(screen, character, character.x - 10, hp_bar_y, 100, 15)
+            dirty.extend(self._draw_status_effects(screen, character, character.x - 10, status_effects_y))
+            dirty.append(self._draw_hp_bar(screen, character, display_hp, character.x - 10, hp_bar_y, 100, 15))
 
         # 敵の場合のみインテントを描画
-        if hasattr(character, 'next_action') and character.next_action:
-            self._draw_intent(screen, character)
+        intent = self._intent_text(character, char_width, compact)
+        if intent is not None:
+            dirty.append(screen.blit(*intent))
+        return dirty
 
-    def _draw_status_effects(self, screen: pygame.Surface, character: Character, x: int, y: int):
+    def _status_texts(self, character: Character, x: int, y: int,
+                      horizontal: bool = False) -> list[tuple[pygame.Surface, pygame.Rect]]:
+        """状態異常の文字列と描く位置。horizontal なら横一列、そうでなければ縦に並べる"""
+        texts = []
         status_offset = 0
         for status_id, turns in character.status_effects.items():
             status_data = STATUS_EFFECTS[status_id]
-            status_text = self.fonts["small"].render(f"{status_data['name']}: {turns}", True, status_data['color'])
-            screen.blit(status_text, (x, y + status_offset))
-            status_offset += 25
+            status_text = self.text_cache.render("small", f"{status_data['name']}: {turns}", True, status_data['color'])
+            if horizontal:
+                texts.append((status_text, status_text.get_rect(topleft=(x + status_offset, y))))
+                status_offset += status_text.get_width() + 6
+            else:
+                texts.append((status_text, status_text.get_rect(topleft=(x, y + status_offset))))
+                status_offset += 25
+        return texts
+
+    def _draw_status_effects(self, screen: pygame.Surface, character: Character, x: int, y: int,
+                             horizontal: bool = False) -> list[pygame.Rect]:
+        return [screen.blit(text, rect) for text, rect in self._status_texts(character, x, y, horizontal)]
 
-    def _draw_hp_bar(self, screen: pygame.Surface, character: Character, x: int, y: int, width: int, height: int):
+    def _draw_hp_bar(self, screen: pygame.Surface, character: Character, hp: float, x: int, y: int, width: int, height: int) -> pygame.Rect:
         pygame.draw.rect(screen, settings.DARK_GRAY, (x, y, width, height))
-        hp_percentage = character.get_hp_percentage()
+        hp_percentage = (hp / character.max_hp) * 100
         hp_bar_width = (width * hp_percentage) / 100
         
         bar_color = settings.RED
@@ -58,9 +134,31 @@ class CharacterStatusDrawer:
         elif hp_percentage > 25: bar_color = settings.YELLOW
         
         pygame.draw.rect(screen, bar_color, (x, y, hp_bar_width, height))
-        pygame.draw.rect(screen, settings.WHITE, (x, y, width, height), 1)
+        return pygame.draw.rect(screen, settings.WHITE, (x, y, width, height), 1)
+
+    def draw_damage_numbers(self, screen: pygame.Surface, numbers: list) -> list[pygame.Rect]:
+        """BattleAnimator.damage_numbers() の (数値, y座標, 不透明度) を描画する"""
+        dirty = []
+        for number, y, alpha in numbers:
+            # 不透明度は16段階にまとめ、段階ごとに作ったSurfaceを使い回す
+            key = (number.text, number.color, alpha // 16)
+            text_surface = self._faded_texts.get(key)
+            if text_surface is None:
+                text_surface = self.text_cache.render("medium", number.text, True, number.color).copy()
+                text_surface.set_alpha(min(255, (alpha // 16) * 16 + 15))
+                if len(self._faded_texts) >= 512:
+                    self._faded_texts.clear()
+                self._faded_texts[key] = text_surface
+            dirty.append(screen.blit(text_surface, text_surface.get_rect(centerx=number.x, bottom=y)))
+        return dirty
+
+    def get_damage_number_bounds(self, numbers: list) -> list[pygame.Rect]:
+        """draw_damage_numbers が描く領域を、描かずに求める"""
+        return [self.text_cache.render("medium", number.text, True, number.color).get_rect(centerx=number.x, bottom=y)
+                for number, y, _ in numbers]
 
-    def _draw_mana_orbs(self, screen: pygame.Surface, character: Character, x: int, y: int):
+    def _draw_mana_orbs(self, screen: pygame.Surface, character: Character, x: int, y: int) -> list[pygame.Rect]:
+        dirty = []
         orb_radius = 10
         orb_gap = 5
         for i in range(character.max_mana):
@@ -69,33 +167,39 @@ class CharacterStatusDrawer:
                 color = settings.YELLOW
             else:
                 color = settings.DARK_GRAY
-            pygame.draw.circle(screen, color, (orb_x, y), orb_radius)
+            dirty.append(pygame.draw.circle(screen, color, (orb_x, y), orb_radius))
             pygame.draw.circle(screen, settings.WHITE, (orb_x, y), orb_radius, 1)
+        return dirty
 
-    def _draw_intent(self, screen: pygame.Surface, monster: Character):
-        action_id = monster.next_action
-        action_data = MONSTER_ACTIONS.get(action_id)
+    def _intent_text(self, monster: Character, char_width: int = 80,
+                     compact: bool = False) -> tuple[pygame.Surface, pygame.Rect] | None:
+        """敵のインテントの文字列と描く位置。インテントがなければNone"""
+        action_id = getattr(monster, 'next_action', None)
+        if not action_id or not monster.is_alive:
+            return None
+        action_data = MONSTER_ACTION_CATALOG.get(action_id)
         if not action_data:
-            return
+            return None
 
         intent_type = action_data.get("intent_type", "unknown")
         intent_text = ""
         icon = "?" # デフォルト
 
         if intent_type == "attack":
-            power = action_data["power"]
-            damage = int(monster.attack_power * power)
-            intent_text = str(damage)
+            intent_text = str(ActionHandler.get_intent_display_power(monster, action_id))
             icon = "⚔"
         elif intent_type == "attack_debuff":
-            power = action_data["power"]
-            damage = int(monster.attack_power * power)
-            intent_text = str(damage)
+            intent_text = str(ActionHandler.get_intent_display_power(monster, action_id))
             icon = "⚔" # アイコンは攻撃と同じ
         elif intent_type == "debuff":
             icon = "↓"
 
         full_text = f"{icon} {intent_text}"
-        text_surface = self.fonts["medium"].render(full_text, True, settings.WHITE)
-        text_rect = text_surface.get_rect(centerx=monster.x + 40, bottom=monster.y - 10)
-        screen.blit(text_surface, text_rect)
\ No newline at end of file
+        if compact:
+            # 詰めた配置では名前の上に余白がないので、本体の右上に小さく出す
+            text_surface = self.text_cache.render("small", full_text, True, settings.WHITE)
+            text_rect = text_surface.get_rect(left=monster.x + char_width + 6, top=monster.y)
+        else:
+            text_surface = self.text_cache.render("medium", full_text, True, settings.WHITE)
+            text_rect = text_surface.get_rect(centerx=monster.x + char_width // 2, bottom=monster.y - 45) # 名前の上
+        return text_surface, text_rect
\ No newline at end of file
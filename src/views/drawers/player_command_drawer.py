@@ -1,110 +1,185 @@
 # -*- coding: utf-8 -*-
 import pygame
-import math
+from collections.abc import Mapping
 from ...scenes.battle_scene import BattleScene
 from ...config import settings
-from ...data.action_data import ACTIONS
+from ...data.catalog import ACTION_CATALOG
 from ...components.action_handler import ActionHandler
-from ...data.status_effect_data import STATUS_EFFECTS
+from ..text_cache import TextCache
 
 class PlayerCommandDrawer:
-    def __init__(self, fonts: dict):
+    def __init__(self, fonts: Mapping[str, pygame.font.Font], text_cache: TextCache | None = None):
         self.fonts = fonts
-
-    def draw(self, screen: pygame.Surface, battle_state: BattleScene, log_area_rect: pygame.Rect):
+        self.text_cache = text_cache or TextCache(fonts)
+        # 描画済みカードSurfaceのキャッシュ
+        # key: (action_id, 使用不可か(または"enlarged"), 表示威力, サイズ)
+        self._card_surfaces: dict[tuple, pygame.Surface] = {}
+        self.max_card_surfaces: int = 256
+
+    def get_state_key(self, battle_state: BattleScene) -> tuple:
+        player = battle_state.player
+        return (tuple(battle_state.deck_manager.hand), frozenset(battle_state.used_card_indices), battle_state.hovered_card_index,
+                player.current_mana, player.stats_version, battle_state.hint)
+
+    def get_bounds(self, battle_state: BattleScene, card_lifts: list[int] | None = None) -> list[pygame.Rect]:
+        """draw が描く領域（カード・おすすめの順番・拡大表示）を、描かずにレイアウトから求める"""
+        layout = battle_state.get_layout()
+        bounds = []
+        for i in range(len(battle_state.deck_manager.hand)):
+            card_rect = self._card_rect(layout, battle_state, i, card_lifts)
+            bounds.append(card_rect)
+            if i in battle_state.hint:
+                bounds.append(self._hint_badge_rect(card_rect))
+        if battle_state.hovered_card_index is not None:
+            bounds.append(layout.enlarged_card_rect)
+        return bounds
+
+    @staticmethod
+    def _card_rect(layout, battle_state: BattleScene, i: int, card_lifts: list[int] | None) -> pygame.Rect:
+        """i 枚目のカードを描く位置。card_lifts がなければホバー中のカードだけを持ち上げる"""
+        if card_lifts is None:
+            return layout.get_card_rect(i, hovered=i == battle_state.hovered_card_index)
+        card_rect = layout.get_card_rect(i)
+        return card_rect.move(0, -card_lifts[i]) if card_lifts[i] else card_rect
+
+    @staticmethod
+    def _hint_badge_rect(card_rect: pygame.Rect) -> pygame.Rect:
+        """おすすめの順番の丸（カードの上にはみ出す）を囲む領域"""
+        return pygame.Rect(card_rect.left + 20 - 13, card_rect.top - 14 - 13, 26, 26)
+
+    def draw(self, screen: pygame.Surface, battle_state: BattleScene, log_area_rect: pygame.Rect,
+             card_lifts: list[int] | None = None) -> list[pygame.Rect]:
+        """
+        手札を描画し、描いた領域のRectを返す。
+        card_lifts はカードごとの持ち上げ量 [px]（BattleAnimator のトゥイーン）。省略するとホバー中のカードだけを持ち上げる。
+        """
         # --- 新しいレイアウトロジック ---
         cards = battle_state.deck_manager.hand
         num_commands = len(cards)
         if num_commands == 0:
-            return
+            return []
+        dirty = []
 
-        card_width = 120
-        card_height = 170
-        overlap_x = 80  # カードが重なる量を減らし、間隔を広げる
-        
-        total_width = (num_commands - 1) * overlap_x + card_width
-        start_x = (screen.get_width() - total_width) / 2
-        card_y = screen.get_height() - card_height - 10
+        layout = battle_state.get_layout()
+        hint_order = {card_index: order for order, card_index in enumerate(battle_state.hint, 1)} # Hキーのおすすめ
 
         # ホバーされていないカードを先に描画
         for i, action_id in enumerate(cards):
             if i == battle_state.hovered_card_index:
                 continue # ホバーされているカードは後で描画
             
-            current_card_x = start_x + i * overlap_x
-            card_rect = pygame.Rect(current_card_x, card_y, card_width, card_height)
+            card_rect = self._card_rect(layout, battle_state, i, card_lifts) # 下ろしている途中のカードもある
             self._draw_single_card(screen, battle_state, action_id, card_rect, i)
+            dirty.append(card_rect)
+            if i in hint_order:
+                dirty.append(self._draw_hint_mark(screen, card_rect, hint_order[i]))
         
-        # ホバーされているカードを最後に（一番手前に）描画
+        # ホバーされているカードを最後に（一番手前に）少し上にずらして描画
         if battle_state.hovered_card_index is not None:
             i = battle_state.hovered_card_index
-            action_id = cards[i]
-            hover_y = card_y - 30 # 少し上に表示
-            current_card_x = start_x + i * overlap_x
-            card_rect = pygame.Rect(current_card_x, hover_y, card_width, card_height)
-            self._draw_single_card(screen, battle_state, action_id, card_rect, i)
+            card_rect = self._card_rect(layout, battle_state, i, card_lifts)
+            self._draw_single_card(screen, battle_state, cards[i], card_rect, i)
+            dirty.append(card_rect)
+            if i in hint_order:
+                dirty.append(self._draw_hint_mark(screen, card_rect, hint_order[i]))
         
         # --- 拡大カードの描画 ---
         if battle_state.hovered_card_index is not None:
             action_id = cards[battle_state.hovered_card_index]
-            self._draw_enlarged_card(screen, battle_state, action_id)
-
+            dirty.append(self._draw_enlarged_card(screen, battle_state, action_id, layout.enlarged_card_rect))
+        return dirty
 
     def _draw_single_card(self, screen: pygame.Surface, battle_state: BattleScene, action_id: str, card_rect: pygame.Rect, card_index: int):
-        action = ACTIONS[action_id]
+        action = ACTION_CATALOG[action_id]
         is_used = card_index in battle_state.used_card_indices
         can_afford = battle_state.player.current_mana >= action.get("cost", 0)
+        power = ActionHandler.get_card_display_power(battle_state.player, action_id)
 
-        if is_used or not can_afford:
+        key = (action_id, is_used or not can_afford, power, card_rect.size)
+        card_surface = self._card_surfaces.get(key)
+        if card_surface is None:
+            card_surface = self._render_card_face(action_id, is_used or not can_afford, power, card_rect.size)
+            self._store_card_surface(key, card_surface)
+        screen.blit(card_surface, card_rect)
+
+    def _draw_hint_mark(self, screen: pygame.Surface, card_rect: pygame.Rect, order: int) -> pygame.Rect:
+        """HandSolver が選んだカードに枠と使う順番を重ねる。順番の丸はカードの上にはみ出すので、その領域を返す"""
+        pygame.draw.rect(screen, settings.YELLOW, card_rect, 3, border_radius=5)
+        badge_center = (card_rect.left + 20, card_rect.top - 14)
+        badge_rect = pygame.draw.circle(screen, settings.YELLOW, badge_center, 12)
+        order_text = self.text_cache.render("card", str(order), True, settings.BLACK)
+        screen.blit(order_text, order_text.get_rect(center=badge_center))
+        return badge_rect
+
+    def _store_card_surface(self, key: tuple, card_surface: pygame.Surface):
+        if len(self._card_surfaces) >= self.max_card_surfaces:
+            self._card_surfaces.clear() # 威力の組み合わせが増えすぎたら作り直す
+        self._card_surfaces[key] = card_surface
+
+    def _render_card_face(self, action_id: str, is_dimmed: bool, power: int | None, size: tuple[int, int]) -> pygame.Surface:
+        """手札のカード1枚をオフスクリーンのSurfaceに描画する"""
+        action = ACTION_CATALOG[action_id]
+        surface = pygame.Surface(size, pygame.SRCALPHA) # 角丸の外側は透明にする
+        card_rect = surface.get_rect()
+
+        if is_dimmed:
             card_bg_color, card_border_color, text_color = ((20, 20, 30), (80, 80, 80), settings.DARK_GRAY)
         else:
             card_bg_color, card_border_color, text_color = ((40, 40, 60), settings.WHITE, settings.LIGHT_BLUE)
 
-        pygame.draw.rect(screen, card_bg_color, card_rect, border_radius=5)
-        pygame.draw.rect(screen, card_border_color, card_rect, 2, border_radius=5)
+        pygame.draw.rect(surface, card_bg_color, card_rect, border_radius=5)
+        pygame.draw.rect(surface, card_border_color, card_rect, 2, border_radius=5)
 
         # アクション名
-        name_text = self.fonts["small"].render(action["name"], True, text_color)
+        name_text = self.text_cache.render("small", action["name"], True, text_color)
         name_rect = name_text.get_rect(center=card_rect.center)
-        screen.blit(name_text, name_rect)
+        surface.blit(name_text, name_rect)
 
         # 左上: 消費MP
         cost = action.get("cost", 0)
         if cost >= 0:
             cost_circle_radius = 16
             cost_circle_center = (card_rect.left + cost_circle_radius + 5, card_rect.top + cost_circle_radius + 5)
-            pygame.draw.circle(screen, settings.BLUE, cost_circle_center, cost_circle_radius)
-            pygame.draw.circle(screen, settings.WHITE, cost_circle_center, cost_circle_radius, 1)
-            cost_text = self.fonts["card"].render(str(cost), True, settings.WHITE)
+            pygame.draw.circle(surface, settings.BLUE, cost_circle_center, cost_circle_radius)
+            pygame.draw.circle(surface, settings.WHITE, cost_circle_center, cost_circle_radius, 1)
+            cost_text = self.text_cache.render("card", str(cost), True, settings.WHITE)
             cost_text_rect = cost_text.get_rect(center=cost_circle_center)
-            screen.blit(cost_text, cost_text_rect)
+            surface.blit(cost_text, cost_text_rect)
 
         # 右下: 威力または防御値の表示
-        power = ActionHandler.get_card_display_power(battle_state.player, action_id)
         if power is not None:
             color = settings.RED if action["type"] == "attack" else settings.BLUE
-            self._draw_power_circle(screen, power, card_rect, color)
+            self._draw_power_circle(surface, power, card_rect, color)
+        return surface
 
     def _draw_power_circle(self, screen: pygame.Surface, power: int, card_rect: pygame.Rect, color: tuple, power_circle_radius: int = 16):
         power_circle_center = (card_rect.right - power_circle_radius - 5, card_rect.bottom - power_circle_radius - 5)
         pygame.draw.circle(screen, color, power_circle_center, power_circle_radius)
         pygame.draw.circle(screen, settings.WHITE, power_circle_center, power_circle_radius, 1)
-        power_text = self.fonts["card"].render(str(power), True, settings.WHITE)
+        power_text = self.text_cache.render("card", str(power), True, settings.WHITE)
         power_text_rect = power_text.get_rect(center=power_circle_center)
         screen.blit(power_text, power_text_rect)
 
-    def _draw_enlarged_card(self, screen: pygame.Surface, battle_state: BattleScene, action_id: str):
-        action = ACTIONS[action_id]
-        
-        card_width = 240
-        card_height = 340
-        card_x = (screen.get_width() - card_width) / 2
-        card_y = (screen.get_height() - card_height) / 2 - 50
-        card_rect = pygame.Rect(card_x, card_y, card_width, card_height)
+    def _draw_enlarged_card(self, screen: pygame.Surface, battle_state: BattleScene, action_id: str,
+                            card_rect: pygame.Rect) -> pygame.Rect:
+        power = ActionHandler.get_card_display_power(battle_state.player, action_id)
+        key = (action_id, "enlarged", power, card_rect.size)
+        card_surface = self._card_surfaces.get(key)
+        if card_surface is None:
+            card_surface = self._render_enlarged_card_face(action_id, power, card_rect.size)
+            self._store_card_surface(key, card_surface)
+        screen.blit(card_surface, card_rect)
+        return card_rect
+
+    def _render_enlarged_card_face(self, action_id: str, power: int | None, size: tuple[int, int]) -> pygame.Surface:
+        """拡大表示用のカードをオフスクリーンのSurfaceに描画する"""
+        action = ACTION_CATALOG[action_id]
+        surface = pygame.Surface(size, pygame.SRCALPHA)
+        card_rect = surface.get_rect()
 
         # 背景と枠線
-        pygame.draw.rect(screen, (60, 60, 80), card_rect, border_radius=10)
-        pygame.draw.rect(screen, settings.WHITE, card_rect, 3, border_radius=10)
+        pygame.draw.rect(surface, (60, 60, 80), card_rect, border_radius=10)
+        pygame.draw.rect(surface, settings.WHITE, card_rect, 3, border_radius=10)
 
         # アクション名
         # MPコスト表示エリアを除いたカードの中央に配置する
@@ -112,124 +187,43 @@ class PlayerCommandDrawer:
         cost_area_right_edge = card_rect.left + (cost_circle_radius * 2) + 20 # コスト円の右端+余白
         name_area_center_x = cost_area_right_edge + (card_rect.right - cost_area_right_edge) / 2
 
-        name_text = self.fonts["small"].render(action["name"], True, settings.WHITE)
+        name_text = self.text_cache.render("small", action["name"], True, settings.WHITE)
         name_rect = name_text.get_rect(centerx=name_area_center_x, y=card_rect.top + 20)
-        screen.blit(name_text, name_rect)
+        surface.blit(name_text, name_rect)
 
         # 説明文
         description = action.get("description", "").format(power=action.get("power", ""))
         # 説明文の描画領域をアクション名の下に設定
         description_rect = pygame.Rect(card_rect.x + 20, name_rect.bottom + 10, card_rect.width - 40, card_rect.height - name_rect.height - 80)
-        self._draw_text_multiline(screen, description, self.fonts["card"], description_rect, settings.WHITE)
+        self._draw_text_multiline(surface, description, "card", description_rect, settings.WHITE)
 
         # 左上: 消費MP
         cost = action.get("cost", 0)
         if cost >= 0:
             cost_circle_radius = 24
             cost_circle_center = (card_rect.left + cost_circle_radius + 10, card_rect.top + cost_circle_radius + 10)
-            pygame.draw.circle(screen, settings.BLUE, cost_circle_center, cost_circle_radius)
-            pygame.draw.circle(screen, settings.WHITE, cost_circle_center, cost_circle_radius, 2)
-            cost_text = self.fonts["small"].render(str(cost), True, settings.WHITE)
+            pygame.draw.circle(surface, settings.BLUE, cost_circle_center, cost_circle_radius)
+            pygame.draw.circle(surface, settings.WHITE, cost_circle_center, cost_circle_radius, 2)
+            cost_text = self.text_cache.render("small", str(cost), True, settings.WHITE)
             cost_text_rect = cost_text.get_rect(center=cost_circle_center)
-            screen.blit(cost_text, cost_text_rect)
+            surface.blit(cost_text, cost_text_rect)
 
         # 右下: 威力または防御値
-        power = ActionHandler.get_card_display_power(battle_state.player, action_id)
-        if power is not None:
+        if power is not None and power > 0:
             color = settings.RED if action["type"] == "attack" else settings.BLUE
-            self._draw_power_circle(screen, power, card_rect, color, 24)
-
-    def _draw_text_multiline(self, surface, text, font, rect, color):
-        """指定された矩形内にテキストを自動で折り返して描画する"""
-        lines = text.splitlines()
-        space_width = font.size(' ')[0]
-        max_width, max_height = rect.size
-        pos = list(rect.topleft)
-        for line in lines:
-            words = line.split(' ')
-            for word in line:
-                word_surface = font.render(word, True, color)
-                word_width, word_height = word_surface.get_size()
-                if pos[0] + word_width >= rect.right:
-                    pos[0] = rect.left
-                    pos[1] += word_height
-                surface.blit(word_surface, pos)
-                pos[0] += word_width + space_width
-            pos[0] = rect.left
-            pos[1] += word_height
-            self._draw_power_circle(screen, power, card_rect, settings.BLUE)
-
-    def _draw_power_circle(self, screen: pygame.Surface, power: int, card_rect: pygame.Rect, color: tuple, power_circle_radius: int = 16):
-        power_circle_center = (card_rect.right - power_circle_radius - 5, card_rect.bottom - power_circle_radius - 5)
-        pygame.draw.circle(screen, color, power_circle_center, power_circle_radius)
-        pygame.draw.circle(screen, settings.WHITE, power_circle_center, power_circle_radius, 1)
-        power_text = self.fonts["card"].render(str(power), True, settings.WHITE)
-        power_text_rect = power_text.get_rect(center=power_circle_center)
-        screen.blit(power_text, power_text_rect)
-
-    def _draw_enlarged_card(self, screen: pygame.Surface, battle_state: BattleScene, action_id: str):
-        action = ACTIONS[action_id]
-        
-        card_width = 240
-        card_height = 340
-        card_x = (screen.get_width() - card_width) / 2
-        card_y = (screen.get_height() - card_height) / 2 - 50
-        card_rect = pygame.Rect(card_x, card_y, card_width, card_height)
-
-        # 背景と枠線
-        pygame.draw.rect(screen, (60, 60, 80), card_rect, border_radius=10)
-        pygame.draw.rect(screen, settings.WHITE, card_rect, 3, border_radius=10)
+            self._draw_power_circle(surface, power, card_rect, color, 24)
+        return surface
 
-        # アクション名
-        # MPコスト表示エリアを除いたカードの中央に配置する
-        cost_circle_radius = 24
-        cost_area_right_edge = card_rect.left + (cost_circle_radius * 2) + 20 # コスト円の右端+余白
-        name_area_center_x = cost_area_right_edge + (card_rect.right - cost_area_right_edge) / 2
-
-        name_text = self.fonts["small"].render(action["name"], True, settings.WHITE)
-        name_rect = name_text.get_rect(centerx=name_area_center_x, y=card_rect.top + 20)
-        screen.blit(name_text, name_rect)
-
-        # 説明文
-        description = action.get("description", "").format(power=action.get("power", ""))
-        # 説明文の描画領域をアクション名の下に設定
-        description_rect = pygame.Rect(card_rect.x + 20, name_rect.bottom + 10, card_rect.width - 40, card_rect.height - name_rect.height - 80)
-        self._draw_text_multiline(screen, description, self.fonts["card"], description_rect, settings.WHITE)
-
-        # 左上: 消費MP
-        cost = action.get("cost", 0)
-        if cost >= 0:
-            cost_circle_radius = 24
-            cost_circle_center = (card_rect.left + cost_circle_radius + 10, card_rect.top + cost_circle_radius + 10)
-            pygame.draw.circle(screen, settings.BLUE, cost_circle_center, cost_circle_radius)
-            pygame.draw.circle(screen, settings.WHITE, cost_circle_center, cost_circle_radius, 2)
-            cost_text = self.fonts["small"].render(str(cost), True, settings.WHITE)
-            cost_text_rect = cost_text.get_rect(center=cost_circle_center)
-            screen.blit(cost_text, cost_text_rect)
-
-        # 右下: 威力または防御値
-        if action["type"] == "attack":
-            base_power = action.get("power", 0)
-            if action.get("damage_type") == "physical":
-                base_power += battle_state.player.attack_power # attack_powerを威力表示に加算
-            if "weak" in battle_state.player.status_effects:
-                base_power = math.ceil(base_power * STATUS_EFFECTS["weak"]["value"])
-            if base_power > 0:
-                self._draw_power_circle(screen, base_power, card_rect, settings.RED, 24)
-        elif action_id == "guard":
-            power = action.get("power", 0)
-            self._draw_power_circle(screen, power, card_rect, settings.BLUE, 24)
-
-    def _draw_text_multiline(self, surface, text, font, rect, color):
+    def _draw_text_multiline(self, surface, text, font_key, rect, color):
         """指定された矩形内にテキストを自動で折り返して描画する"""
         lines = text.splitlines()
-        space_width = font.size(' ')[0]
+        space_width = self.fonts[font_key].size(' ')[0]
         max_width, max_height = rect.size
         pos = list(rect.topleft)
         for line in lines:
             words = line.split(' ')
             for word in line:
-                word_surface = font.render(word, True, color)
+                word_surface = self.text_cache.render(font_key, word, True, color)
                 word_width, word_height = word_surface.get_size()
                 if pos[0] + word_width >= rect.right:
                     pos[0] = rect.left
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+import pygame
+from collections.abc import Mapping
+from ...config import settings
+from ..frame_profiler import FrameProfiler
+
+class ProfilerDrawer:
+    """
+    FrameProfiler の集計を画面右上に重ねて表示する。
+    数値は毎フレーム変わるので TextCache は使わず、集計が更新されたときだけパネルを描き直して使い回す。
+    """
+    PANEL_SIZE: tuple[int, int] = (300, 290)
+    GRAPH_HEIGHT: int = 60
+    ROW_HEIGHT: int = 18
+    COLUMN_RIGHTS: tuple[int, ...] = (150, 220, 290) # p50 / p95 / max 列の右端
+
+    def __init__(self, fonts: Mapping[str, pygame.font.Font]):
+        self.fonts = fonts
+        self._panel: pygame.Surface | None = None
+        self._panel_version: int = -1
+
+    def get_state_key(self, profiler: FrameProfiler) -> tuple:
+        return (profiler.enabled, profiler.stats_version)
+
+    def get_bounds(self, screen: pygame.Surface, profiler: FrameProfiler) -> list[pygame.Rect]:
+        if not profiler.enabled:
+            return []
+        width, height = self.PANEL_SIZE
+        return [pygame.Rect(screen.get_width() - width - 10, 60, width, height)]
+
+    def draw(self, screen: pygame.Surface, profiler: FrameProfiler) -> list[pygame.Rect]:
+        if not profiler.enabled:
+            return []
+        if self._panel is None or self._panel_version != profiler.stats_version:
+            self._panel = self._render_panel(profiler)
+            self._panel_version = profiler.stats_version
+        return [screen.blit(self._panel, self.get_bounds(screen, profiler)[0])]
+
+    def _render_panel(self, profiler: FrameProfiler) -> pygame.Surface:
+        width, height = self.PANEL_SIZE
+        panel = pygame.Surface((width, height), pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 190))
+        pygame.draw.rect(panel, settings.GRAY, panel.get_rect(), 1)
+        font = self.fonts["card"]
+        budget_ms = 1000 / profiler.target_fps
+
+        # FPS（目標に届いていなければ赤）
+        fps_color = settings.GREEN if profiler.fps >= profiler.target_fps * 0.95 else settings.RED
+        panel.blit(font.render(f"FPS {profiler.fps:5.1f} / {profiler.target_fps}", True, fps_color), (8, 6))
+
+        # 区間ごとの p50 / p95 / max [ms]（プロポーショナルフォントでも揃うように列ごとに右寄せで描く）
+        y = 6 + self.ROW_HEIGHT
+        self._draw_row(panel, font, y, "", ("p50", "p95", "max"), settings.LIGHT_GRAY)
+        for name in FrameProfiler.STAGES + (FrameProfiler.WORK,):
+            if name not in profiler.stats:
+                continue
+            y += self.ROW_HEIGHT
+            color = settings.YELLOW if name == FrameProfiler.WORK else settings.WHITE
+            self._draw_row(panel, font, y, name, tuple(f"{value:.2f}" for value in profiler.stats[name]), color)
+
+        # 処理時間のグラフ（横線は1フレームの予算）
+        graph_rect = pygame.Rect(8, height - self.GRAPH_HEIGHT - 8, width - 16, self.GRAPH_HEIGHT)
+        pygame.draw.rect(panel, settings.DARK_GRAY, graph_rect, 1)
+        scale = self.GRAPH_HEIGHT / (budget_ms * 2) # 予算の2倍で上端
+        budget_y = graph_rect.bottom - int(budget_ms * scale)
+        pygame.draw.line(panel, settings.ORANGE, (graph_rect.left, budget_y), (graph_rect.right - 1, budget_y))
+
+        times = profiler.frame_times_ms
+        if len(times) >= 2:
+            step = graph_rect.width / (profiler.window - 1)
+            points = [(graph_rect.left + i * step, graph_rect.bottom - min(t * scale, self.GRAPH_HEIGHT))
+                      for i, t in enumerate(times)]
+            pygame.draw.lines(panel, settings.LIGHT_BLUE, False, points)
+        return panel
+
+    def _draw_row(self, panel: pygame.Surface, font: pygame.font.Font, y: int, label: str, columns: tuple[str, ...],
+                  color: tuple[int, int, int]):
+        if label:
+            panel.blit(font.render(label, True, color), (8, y))
+        for i, text in enumerate(columns):
+            surface = font.render(text, True, color)
+            panel.blit(surface, surface.get_rect(topright=(self.COLUMN_RIGHTS[i], y)))
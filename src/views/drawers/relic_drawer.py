@@ -1,51 +1,56 @@
 # -*- coding: utf-8 -*-
 import pygame
+from collections.abc import Mapping
 from ...scenes.battle_scene import BattleScene
 from ...config import settings
-from ...data.relic_data import RELICS
+from ...data.catalog import RELIC_CATALOG
+from ..text_cache import TextCache
 
 class RelicDrawer:
-    def __init__(self, fonts: dict):
+    def __init__(self, fonts: Mapping[str, pygame.font.Font], text_cache: TextCache | None = None):
         self.fonts = fonts
-        self.relic_radius = 15 # 半径を小さくする
-        self.relic_gap = 10
+        self.text_cache = text_cache or TextCache(fonts)
 
-    def get_relic_rect(self, index: int) -> pygame.Rect:
-        """指定されたインデックスのレリックアイコンのRectを返す"""
-        x = self.relic_gap + index * (self.relic_radius * 2 + self.relic_gap)
-        y = self.relic_gap
-        return pygame.Rect(x, y, self.relic_radius * 2, self.relic_radius * 2)
+    def get_state_key(self, battle_state: BattleScene) -> tuple:
+        return (tuple(battle_state.player.relics), battle_state.hovered_relic_index)
 
-    def draw(self, screen: pygame.Surface, battle_state: BattleScene):
+    def get_bounds(self, battle_state: BattleScene) -> list[pygame.Rect]:
+        """draw が描く領域を、描かずにレイアウトから求める"""
+        layout = battle_state.get_layout()
+        bounds = layout.relic_rects[:len(battle_state.player.relics)]
+        if battle_state.hovered_relic_index is not None:
+            bounds.append(layout.relic_detail_rect)
+        return bounds
+
+    def draw(self, screen: pygame.Surface, battle_state: BattleScene) -> list[pygame.Rect]:
+        """レリックを描画し、描いた領域のRectを返す"""
+        dirty = []
         # レリックアイコンの描画
+        layout = battle_state.get_layout()
         for i, relic_id in enumerate(battle_state.player.relics):
-            relic_data = RELICS.get(relic_id)
+            relic_data = RELIC_CATALOG.get(relic_id)
             if not relic_data:
                 continue
             
-            relic_rect = self.get_relic_rect(i)
-            pygame.draw.circle(screen, relic_data["color"], relic_rect.center, self.relic_radius)
-            pygame.draw.circle(screen, settings.WHITE, relic_rect.center, self.relic_radius, 2)
+            relic_rect = layout.relic_rects[i]
+            dirty.append(pygame.draw.circle(screen, relic_data["color"], relic_rect.center, layout.RELIC_RADIUS))
+            pygame.draw.circle(screen, settings.WHITE, relic_rect.center, layout.RELIC_RADIUS, 2)
 
         # 拡大表示
         if battle_state.hovered_relic_index is not None:
             relic_id = battle_state.player.relics[battle_state.hovered_relic_index]
-            self._draw_enlarged_relic(screen, relic_id)
+            dirty.extend(self._draw_enlarged_relic(screen, relic_id, layout.relic_detail_rect))
+        return dirty
 
-    def _draw_enlarged_relic(self, screen: pygame.Surface, relic_id: str):
-        relic_data = RELICS.get(relic_id)
+    def _draw_enlarged_relic(self, screen: pygame.Surface, relic_id: str, rect: pygame.Rect) -> list[pygame.Rect]:
+        relic_data = RELIC_CATALOG.get(relic_id)
         if not relic_data:
-            return
-
-        width, height = 300, 150
-        x = (screen.get_width() - width) / 2
-        y = (screen.get_height() - height) / 2
-        rect = pygame.Rect(x, y, width, height)
+            return []
 
         pygame.draw.rect(screen, (40, 40, 60), rect, border_radius=10)
         pygame.draw.rect(screen, settings.WHITE, rect, 2, border_radius=10)
 
-        name_text = self.fonts["medium"].render(relic_data["name"], True, settings.WHITE)
+        name_text = self.text_cache.render("medium", relic_data["name"], True, settings.WHITE)
         name_rect = name_text.get_rect(centerx=rect.centerx, y=rect.top + 15)
         screen.blit(name_text, name_rect)
 
@@ -54,7 +59,8 @@ class RelicDrawer:
         lines = relic_data["description"].splitlines()
         line_y = desc_rect.y
         for line in lines:
-            line_surface = self.fonts["small"].render(line, True, settings.WHITE)
+            line_surface = self.text_cache.render("small", line, True, settings.WHITE)
             line_rect = line_surface.get_rect(centerx=rect.centerx, top=line_y)
             screen.blit(line_surface, line_rect)
-            line_y += line_surface.get_height()
\ No newline at end of file
+            line_y += line_surface.get_height()
+        return [rect]
\ No newline at end of file
@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+import json
+import os
+import shutil
+import subprocess
+import sys
+from collections.abc import Iterator, Mapping
+from time import perf_counter_ns
+import pygame
+
+# 用途ごとのフォントサイズ
+FONT_SIZES: dict[str, int] = {
+    "large": 48,
+    "medium": 36,
+    "small": 24,
+    "log": 20,
+    "card": 18,
+}
+
+WINDOWS_FONT_PATHS: tuple[str, ...] = (
+    "C:\\Windows\\Fonts\\meiryo.ttc",
+    "C:\\Windows\\Fonts\\msgothic.ttc",
+    "C:\\Windows\\Fonts\\YuGothM.ttc",
+)
+
+# Linux / macOS で探すフォルダ
+FONT_DIRS: tuple[str, ...] = (
+    "/usr/share/fonts",
+    "/usr/local/share/fonts",
+    "~/.local/share/fonts",
+    "~/.fonts",
+    "/System/Library/Fonts",
+    "/Library/Fonts",
+    "~/Library/Fonts",
+)
+
+# 日本語を含むフォントのファイル名（小文字）。前にあるものほど優先する
+JAPANESE_FONT_NAMES: tuple[str, ...] = (
+    "notosanscjkjp-regular", "notosanscjk-regular", "notosansjp-regular", "sourcehansansjp-regular",
+    "ipaexg", "ipag", "takaogothic", "vl-gothic", "hiraginosans", "ヒラギノ角ゴシック", "osaka",
+    "notosanscjk", "notosansjp", "sourcehansans", "meiryo", "msgothic", "yugoth",
+)
+
+FONT_EXTENSIONS: tuple[str, ...] = (".ttf", ".ttc", ".otf")
+CACHE_VERSION: int = 3 # 3: 「見つからなかった」結果は使わない
+
+def default_cache_path() -> str:
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "rpg-battle", "font.json")
+
+class FontProvider(Mapping):
+    """
+    日本語フォントを一度だけ探し、結果をディスクにキャッシュする。
+    フォントは fonts["small"] のように初めて使われたときにそのサイズだけ開く。
+    探索と各フォントを開くのにかかった時間を timings に記録する。
+    """
+    def __init__(self, sizes: dict[str, int] | None = None, cache_path: str | None = None):
+        self.sizes = sizes or FONT_SIZES
+        self.cache_path = cache_path or default_cache_path()
+        self._fonts: dict[str, pygame.font.Font] = {}
+        self._path: str | None = None
+        self._resolved: bool = False
+        self.source: str = "" # フォントを見つけた方法 (cache / windows / fontconfig / scan / default)
+        self.timings: dict[str, float] = {} # key: フェーズ名, value: ms
+
+    def __getitem__(self, key: str) -> pygame.font.Font:
+        font = self._fonts.get(key)
+        if font is None:
+            path = self.font_path # 初回はここで探索する
+            start = perf_counter_ns()
+            font = pygame.font.Font(path, self.sizes[key])
+            self.timings[f"open:{key}"] = (perf_counter_ns() - start) / 1e6
+            self._fonts[key] = font
+        return font
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.sizes)
+
+    def __len__(self) -> int:
+        return len(self.sizes)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.sizes
+
+    @property
+    def font_path(self) -> str | None:
+        """日本語フォントのパス。見つからなければNone（pygame標準フォント）"""
+        if not self._resolved:
+            start = perf_counter_ns()
+            self._path, self.source = self._resolve()
+            self._resolved = True
+            self.timings["discover"] = (perf_counter_ns() - start) / 1e6
+        return self._path
+
+    def _resolve(self) -> tuple[str | None, str]:
+        signature = self._dirs_signature()
+        hit, path = self._load_cache(signature)
+        if hit:
+            return path, "cache"
+
+        path, source = self._probe()
+        if path is not None:
+            self._save_cache(path, signature)
+        return path, source
+
+    def _probe(self) -> tuple[str | None, str]:
+        for path in WINDOWS_FONT_PATHS:
+            if os.path.exists(path):
+                return path, "windows"
+        path = _find_with_fontconfig()
+        if path:
+            return path, "fontconfig"
+        path = _scan_font_dirs()
+        if path:
+            return path, "scan"
+        return None, "default"
+
+    # --- ディスクキャッシュ ---
+    # 見つけたフォントのパスを、フォントフォルダ（最上位のみ）の更新時刻と一緒に保存する。
+    # そのフォントが残っていて更新時刻も変わっていなければ探し直さない（サブフォルダはたどらない）。
+    # 「見つからなかった」という結果は信用せず、次回も探し直す。
+
+    def _dirs_signature(self) -> list[float]:
+        signature = []
+        for directory in FONT_DIRS:
+            try:
+                signature.append(os.stat(os.path.expanduser(directory)).st_mtime)
+            except OSError:
+                signature.append(0.0)
+        return signature
+
+    def _load_cache(self, signature: list[float]) -> tuple[bool, str | None]:
+        """(キャッシュが使えたか, フォントのパス) を返す"""
+        try:
+            with open(self.cache_path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False, None
+        if data.get("version") != CACHE_VERSION or data.get("platform") != sys.platform or data.get("signature") != signature:
+            return False, None
+        path = data.get("path")
+        if path is None or not os.path.exists(path):
+            return False, None # 前回は見つからなかった、またはキャッシュしたフォントが消えている
+        return True, path
+
+    def _save_cache(self, path: str, signature: list[float]):
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            with open(self.cache_path, "w", encoding="utf-8") as f:
+                json.dump({"version": CACHE_VERSION, "platform": sys.platform, "signature": signature, "path": path}, f)
+        except OSError:
+            pass # キャッシュできなくても次回探し直すだけ
+
+    def report(self) -> str:
+        lines = [f"font: {self._path or '(pygame default)'} [{self.source or 'unresolved'}]"]
+        lines.extend(f"  {phase:<14}{ms:8.2f} ms" for phase, ms in self.timings.items())
+        return "\n".join(lines)
+
+def _font_rank(path: str) -> int:
+    name = os.path.basename(path).lower().replace(" ", "")
+    for rank, candidate in enumerate(JAPANESE_FONT_NAMES):
+        if candidate in name:
+            return rank
+    return len(JAPANESE_FONT_NAMES)
+
+def _find_with_fontconfig() -> str | None:
+    """fc-list で日本語に対応したフォントを探す"""
+    if shutil.which("fc-list") is None:
+        return None
+    try:
+        output = subprocess.run(["fc-list", ":lang=ja", "file"], capture_output=True, text=True, timeout=5).stdout
+    except (OSError, subprocess.SubprocessError):
+        return None
+    paths = [line.split(":")[0].strip() for line in output.splitlines() if line.strip()]
+    paths = [path for path in paths if path.lower().endswith(FONT_EXTENSIONS)]
+    return min(paths, key=lambda path: (_font_rank(path), path)) if paths else None
+
+def _scan_font_dirs() -> str | None:
+    """fontconfig が無い環境向け。フォントフォルダをファイル名で探す"""
+    best: tuple[int, str] | None = None
+    for directory in FONT_DIRS:
+        for root, _, files in os.walk(os.path.expanduser(directory)):
+            for file_name in files:
+                if not file_name.lower().endswith(FONT_EXTENSIONS):
+                    continue
+                path = os.path.join(root, file_name)
+                rank = _font_rank(path)
+                if rank < len(JAPANESE_FONT_NAMES) and (best is None or (rank, path) < best):
+                    best = (rank, path)
+    return best[1] if best else None
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+from array import array
+from time import perf_counter_ns
+from ..config import settings
+
+class FrameProfiler:
+    """
+    1フレームを区間（入力・更新・各ドロワー・画面転送）に分けて時間を測る。
+    直近 window フレーム分をリングバッファに持ち、stats_interval フレームごとに p50 / p95 / max を集計する。
+    無効なときは呼び出し側が begin_frame を呼ばないので、計測のコストはかからない。
+    """
+    STAGES: tuple[str, ...] = ("input", "update", "player", "enemy", "relics", "ui", "commands", "present")
+    WORK: str = "work" # begin_frame から end_frame までの処理時間（待機を含まない）
+    FRAME: str = "frame" # 前のフレーム開始からの間隔（clock.tick の待機を含む）
+
+    def __init__(self, target_fps: int = settings.FPS, window: int = 120, stats_interval: int = 15):
+        self.target_fps = target_fps
+        self.window = window
+        self.stats_interval = stats_interval
+        self.enabled: bool = False
+        self.active: bool = False # begin_frame から end_frame の間だけTrue
+
+        self._samples: dict[str, array] = {name: array('q', bytes(8 * window)) for name in self.STAGES + (self.WORK, self.FRAME)}
+        self._pos: int = 0
+        self._filled: int = 0
+        self._frame_start: int = 0
+        self._last_frame_start: int | None = None
+
+        self.stats: dict[str, tuple[float, float, float]] = {} # key: 区間名, value: (p50, p95, max) [ms]
+        self.fps: float = 0.0
+        self.frame_times_ms: list[float] = [] # グラフ用（古い順）
+        self.stats_version: int = 0
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        self._filled = 0
+        self._pos = 0
+        self._last_frame_start = None
+
+    def begin_frame(self) -> int:
+        now = perf_counter_ns()
+        pos = self._pos
+        for samples in self._samples.values():
+            samples[pos] = 0
+        if self._last_frame_start is not None:
+            self._samples[self.FRAME][pos] = now - self._last_frame_start
+        self._last_frame_start = now
+        self._frame_start = now
+        self.active = True
+        return now
+
+    def lap(self, stage: str, start: int) -> int:
+        """start からの経過時間を stage に加算し、現在時刻を返す（次の区間の start に使う）"""
+        now = perf_counter_ns()
+        self._samples[stage][self._pos] += now - start
+        return now
+
+    def end_frame(self):
+        self._samples[self.WORK][self._pos] = perf_counter_ns() - self._frame_start
+        self.active = False
+        self._pos = (self._pos + 1) % self.window
+        self._filled = min(self._filled + 1, self.window)
+        if self._pos % self.stats_interval == 0:
+            self._update_stats()
+
+    def _recent(self, name: str) -> list[int]:
+        """古い順に並べた直近の計測値"""
+        samples = self._samples[name]
+        if self._filled < self.window:
+            return samples[:self._filled].tolist()
+        return samples[self._pos:].tolist() + samples[:self._pos].tolist()
+
+    def _update_stats(self):
+        stats = {}
+        for name in self._samples:
+            values = sorted(self._recent(name))
+            if name == self.FRAME:
+                values = [v for v in values if v > 0] # 計測開始直後のフレームは間隔が取れていない
+            if not values:
+                continue
+            n = len(values)
+            stats[name] = (values[n // 2] / 1e6, values[int(0.95 * (n - 1))] / 1e6, values[-1] / 1e6)
+        self.stats = stats
+
+        intervals = [t for t in self._recent(self.FRAME) if t > 0]
+        self.fps = 1e9 * len(intervals) / sum(intervals) if intervals else 0.0
+        self.frame_times_ms = [t / 1e6 for t in self._recent(self.WORK)]
+        self.stats_version += 1
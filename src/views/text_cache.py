@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+import pygame
+from collections.abc import Mapping
+from collections import OrderedDict
+
+class TextCache:
+    """
+    font.render の結果を (フォントキー, 文字列, アンチエイリアス, 色) で使い回すLRUキャッシュ。
+    全ドロワーで1つのインスタンスを共有する。
+    """
+    def __init__(self, fonts: Mapping[str, pygame.font.Font], max_entries: int = 512):
+        self.fonts = fonts
+        self.max_entries = max_entries
+        self._surfaces: OrderedDict[tuple, pygame.Surface] = OrderedDict()
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def render(self, font_key: str, text: str, antialias: bool, color: tuple[int, int, int]) -> pygame.Surface:
+        key = (font_key, text, antialias, color)
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self._surfaces.move_to_end(key)
+            self.hits += 1
+            return surface
+
+        self.misses += 1
+        surface = self.fonts[font_key].render(text, antialias, color)
+        self._surfaces[key] = surface
+        if len(self._surfaces) > self.max_entries:
+            self._surfaces.popitem(last=False) # 一番古いものを捨てる
+        return surface
+
+    def clear(self):
+        self._surfaces.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._surfaces)
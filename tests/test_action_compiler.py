@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+import pytest
+from src.components.action_compiler import AddBlock, CompiledActionTable, compile_player_action
+from src.data.content_pack import builtin_catalogs, merge_catalogs, validate_catalogs
+
+def test_table_matches_definitions():
+    """件数・反復・in は定義と同じで、未定義のIDだけが get で default になる"""
+    definitions = {"guard": {"name": "防御", "type": "skill", "block": 10, "cost": 1}}
+    table = CompiledActionTable(definitions, compile_player_action)
+    assert len(table) == 1 and list(table) == ["guard"] and "guard" in table
+    assert table.get("missing") is None
+    assert isinstance(table["guard"].steps[0], AddBlock)
+
+def test_bad_definition_fails_validation():
+    bad = {"name": "x", "type": "attack", "cost": 1, "description": "威力がない"}
+    catalogs = merge_catalogs(builtin_catalogs(), [{"actions": {"bad": bad}}])
+    assert validate_catalogs(builtin_catalogs()) == []
+    assert any("'bad'" in error for error in validate_catalogs(catalogs))
+    with pytest.raises(ValueError):
+        CompiledActionTable({"bad": bad}, compile_player_action).get("bad")
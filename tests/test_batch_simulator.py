@@ -0,0 +1,13 @@
+# -*- coding: utf-8 -*-
+import pytest
+from src.data.monster_data import MONSTERS
+from src.simulation.batch_simulator import compare_with_scalar
+
+Z_LIMIT: float = 4.0 # batch_simulator の --z-limit と同じ
+
+@pytest.mark.parametrize("monster_id", list(MONSTERS))
+def test_batch_matches_scalar(monster_id):
+    """NumPy版と BattleEngine 版の勝率・平均ターン数・残りHPが統計的に一致する"""
+    result = compare_with_scalar(monster_id, num_battles=400, seed=4)
+    for key in ("win_rate_z", "turns_z", "player_hp_z"):
+        assert abs(result[key]) < Z_LIMIT, f"{monster_id}: {key}={result[key]:.2f} ({result})"
@@ -0,0 +1,17 @@
+# -*- coding: utf-8 -*-
+from src.components.battle_engine import BattleEngine
+from src.components.battle_events import EVENT_ENEMY_DEFEATED
+
+def test_every_newly_defeated_enemy_is_reported():
+    """攻撃対象以外の敵が倒れても通知され、攻撃対象は生きている敵に移る"""
+    engine = BattleEngine(encounter_id="goblin_raid", seed=1, keep_log=False)
+    assert len(engine.enemies) >= 3 and engine.target_index == 0
+    engine.enemies[0].take_damage(10 ** 6)
+    engine.enemies[1].take_damage(10 ** 6)
+    engine._check_game_over()
+    assert engine.events.counts[EVENT_ENEMY_DEFEATED] == 2
+    assert engine.enemies_alive == len(engine.enemies) - 2
+    assert engine.target_index == 2 and not engine.game_over
+
+    engine._check_game_over() # 通知済みの敵は数え直さない
+    assert engine.events.counts[EVENT_ENEMY_DEFEATED] == 2
@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+from array import array
+import pytest
+from src.components.battle_engine import BattleEngine
+from src.components.battle_record import (BattleRecord, DECISION_TYPECODE, END_TURN, dump_records, load_records,
+                                          select_target_decision, target_of_decision)
+from src.simulation.headless import run_battle
+from src.simulation.replay import replay
+
+@pytest.mark.parametrize("monster_id, encounter_id", [("slime", None), ("goblin", None), ("mage", None), (None, "goblin_raid")])
+def test_recorded_battle_replays_to_same_state(monster_id, encounter_id):
+    """シード固定の戦闘を記録し、バイト列を経由して再生すると最終状態のハッシュが一致する"""
+    engine = BattleEngine(monster_id=monster_id, encounter_id=encounter_id, seed=2024, keep_log=False)
+    if encounter_id:
+        engine.select_target(2) # 攻撃対象の選択も記録に残る
+    run_battle(engine)
+    (record,) = load_records(dump_records([engine.to_record()]))
+
+    result = replay(record)
+    assert result.error is None
+    assert result.state_hash == engine.state_hash()
+
+def test_wide_decisions_round_trip():
+    """127を超える手札の番号と、100体を超える敵の選択も記録できる"""
+    decisions = array(DECISION_TYPECODE, [0, 130, 5000, END_TURN, select_target_decision(300)])
+    record = BattleRecord(1, "slime", ["slash"], decisions, b"\0" * 16, "slime_pair")
+    (loaded,) = load_records(record.to_bytes())
+    assert list(loaded.decisions) == list(decisions)
+    assert target_of_decision(loaded.decisions[-1]) == 300
+    assert loaded.encounter_id == "slime_pair"
+
+def test_truncated_record_is_rejected():
+    record = BattleRecord(1, "slime", [], array(DECISION_TYPECODE, [1, 2, 3]), b"\0" * 16)
+    with pytest.raises(ValueError):
+        load_records(record.to_bytes()[:-1])
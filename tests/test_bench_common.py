@@ -0,0 +1,9 @@
+# -*- coding: utf-8 -*-
+from src.benchmarks.common import BenchResult, compare, regressions
+
+def test_compare_applies_threshold():
+    """中央値がベースラインの 1 + threshold 倍を超えたケースだけが後退になる"""
+    results = [BenchResult("fast", 1, [100.0]), BenchResult("slow", 1, [130.0]), BenchResult("new", 1, [50.0])]
+    baseline = {"fast": {"median_ns": 100.0}, "slow": {"median_ns": 100.0}}
+    assert regressions(compare(results, baseline, 0.15)) == ["slow"]
+    assert regressions(compare(results, baseline, 0.5)) == []
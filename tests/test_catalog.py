@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+import random
+import pytest
+from src.data.catalog import ACTION_CATALOG, DERIVED_FIELDS, INDEXED_FIELDS, Catalog, catalogs_from_pack
+from src.data.content_pack import build_pack, builtin_catalogs, open_pack
+
+def test_is_debuff_index():
+    assert ACTION_CATALOG.where(is_debuff=True) == ("expose_weakness",)
+    assert "healing_light" in ACTION_CATALOG.where(is_debuff=False, type="skill")
+
+def test_where_accepts_lists():
+    """リストの条件はすべての要素に一致するものに絞る"""
+    assert ACTION_CATALOG.where(type=["attack"], cost=2) == ACTION_CATALOG.where(type="attack", cost=2)
+    assert ACTION_CATALOG.where(type=["attack", "skill"]) == ()
+    assert ACTION_CATALOG.where(tags=[]) == ACTION_CATALOG.ids
+    with pytest.raises(TypeError):
+        ACTION_CATALOG.where(tags=[{"starter": True}])
+
+def test_pack_and_dict_catalogs_agree(tmp_path):
+    """パックから読んだカタログも組み込みの定義と同じ順にIDをたどり、同じ絞り込み結果になる"""
+    path = tmp_path / "content.pack"
+    path.write_bytes(build_pack(builtin_catalogs()))
+    pack = open_pack(str(path))
+    rng_a, rng_b = random.Random(1), random.Random(1)
+    for name, packed in catalogs_from_pack(pack).items():
+        builtin = Catalog(builtin_catalogs()[name], INDEXED_FIELDS[name], DERIVED_FIELDS.get(name))
+        assert packed.ids == builtin.ids
+        for field in INDEXED_FIELDS[name] + tuple(DERIVED_FIELDS.get(name, ())):
+            for value in builtin.values_of(field):
+                assert packed.where(**{field: value}) == builtin.where(**{field: value})
+        assert packed.sample(rng_a, 2) == builtin.sample(rng_b, 2)
+    pack.close()
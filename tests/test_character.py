@@ -0,0 +1,14 @@
+# -*- coding: utf-8 -*-
+import pytest
+from src.components.character import Character
+from src.components.status_engine import STATUS_IDS
+
+def test_status_effects_is_read_only():
+    """status_effects は apply_status の結果を映し、書き込みは TypeError になる（黙って捨てられない）"""
+    character = Character("勇者", max_hp=100, max_mp=3, attack_power=10, x=0, y=0)
+    status_id = STATUS_IDS[0]
+    character.apply_status(status_id, 2)
+    assert dict(character.status_effects) == {status_id: 2}
+    with pytest.raises(TypeError):
+        character.status_effects[status_id] = 5
+    assert character.status_effects[status_id] == 2
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+import os
+import pytest
+from src.data.content_pack import build_pack, builtin_catalogs, open_pack
+from src.data.catalog import _open_runtime_pack, _SOURCE_FILES
+
+def _write_pack(tmp_path) -> str:
+    path = str(tmp_path / "content.pack")
+    with open(path, "wb") as f:
+        f.write(build_pack(builtin_catalogs()))
+    return path
+
+def test_pack_entries_match_builtin(tmp_path):
+    pack = open_pack(_write_pack(tmp_path))
+    for name, entries in builtin_catalogs().items():
+        assert sorted(pack[name]) == sorted(entries)
+        for entry_id, entry in entries.items():
+            assert pack[name][entry_id].keys() == entry.keys()
+    pack.close()
+
+def test_runtime_pack_falls_back_when_unusable(tmp_path):
+    """無い・定義より古い・壊れているパックは使わない（組み込みの定義に戻る）"""
+    assert _open_runtime_pack(str(tmp_path / "missing.pack")) is None
+    path = _write_pack(tmp_path)
+    pack = _open_runtime_pack(path)
+    assert pack is not None
+    pack.close()
+
+    newest = max(os.path.getmtime(source) for source in _SOURCE_FILES)
+    os.utime(path, (newest - 10, newest - 10))
+    assert _open_runtime_pack(path) is None
+
+    with open(path, "r+b") as f:
+        f.write(b"XXXX")
+    os.utime(path, None)
+    assert _open_runtime_pack(path) is None
+
+def test_truncated_pack_is_rejected(tmp_path):
+    """途中で切れたパックは開くときに ValueError になり、実行時は組み込みの定義に戻る"""
+    data = build_pack(builtin_catalogs())
+    path = str(tmp_path / "content.pack")
+    for size in range(len(data)):
+        with open(path, "wb") as f:
+            f.write(data[:size])
+        with pytest.raises(ValueError):
+            open_pack(path)
+        assert _open_runtime_pack(path) is None
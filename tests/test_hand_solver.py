@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+from src.components.battle_engine import BattleEngine
+from src.components.hand_solver import HandSolver, OBJECTIVE_SURVIVE
+
+def test_enemy_phase_includes_every_enemy():
+    """敵が複数いるとき、受けるダメージには攻撃対象以外の敵の行動も入る"""
+    engine = BattleEngine(encounter_id="goblin_raid", seed=1, keep_log=False)
+    solver = HandSolver(OBJECTIVE_SURVIVE)
+    target_only = solver.solve(engine.player, engine.enemy, [], (), engine.enemy.next_action)
+    everyone = solver.solve(engine.player, engine.enemy, [], (), engine.enemy.next_action, engine.enemy_actions)
+    assert len(engine.enemy_actions) > 1
+    assert everyone.damage_taken > target_only.damage_taken
+
+def test_single_enemy_plan_is_unchanged():
+    engine = BattleEngine(monster_id="goblin", seed=1, keep_log=False)
+    solver = HandSolver()
+    plan = solver.solve_engine(engine)
+    by_intent = HandSolver().solve(engine.player, engine.enemy, engine.deck_manager.hand, engine.used_card_indices,
+                                   engine.enemy.next_action)
+    assert (plan.card_indices, plan.damage_dealt, plan.damage_taken) == (by_intent.card_indices, by_intent.damage_dealt, by_intent.damage_taken)